@@ -0,0 +1,235 @@
+# mass_image_generator/adaptive_limiter.py
+"""
+অ্যাডাপ্টিভ কনকারেন্সি লিমিটার - প্রোভাইডার অনুযায়ী ইন-ফ্লাইট রিকোয়েস্ট সীমা
+
+লোকাল CPU নয়, প্রোভাইডারের ল্যাটেন্সি ও থ্রটলিং দেখে লিমিট ঠিক হয়:
+    - gradient: দীর্ঘমেয়াদি (baseline) ও সাম্প্রতিক ল্যাটেন্সির অনুপাত।
+      ল্যাটেন্সি স্থির থাকলে লিমিট sqrt(limit) করে বাড়ে, ফুলে উঠলে কমে।
+    - 429 (বা থ্রটল): লিমিট গুণিতকভাবে কমে (AIMD এর multiplicative decrease)।
+
+একই লিমিটার থ্রেড (slot) ও asyncio (async_slot) দুই পাথেই কাজ করে।
+প্রোভাইডারের লিমিটার প্রসেস জুড়ে একটাই (get_limiter), তাই AutoScaler
+রিপোর্টে সবগুলোর লিমিট হিস্টরি দেখাতে পারে।
+"""
+
+import math
+import time
+import asyncio
+import threading
+import contextlib
+from collections import deque
+from datetime import datetime
+from typing import Dict, Optional
+
+from metrics import PROVIDER_LIMIT
+
+# হিস্টরিতে কতগুলো লিমিট পরিবর্তন রাখা হবে
+HISTORY_SIZE = 200
+
+# প্রতি স্যাম্পলে baseline ল্যাটেন্সি সর্বোচ্চ কত ভাগ বাড়তে পারে
+BASELINE_DRIFT = 0.0005
+
+class RequestOutcome:
+    """একটি রিকোয়েস্টের ফলাফল - কলার throttled/dropped ও latency সেট করে
+    
+    latency শুধু HTTP রাউন্ড ট্রিপ (সেকেন্ড)। সেট না করলে পুরো স্লটের সময়
+    ধরা হয় - তাতে পোলিং/ডাউনলোড/ডিকোড ঢুকে যায় এবং baseline ফুলে ওঠে।
+    """
+    
+    __slots__ = ('throttled', 'dropped', 'latency')
+    
+    def __init__(self):
+        self.throttled = False
+        self.dropped = False
+        self.latency = None
+
+class AdaptiveLimiter:
+    """gradient + multiplicative decrease কনকারেন্সি লিমিটার"""
+    
+    def __init__(self, name: str, max_limit=16, initial_limit=4, min_limit=1,
+                 tolerance=1.5, smoothing=0.2, backoff_ratio=0.5):
+        self.name = name
+        self.min_limit = min_limit
+        self.max_limit = max(min_limit, max_limit)
+        self.tolerance = tolerance
+        self.smoothing = smoothing
+        self.backoff_ratio = backoff_ratio
+        
+        self.estimate = float(min(max(initial_limit, min_limit), self.max_limit))
+        self.limit = int(self.estimate)
+        self.inflight = 0
+        
+        # ল্যাটেন্সি (সেকেন্ড) - short হলো EWMA, long হলো baseline
+        self.short_rtt = None
+        self.long_rtt = None
+        
+        self.lock = threading.Lock()
+        self.available = threading.Condition(self.lock)
+        self.async_waiters = []
+        self.history = deque(maxlen=HISTORY_SIZE)
+        self.samples = 0
+        self.throttles = 0
+        self.last_backoff = 0.0
+        self._record('initial')
+    
+    def _record(self, reason: str):
+        """লিমিট পরিবর্তন হিস্টরিতে রাখুন - lock ধরে ডাকতে হবে"""
+        PROVIDER_LIMIT.set(self.limit, provider=self.name)
+        self.history.append({
+            'timestamp': datetime.now().isoformat(),
+            'limit': self.limit,
+            'reason': reason,
+            'rtt_ms': round(self.short_rtt * 1000, 1) if self.short_rtt else None
+        })
+    
+    def set_max_limit(self, max_limit: int):
+        """হার্ড ক্যাপ বদলান (কনফিগ রিলোড)"""
+        with self.lock:
+            self.max_limit = max(self.min_limit, max_limit)
+            if self.estimate > self.max_limit:
+                self.estimate = float(self.max_limit)
+                self._set_limit('cap')
+    
+    def _set_limit(self, reason: str):
+        limit = int(self.estimate)
+        if limit != self.limit:
+            self.limit = limit
+            self._record(reason)
+            self._wake()
+    
+    def _wake(self):
+        """অপেক্ষারত থ্রেড ও কোরুটিন জাগান - lock ধরে ডাকতে হবে"""
+        self.available.notify_all()
+        waiters, self.async_waiters = self.async_waiters, []
+        for loop, event in waiters:
+            loop.call_soon_threadsafe(event.set)
+    
+    def _try_acquire(self):
+        if self.inflight < self.limit:
+            self.inflight += 1
+            return True
+        return False
+    
+    def acquire(self):
+        """স্লট নিন (থ্রেড পাথ)"""
+        with self.available:
+            self.available.wait_for(self._try_acquire)
+    
+    async def acquire_async(self):
+        """স্লট নিন (asyncio পাথ) - ইভেন্ট লুপ ব্লক না করে"""
+        loop = asyncio.get_running_loop()
+        while True:
+            with self.lock:
+                if self._try_acquire():
+                    return
+                event = asyncio.Event()
+                self.async_waiters.append((loop, event))
+            await event.wait()
+    
+    def release(self, latency: float, outcome: RequestOutcome):
+        """স্লট ছাড়ুন এবং ফলাফল থেকে লিমিট আপডেট করুন"""
+        with self.lock:
+            inflight = self.inflight
+            self.inflight -= 1
+            
+            if outcome.throttled:
+                self.throttles += 1
+                # একই সময়ে ফেরা অনেকগুলো 429 এ একবারই কমান (এক RTT এ একবার)
+                now = time.monotonic()
+                if now - self.last_backoff >= (self.short_rtt or 0):
+                    self.last_backoff = now
+                    self.estimate = max(self.min_limit, self.estimate * self.backoff_ratio)
+                    self._set_limit('throttled')
+            elif not outcome.dropped:
+                self._update(latency, inflight)
+            
+            self._wake()
+    
+    def _update(self, latency: float, inflight: int):
+        """gradient আপডেট - lock ধরে ডাকতে হবে"""
+        self.samples += 1
+        if self.short_rtt is None:
+            self.short_rtt = self.long_rtt = latency
+            return
+        
+        # baseline = দেখা সর্বনিম্ন ল্যাটেন্সি, খুব ধীরে উপরে সরে যাতে প্রোভাইডারের
+        # স্থায়ী পরিবর্তন মেনে নেয় কিন্তু নিজের তৈরি কিউ baseline এ ঢুকে না পড়ে
+        self.short_rtt = 0.8 * self.short_rtt + 0.2 * latency
+        self.long_rtt = min(self.short_rtt, self.long_rtt * (1 + BASELINE_DRIFT))
+        
+        gradient = max(0.5, min(1.0, self.tolerance * self.long_rtt / self.short_rtt))
+        
+        # লিমিটের অর্ধেকও ব্যবহার না হলে বাড়িয়ে লাভ নেই
+        if gradient == 1.0 and inflight < self.limit / 2:
+            return
+        
+        target = self.estimate * gradient + math.sqrt(self.estimate)
+        estimate = (1 - self.smoothing) * self.estimate + self.smoothing * target
+        self.estimate = max(self.min_limit, min(self.max_limit, estimate))
+        self._set_limit('latency' if gradient < 1.0 else 'probe')
+    
+    @contextlib.contextmanager
+    def slot(self):
+        """থ্রেড পাথ: with limiter.slot() as outcome: ..."""
+        self.acquire()
+        outcome = RequestOutcome()
+        start = time.monotonic()
+        try:
+            yield outcome
+        except BaseException:
+            outcome.dropped = True
+            raise
+        finally:
+            elapsed = time.monotonic() - start
+            self.release(outcome.latency if outcome.latency is not None else elapsed, outcome)
+    
+    @contextlib.asynccontextmanager
+    async def async_slot(self):
+        """asyncio পাথ: async with limiter.async_slot() as outcome: ..."""
+        await self.acquire_async()
+        outcome = RequestOutcome()
+        start = time.monotonic()
+        try:
+            yield outcome
+        except BaseException:
+            outcome.dropped = True
+            raise
+        finally:
+            elapsed = time.monotonic() - start
+            self.release(outcome.latency if outcome.latency is not None else elapsed, outcome)
+    
+    def report(self) -> Dict:
+        """বর্তমান অবস্থা ও লিমিট হিস্টরি"""
+        with self.lock:
+            return {
+                'limit': self.limit,
+                'max_limit': self.max_limit,
+                'inflight': self.inflight,
+                'samples': self.samples,
+                'throttles': self.throttles,
+                'short_rtt_ms': round(self.short_rtt * 1000, 1) if self.short_rtt else None,
+                'long_rtt_ms': round(self.long_rtt * 1000, 1) if self.long_rtt else None,
+                'history': list(self.history)
+            }
+
+_limiters: Dict[str, AdaptiveLimiter] = {}
+_limiters_lock = threading.Lock()
+
+def get_limiter(name: str, max_limit: int, initial_limit: Optional[int] = None) -> AdaptiveLimiter:
+    """প্রোভাইডারের শেয়ার করা লিমিটার (না থাকলে তৈরি)"""
+    with _limiters_lock:
+        limiter = _limiters.get(name)
+        if limiter is None:
+            limiter = AdaptiveLimiter(name, max_limit=max_limit,
+                                      initial_limit=initial_limit or min(4, max_limit))
+            _limiters[name] = limiter
+            return limiter
+    
+    if limiter.max_limit != max_limit:
+        limiter.set_max_limit(max_limit)
+    return limiter
+
+def all_limiters() -> Dict[str, AdaptiveLimiter]:
+    """সব প্রোভাইডারের লিমিটার"""
+    with _limiters_lock:
+        return dict(_limiters)
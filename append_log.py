@@ -0,0 +1,175 @@
+# mass_image_generator/append_log.py
+"""
+অ্যাপেন্ড-অনলি লগ - পুরো JSON ফাইল বারবার রিরাইট না করে প্রতি লাইনে একটি অপারেশন
+
+RecordLog: নাম/কী অনুযায়ী রেকর্ড (put/delete), মেমোরিতে ইনডেক্স থাকে।
+EventLog: শুধু যোগ হওয়া ইভেন্ট (যেমন চেঞ্জ লগ), গ্রুপ অনুযায়ী গণনা মেমোরিতে।
+
+প্রতিটি আপডেট একটি লাইন লেখে (O(1))। মৃত লাইন বেশি হয়ে গেলে লগ
+কমপ্যাক্ট হয় - শুধু জীবিত রেকর্ড একটি টেম্প ফাইলে লিখে os.replace।
+ক্র্যাশে অর্ধেক লেখা শেষ লাইন লোডের সময় বাদ পড়ে।
+"""
+
+import os
+import json
+import threading
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+# মোট লাইন জীবিত রেকর্ডের এত গুণ হলে (এবং অন্তত MIN লাইন) কমপ্যাক্ট
+COMPACT_RATIO = 2.0
+COMPACT_MIN_LINES = 1000
+
+def read_lines(path: str) -> Iterator[Dict]:
+    """JSONL লাইনগুলো পড়ুন, ভাঙা লাইন বাদ"""
+    if not os.path.exists(path):
+        return
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                # ক্র্যাশের সময় অর্ধেক লেখা লাইন
+                continue
+
+def rewrite(path: str, items: Iterable[Dict]):
+    """লগ অ্যাটমিকভাবে নতুন করে লিখুন"""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        for item in items:
+            f.write(json.dumps(item, ensure_ascii=False) + "\n")
+    os.replace(tmp_path, path)
+
+class RecordLog:
+    """কী অনুযায়ী রেকর্ডের অ্যাপেন্ড-অনলি লগ"""
+    
+    def __init__(self, path: str, key: str = "name", compact_ratio=COMPACT_RATIO,
+                 compact_min_lines=COMPACT_MIN_LINES):
+        self.path = path
+        self.key = key
+        self.compact_ratio = compact_ratio
+        self.compact_min_lines = compact_min_lines
+        self.lock = threading.Lock()
+        
+        # ইনসার্ট ক্রম বজায় থাকে (dict)
+        self.records: Dict[str, Dict] = {}
+        self.lines = 0
+        for entry in read_lines(path):
+            self.lines += 1
+            if entry.get("op") == "delete":
+                self.records.pop(entry["key"], None)
+            elif entry.get("op") == "put":
+                record = entry["record"]
+                self.records[record[self.key]] = record
+        
+        self.file = open(path, 'a', encoding='utf-8')
+    
+    def _append(self, entry: Dict):
+        self.file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self.file.flush()
+        self.lines += 1
+    
+    def put(self, record: Dict):
+        """রেকর্ড যোগ/আপডেট করুন"""
+        with self.lock:
+            self.records[record[self.key]] = record
+            self._append({"op": "put", "record": record})
+            self._maybe_compact()
+    
+    def delete(self, key: str):
+        """রেকর্ড মুছুন"""
+        with self.lock:
+            if self.records.pop(key, None) is None:
+                return False
+            self._append({"op": "delete", "key": key})
+            self._maybe_compact()
+            return True
+    
+    def get(self, key: str) -> Optional[Dict]:
+        return self.records.get(key)
+    
+    def values(self) -> List[Dict]:
+        return list(self.records.values())
+    
+    def __len__(self):
+        return len(self.records)
+    
+    def __contains__(self, key):
+        return key in self.records
+    
+    def _maybe_compact(self):
+        if self.lines >= self.compact_min_lines and self.lines > self.compact_ratio * max(len(self.records), 1):
+            self._compact()
+    
+    def compact(self):
+        """শুধু জীবিত রেকর্ড রেখে লগ নতুন করে লিখুন"""
+        with self.lock:
+            self._compact()
+    
+    def _compact(self):
+        self.file.close()
+        rewrite(self.path, ({"op": "put", "record": record} for record in self.records.values()))
+        self.lines = len(self.records)
+        self.file = open(self.path, 'a', encoding='utf-8')
+    
+    def close(self):
+        with self.lock:
+            self.file.close()
+
+class EventLog:
+    """শুধু-যোগ ইভেন্ট লগ - group ফিল্ড অনুযায়ী গণনা মেমোরিতে থাকে"""
+    
+    def __init__(self, path: str, group: str):
+        self.path = path
+        self.group = group
+        self.lock = threading.Lock()
+        
+        self.counts: Dict[str, int] = {}
+        for event in read_lines(path):
+            name = event.get(group)
+            self.counts[name] = self.counts.get(name, 0) + 1
+        
+        self.file = open(path, 'a', encoding='utf-8')
+    
+    def extend(self, events: Iterable[Dict]):
+        """ইভেন্ট যোগ করুন - একটি write কল"""
+        events = list(events)
+        if not events:
+            return 0
+        with self.lock:
+            self.file.write("".join(json.dumps(event, ensure_ascii=False) + "\n" for event in events))
+            self.file.flush()
+            for event in events:
+                name = event.get(self.group)
+                self.counts[name] = self.counts.get(name, 0) + 1
+        return len(events)
+    
+    def __iter__(self):
+        with self.lock:
+            self.file.flush()
+        return read_lines(self.path)
+    
+    def events_for(self, name: str) -> List[Dict]:
+        """একটি গ্রুপের ইভেন্টগুলো"""
+        if name not in self.counts:
+            return []
+        return [event for event in self if event.get(self.group) == name]
+    
+    def compact(self, keep: Callable[[str], bool]):
+        """keep(group) False হওয়া গ্রুপের ইভেন্ট বাদ দিয়ে লগ নতুন করে লিখুন"""
+        with self.lock:
+            if all(keep(name) for name in self.counts):
+                return 0
+            
+            self.file.close()
+            removed = sum(count for name, count in self.counts.items() if not keep(name))
+            rewrite(self.path, [event for event in read_lines(self.path) if keep(event.get(self.group))])
+            self.counts = {name: count for name, count in self.counts.items() if keep(name)}
+            self.file = open(self.path, 'a', encoding='utf-8')
+            return removed
+    
+    def close(self):
+        with self.lock:
+            self.file.close()
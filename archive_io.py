@@ -0,0 +1,424 @@
+# mass_image_generator/archive_io.py
+"""
+আর্কাইভ IO - প্যারালাল কমপ্রেশন সহ zip রাইটার ও স্ট্রিমিং এক্সট্র্যাক্ট
+
+ওয়ার্কার থ্রেডগুলো মেম্বার কমপ্রেস করে (zlib/lzma GIL ছেড়ে দেয়), আর
+একটি রাইটার সেগুলো ইনপুটের ক্রমেই আর্কাইভে লেখে। লেখার সময়ই পুরো
+আর্কাইভের SHA-256 হয়, তাই চেকসামের জন্য আবার পড়তে হয় না। রিস্টোরে
+প্রতিটি মেম্বারের CRC স্ট্রিম করার সময়ই যাচাই হয়।
+"""
+
+import os
+import time
+import zlib
+import shutil
+import struct
+import hashlib
+import tempfile
+import zipfile
+import collections
+import concurrent.futures
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+IO_BUFFER_SIZE = 1024 * 1024
+
+# এর চেয়ে বড় কমপ্রেসড মেম্বার মেমোরির বদলে টেম্প ফাইলে থাকে
+SPOOL_MAX_SIZE = 8 * 1024 * 1024
+
+ZIP64_LIMIT = 0xFFFFFFFF
+ZIP_FILECOUNT_LIMIT = 0xFFFF
+
+FILE_HEADER = struct.Struct("<4s2B4HL2L2H")
+CENTRAL_DIR = struct.Struct("<4s4B4HL2L5H2L")
+END_ARCHIVE = struct.Struct("<4s4H2LH")
+END_ARCHIVE64 = struct.Struct("<4sQ2H2L4Q")
+END_ARCHIVE64_LOCATOR = struct.Struct("<4sLQL")
+
+FLAG_UTF8 = 0x800
+FLAG_LZMA_EOS = 0x02
+
+def dos_datetime(timestamp: float):
+    """(dos_date, dos_time)"""
+    t = time.localtime(timestamp)
+    if t.tm_year < 1980:
+        return (0 << 9) | (1 << 5) | 1, 0
+    date = ((t.tm_year - 1980) << 9) | (t.tm_mon << 5) | t.tm_mday
+    dos_time = (t.tm_hour << 11) | (t.tm_min << 5) | (t.tm_sec // 2)
+    return date, dos_time
+
+def new_compressor(compress_type):
+    """কমপ্রেসর - compress()/flush() সহ, STORED হলে None"""
+    if compress_type == zipfile.ZIP_DEFLATED:
+        return zlib.compressobj(6, zlib.DEFLATED, -15)
+    if compress_type == zipfile.ZIP_LZMA:
+        return zipfile.LZMACompressor()
+    if compress_type == zipfile.ZIP_STORED:
+        return None
+    raise ValueError(f"Unsupported compression: {compress_type}")
+
+class HashingFile:
+    """বড় বাফারে লেখা ফাইল - লেখার সাথে সাথে SHA-256"""
+    
+    def __init__(self, path: str, algorithm="sha256"):
+        self.file = open(path, 'wb', buffering=IO_BUFFER_SIZE)
+        self.hash = hashlib.new(algorithm)
+        self.offset = 0
+    
+    def write(self, data):
+        self.file.write(data)
+        self.hash.update(data)
+        self.offset += len(data)
+    
+    def tell(self):
+        return self.offset
+    
+    def close(self):
+        self.file.close()
+    
+    def hexdigest(self):
+        return self.hash.hexdigest()
+
+class CompressedMember:
+    """একটি কমপ্রেস করা মেম্বার (ওয়ার্কার থেকে রাইটারে যায়)"""
+    
+    def __init__(self, arcname, compress_type, file_class=None):
+        self.arcname = arcname
+        self.compress_type = compress_type
+        self.file_class = file_class
+        self.crc = 0
+        self.file_size = 0
+        self.compress_size = 0
+        self.mtime = time.time()
+        self.mode = 0o100644
+        self.seconds = 0.0
+        self.offset = None
+        self.sha256 = None
+        self.data = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    
+    def feed(self, chunks: Iterable[bytes]):
+        """ডেটা CRC করে কমপ্রেস করুন"""
+        start = time.perf_counter()
+        compressor = new_compressor(self.compress_type)
+        content_hash = hashlib.sha256()
+        
+        for chunk in chunks:
+            self.crc = zlib.crc32(chunk, self.crc)
+            content_hash.update(chunk)
+            self.file_size += len(chunk)
+            out = compressor.compress(chunk) if compressor else chunk
+            if out:
+                self.data.write(out)
+        
+        if compressor:
+            self.data.write(compressor.flush())
+        
+        self.sha256 = content_hash.hexdigest()
+        self.compress_size = self.data.tell()
+        self.data.seek(0)
+        self.seconds = time.perf_counter() - start
+        return self
+
+def read_chunks(file_path: str):
+    """ফাইল বড় চাঙ্কে পড়ুন"""
+    with open(file_path, 'rb', buffering=0) as f:
+        while True:
+            chunk = f.read(IO_BUFFER_SIZE)
+            if not chunk:
+                break
+            yield chunk
+
+def compress_file(file_path: str, arcname: str, compress_type, file_class=None):
+    """ডিস্কের একটি ফাইল কমপ্রেস করুন (ওয়ার্কারে চলে)"""
+    stat = os.stat(file_path)
+    member = CompressedMember(arcname, compress_type, file_class)
+    member.mtime = stat.st_mtime
+    member.mode = stat.st_mode
+    member.feed(read_chunks(file_path))
+    
+    # ছোট ফাইলে কমপ্রেশন উল্টো বড় করলে STORED হিসেবে রাখুন
+    if compress_type != zipfile.ZIP_STORED and member.compress_size >= member.file_size \
+            and member.file_size <= SPOOL_MAX_SIZE:
+        member.data.close()
+        stored = CompressedMember(arcname, zipfile.ZIP_STORED, file_class)
+        stored.mtime = member.mtime
+        stored.mode = member.mode
+        stored.feed(read_chunks(file_path))
+        stored.seconds += member.seconds
+        return stored
+    
+    return member
+
+class ParallelZipWriter:
+    """প্যারালাল কমপ্রেশন, ইনপুটের ক্রমে লেখা zip রাইটার"""
+    
+    def __init__(self, path: str, max_workers=None):
+        self.path = path
+        self.max_workers = max_workers or min(8, os.cpu_count() or 1)
+        self.out = HashingFile(path)
+        self.central = []
+        self.members: Dict[str, CompressedMember] = {}
+    
+    def write_member(self, member: CompressedMember):
+        """কমপ্রেস করা মেম্বার আর্কাইভে লিখুন"""
+        name = member.arcname.replace(os.sep, "/").encode('utf-8')
+        offset = self.out.tell()
+        member.offset = offset
+        
+        flags = FLAG_UTF8
+        if member.compress_type == zipfile.ZIP_LZMA:
+            flags |= FLAG_LZMA_EOS
+        
+        zip64 = member.file_size >= ZIP64_LIMIT or member.compress_size >= ZIP64_LIMIT
+        if member.compress_type == zipfile.ZIP_LZMA:
+            version = 63
+        elif zip64 or offset >= ZIP64_LIMIT:
+            version = 45
+        else:
+            version = 20
+        
+        date, dos_time = dos_datetime(member.mtime)
+        
+        extra = b""
+        file_size, compress_size = member.file_size, member.compress_size
+        if zip64:
+            extra = struct.pack("<HHQQ", 1, 16, file_size, compress_size)
+            file_size = compress_size = ZIP64_LIMIT
+        
+        self.out.write(FILE_HEADER.pack(
+            b"PK\003\004", version, 0, flags, member.compress_type, dos_time, date,
+            member.crc, compress_size, file_size, len(name), len(extra)
+        ))
+        self.out.write(name)
+        self.out.write(extra)
+        
+        while True:
+            chunk = member.data.read(IO_BUFFER_SIZE)
+            if not chunk:
+                break
+            self.out.write(chunk)
+        member.data.close()
+        
+        self.central.append((name, member, offset, flags, version, date, dos_time))
+        self.members[member.arcname] = member
+    
+    def write_files(self, entries: Iterable[Tuple[str, str]],
+                    choose: Callable[[str], Tuple[Optional[str], int]]):
+        """(file_path, arcname) গুলো প্যারালালে কমপ্রেস করে ক্রমানুসারে লিখুন
+        
+        choose(file_path) -> (file_class, compress_type), ওয়ার্কারে চলে।
+        """
+        def work(entry):
+            file_path, arcname = entry
+            file_class, compress_type = choose(file_path)
+            return compress_file(file_path, arcname, compress_type, file_class)
+        
+        # সীমিত উইন্ডো - ধীর ডিস্কে অসীম কমপ্রেসড ডেটা জমে না
+        window = collections.deque()
+        try:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers,
+                                                       thread_name_prefix='ZipCompress') as executor:
+                try:
+                    for entry in entries:
+                        window.append(executor.submit(work, entry))
+                        if len(window) >= self.max_workers * 2:
+                            self.write_member(window.popleft().result())
+                    
+                    while window:
+                        self.write_member(window.popleft().result())
+                except BaseException:
+                    # বাকি কাজ আর শুরু হবে না
+                    for future in window:
+                        future.cancel()
+                    raise
+        except BaseException:
+            # ইতিমধ্যে কমপ্রেস হওয়া কিন্তু না লেখা মেম্বারের টেম্প ফাইল ছেড়ে দিন
+            for future in window:
+                if not future.cancelled() and future.exception() is None:
+                    future.result().data.close()
+            raise
+    
+    def writestr(self, arcname: str, data, compress_type=zipfile.ZIP_DEFLATED):
+        """মেমোরির ডেটা মেম্বার হিসেবে লিখুন"""
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        member = CompressedMember(arcname, compress_type)
+        self.write_member(member.feed([data]))
+    
+    def abort(self):
+        """অসম্পূর্ণ আর্কাইভ বন্ধ করে মুছে ফেলুন"""
+        self.out.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+    
+    def close(self):
+        """সেন্ট্রাল ডিরেক্টরি লিখে বন্ধ করুন - আর্কাইভের SHA-256 রিটার্ন করে"""
+        cd_offset = self.out.tell()
+        
+        for name, member, offset, flags, version, date, dos_time in self.central:
+            extra_values = []
+            file_size, compress_size, header_offset = member.file_size, member.compress_size, offset
+            if file_size >= ZIP64_LIMIT:
+                extra_values.append(file_size)
+                file_size = ZIP64_LIMIT
+            if compress_size >= ZIP64_LIMIT:
+                extra_values.append(compress_size)
+                compress_size = ZIP64_LIMIT
+            if header_offset >= ZIP64_LIMIT:
+                extra_values.append(header_offset)
+                header_offset = ZIP64_LIMIT
+            
+            extra = b""
+            if extra_values:
+                extra = struct.pack(f"<HH{len(extra_values)}Q", 1, 8 * len(extra_values), *extra_values)
+                version = max(version, 45)
+            
+            self.out.write(CENTRAL_DIR.pack(
+                b"PK\001\002", version, 3, version, 0, flags, member.compress_type,
+                dos_time, date, member.crc, compress_size, file_size,
+                len(name), len(extra), 0, 0, 0, (member.mode & 0xFFFF) << 16, header_offset
+            ))
+            self.out.write(name)
+            self.out.write(extra)
+        
+        cd_size = self.out.tell() - cd_offset
+        count = len(self.central)
+        
+        if count >= ZIP_FILECOUNT_LIMIT or cd_offset >= ZIP64_LIMIT or cd_size >= ZIP64_LIMIT:
+            eocd64_offset = self.out.tell()
+            self.out.write(END_ARCHIVE64.pack(
+                b"PK\006\006", 44, 45, 45, 0, 0, count, count, cd_size, cd_offset
+            ))
+            self.out.write(END_ARCHIVE64_LOCATOR.pack(b"PK\006\007", 0, eocd64_offset, 1))
+            count = min(count, ZIP_FILECOUNT_LIMIT)
+            cd_size = min(cd_size, ZIP64_LIMIT)
+            cd_offset = min(cd_offset, ZIP64_LIMIT)
+        
+        self.out.write(END_ARCHIVE.pack(b"PK\005\006", 0, 0, count, count, cd_size, cd_offset, 0))
+        self.out.close()
+        return self.out.hexdigest()
+
+def extract_member(zipf: zipfile.ZipFile, info: zipfile.ZipInfo, target_dir: str):
+    """একটি মেম্বার স্ট্রিম করে লিখুন - CRC না মিললে BadZipFile, আধা-লেখা ফাইল থাকে না"""
+    target = os.path.realpath(os.path.join(target_dir, info.filename))
+    root = os.path.join(os.path.realpath(target_dir), "")
+    if not target.startswith(root):
+        raise ValueError(f"Unsafe member path: {info.filename}")
+    
+    if info.is_dir():
+        os.makedirs(target, exist_ok=True)
+        return target
+    
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    tmp_target = target + ".part"
+    try:
+        # ZipExtFile শেষ পর্যন্ত পড়লে CRC যাচাই করে
+        with zipf.open(info) as source, open(tmp_target, 'wb', buffering=IO_BUFFER_SIZE) as dest:
+            shutil.copyfileobj(source, dest, IO_BUFFER_SIZE)
+        os.replace(tmp_target, target)
+    except BaseException:
+        if os.path.exists(tmp_target):
+            os.remove(tmp_target)
+        raise
+    
+    return target
+
+def index_entry(member: CompressedMember):
+    """মেম্বার ইনডেক্সের একটি এন্ট্রি"""
+    return {
+        "offset": member.offset,
+        "size": member.file_size,
+        "compress_size": member.compress_size,
+        "compress_type": member.compress_type,
+        "crc": member.crc,
+        "sha256": member.sha256,
+        "mtime": member.mtime
+    }
+
+def index_from_zip(archive_path: str):
+    """ইনডেক্স ছাড়া পুরানো আর্কাইভের সেন্ট্রাল ডিরেক্টরি থেকে ইনডেক্স"""
+    index = {}
+    with zipfile.ZipFile(archive_path, 'r') as zipf:
+        for info in zipf.infolist():
+            if info.is_dir():
+                continue
+            index[info.filename] = {
+                "offset": info.header_offset,
+                "size": info.file_size,
+                "compress_size": info.compress_size,
+                "compress_type": info.compress_type,
+                "crc": info.CRC,
+                "sha256": None,
+                "mtime": time.mktime(info.date_time + (0, 0, -1))
+            }
+    return index
+
+def new_decompressor(compress_type):
+    """ডিকমপ্রেসর - STORED হলে None"""
+    if compress_type == zipfile.ZIP_DEFLATED:
+        return zlib.decompressobj(-15)
+    if compress_type == zipfile.ZIP_LZMA:
+        return zipfile.LZMADecompressor()
+    if compress_type == zipfile.ZIP_STORED:
+        return None
+    raise ValueError(f"Unsupported compression: {compress_type}")
+
+def read_member_at(f, entry: Dict):
+    """ইনডেক্সের অফসেট থেকে সরাসরি মেম্বার পড়ুন (সেন্ট্রাল ডিরেক্টরি লাগে না)"""
+    f.seek(entry["offset"])
+    header = f.read(FILE_HEADER.size)
+    if len(header) != FILE_HEADER.size or header[:4] != b"PK\003\004":
+        raise zipfile.BadZipFile(f"Bad local header at offset {entry['offset']}")
+    name_len, extra_len = FILE_HEADER.unpack(header)[-2:]
+    f.seek(name_len + extra_len, os.SEEK_CUR)
+    
+    decompressor = new_decompressor(entry["compress_type"])
+    remaining = entry["compress_size"]
+    while remaining > 0:
+        data = f.read(min(IO_BUFFER_SIZE, remaining))
+        if not data:
+            raise zipfile.BadZipFile("Truncated member data")
+        remaining -= len(data)
+        out = decompressor.decompress(data) if decompressor else data
+        if out:
+            yield out
+    
+    if decompressor is not None and entry["compress_type"] == zipfile.ZIP_DEFLATED:
+        tail = decompressor.flush()
+        if tail:
+            yield tail
+
+def extract_indexed(archive_path: str, arcname: str, entry: Dict, target_dir: str):
+    """একটি মেম্বার স্ট্রিম করে লিখুন - CRC ও (থাকলে) SHA-256 যাচাই সহ"""
+    target = os.path.realpath(os.path.join(target_dir, arcname))
+    if not target.startswith(os.path.join(os.path.realpath(target_dir), "")):
+        raise ValueError(f"Unsafe member path: {arcname}")
+    
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    tmp_target = target + ".part"
+    
+    crc = 0
+    size = 0
+    content_hash = hashlib.sha256() if entry.get("sha256") else None
+    try:
+        with open(archive_path, 'rb') as f, open(tmp_target, 'wb', buffering=IO_BUFFER_SIZE) as dest:
+            for chunk in read_member_at(f, entry):
+                crc = zlib.crc32(chunk, crc)
+                size += len(chunk)
+                if content_hash is not None:
+                    content_hash.update(chunk)
+                dest.write(chunk)
+        
+        if crc != entry["crc"] or size != entry["size"]:
+            raise zipfile.BadZipFile(f"Bad CRC-32 for file {arcname!r}")
+        if content_hash is not None and content_hash.hexdigest() != entry["sha256"]:
+            raise zipfile.BadZipFile(f"SHA-256 mismatch for file {arcname!r}")
+        
+        os.replace(tmp_target, target)
+        if entry.get("mtime"):
+            os.utime(target, (entry["mtime"], entry["mtime"]))
+    except BaseException:
+        if os.path.exists(tmp_target):
+            os.remove(tmp_target)
+        raise
+    
+    return target
@@ -5,34 +5,115 @@
 
 import os
 import sys
+import json
 import time
+import queue
 import psutil
+import functools
+import itertools
 import threading
+import numpy as np
 import concurrent.futures
+from collections import Counter
 from typing import Dict, List, Optional
 from datetime import datetime
 
+from config_loader import get_config
+from adaptive_limiter import all_limiters
+from metrics import SCALER_DECISIONS, POOL_WORKERS, QUEUE_DEPTH
+
+# প্রতিটি মেট্রিকের কতগুলো শেষ স্যাম্পল রাখা হবে
+HISTORY_SIZE = 100
+
+class MetricRing:
+    """নির্দিষ্ট সাইজের NumPy রিং বাফার - একজন লেখক (স্যাম্পলার থ্রেড)
+    
+    লিস্টের মতো প্রতি টিকে স্লাইস/কপি হয় না; পুরনো স্যাম্পল জায়গায়ই ওভাররাইট হয়।
+    """
+    
+    def __init__(self, capacity=HISTORY_SIZE):
+        self.capacity = capacity
+        self.values = np.zeros(capacity, dtype=np.float64)
+        self.times = np.zeros(capacity, dtype=np.float64)
+        self.count = 0
+    
+    def append(self, timestamp: float, value: float):
+        """স্যাম্পল যোগ করুন"""
+        position = self.count % self.capacity
+        self.values[position] = value
+        self.times[position] = timestamp
+        self.count += 1
+    
+    def window(self):
+        """পুরনো থেকে নতুন ক্রমে (times, values)"""
+        if self.count <= self.capacity:
+            return self.times[:self.count], self.values[:self.count]
+        
+        start = self.count % self.capacity
+        order = np.r_[start:self.capacity, 0:start]
+        return self.times[order], self.values[order]
+    
+    def stats(self):
+        """রোলিং mean, p95 ও প্রতি সেকেন্ডে পরিবর্তনের হার"""
+        times, values = self.window()
+        if len(values) == 0:
+            return {'latest': 0.0, 'mean': 0.0, 'p95': 0.0, 'rate': 0.0}
+        
+        elapsed = times[-1] - times[0]
+        return {
+            'latest': float(values[-1]),
+            'mean': float(values.mean()),
+            'p95': float(np.percentile(values, 95)),
+            'rate': float((values[-1] - values[0]) / elapsed) if elapsed > 0 else 0.0
+        }
+
 class ResourceMonitor:
-    """রিসোর্স মনিটর ক্লাস"""
+    """রিসোর্স মনিটর ক্লাস
+    
+    স্যাম্পলার থ্রেড psutil পড়ে রিং বাফারে লেখে এবং প্রতি টিকে একটি নতুন
+    snapshot dict প্রকাশ করে (অ্যাট্রিবিউট অ্যাসাইনমেন্ট, লক লাগে না)।
+    get_current_metrics/is_overloaded শুধু সেই snapshot পড়ে - কোনো সিস্টেম কল নেই।
+    """
     
-    def __init__(self):
+    def __init__(self, history_size=HISTORY_SIZE, network_threshold=100 * 1024 * 1024,
+                 disk_threshold=200 * 1024 * 1024, disk_busy_threshold=90):
         self.cpu_threshold = 80  # 80% CPU usage
         self.memory_threshold = 80  # 80% memory usage
-        self.network_threshold = 1000000  # 1MB/s
+        self.network_threshold = network_threshold  # bytes/s, যেকোনো এক দিকে
+        self.disk_threshold = disk_threshold  # bytes/s, read + write
+        self.disk_busy_threshold = disk_busy_threshold  # % সময় ডিস্ক ব্যস্ত (Linux)
         
         self.metrics = {
-            'cpu_usage': [],
-            'memory_usage': [],
-            'network_io': [],
-            'disk_io': []
+            key: MetricRing(history_size) for key in (
+                'cpu_usage', 'memory_usage',
+                'net_sent_bps', 'net_recv_bps',
+                'disk_read_bps', 'disk_write_bps', 'disk_read_iops', 'disk_write_iops',
+                'disk_busy_percent',
+                'process_read_bps', 'process_write_bps'
+            )
         }
         
+        # আগের স্যাম্পলের কাউন্টার - rate = delta / সময়
+        self.last_counters = None
+        try:
+            self.process = psutil.Process(os.getpid())
+            self.process.io_counters()
+        except (AttributeError, psutil.Error):
+            # macOS এ প্রসেস io_counters নেই
+            self.process = None
+        
+        self.snapshot = None
         self.monitoring = False
         self.monitor_thread = None
+        self.stop_event = threading.Event()
     
     def start_monitoring(self, interval=5):
         """মনিটরিং শুরু করুন"""
+        # cpu_percent(interval=None) আগের কল থেকে হিসাব করে - প্রথম স্যাম্পল এখনই
+        self.sample()
+        
         self.monitoring = True
+        self.stop_event.clear()
         self.monitor_thread = threading.Thread(
             target=self._monitor_loop,
             args=(interval,),
@@ -41,37 +122,97 @@ class ResourceMonitor:
         self.monitor_thread.start()
     
     def _monitor_loop(self, interval):
-        """মনিটরিং লুপ"""
-        while self.monitoring:
-            # CPU usage
-            cpu_percent = psutil.cpu_percent(interval=1)
-            self.metrics['cpu_usage'].append(cpu_percent)
-            
-            # Memory usage
-            memory = psutil.virtual_memory()
-            self.metrics['memory_usage'].append(memory.percent)
-            
-            # Network I/O
-            net_io = psutil.net_io_counters()
-            self.metrics['network_io'].append({
-                'bytes_sent': net_io.bytes_sent,
-                'bytes_recv': net_io.bytes_recv
-            })
-            
-            # Keep only last 100 readings
-            for key in self.metrics:
-                if len(self.metrics[key]) > 100:
-                    self.metrics[key] = self.metrics[key][-100:]
-            
-            time.sleep(interval)
+        """মনিটরিং লুপ - ব্লকিং cpu_percent(interval=1) ছাড়া"""
+        while not self.stop_event.wait(interval):
+            self.sample()
     
-    def get_current_metrics(self):
-        """কারেন্ট মেট্রিক্স পান"""
-        return {
-            'cpu': psutil.cpu_percent(),
-            'memory': psutil.virtual_memory().percent,
-            'timestamp': datetime.now().isoformat()
+    def read_counters(self):
+        """নেটওয়ার্ক, ডিস্ক ও প্রসেসের ক্রমবর্ধমান কাউন্টার"""
+        counters = {}
+        
+        net_io = psutil.net_io_counters()
+        if net_io is not None:
+            counters['net_sent_bps'] = net_io.bytes_sent
+            counters['net_recv_bps'] = net_io.bytes_recv
+        
+        disk_io = psutil.disk_io_counters()
+        if disk_io is not None:
+            counters['disk_read_bps'] = disk_io.read_bytes
+            counters['disk_write_bps'] = disk_io.write_bytes
+            counters['disk_read_iops'] = disk_io.read_count
+            counters['disk_write_iops'] = disk_io.write_count
+            if hasattr(disk_io, 'busy_time'):
+                # মিলিসেকেন্ড -> rate কে 10 দিয়ে ভাগ করলে % (নিচে)
+                counters['disk_busy_percent'] = disk_io.busy_time / 10
+        
+        if self.process is not None:
+            try:
+                process_io = self.process.io_counters()
+                counters['process_read_bps'] = process_io.read_bytes
+                counters['process_write_bps'] = process_io.write_bytes
+            except psutil.Error:
+                pass
+        
+        return counters
+    
+    def sample(self):
+        """একটি স্যাম্পল নিন এবং নতুন snapshot প্রকাশ করুন"""
+        now = time.time()
+        
+        # CPU usage (শেষ কল থেকে এখন পর্যন্ত, ব্লক করে না)
+        self.metrics['cpu_usage'].append(now, psutil.cpu_percent(interval=None))
+        
+        # Memory usage
+        self.metrics['memory_usage'].append(now, psutil.virtual_memory().percent)
+        
+        # I/O - আগের স্যাম্পল থেকে এই ইন্টারভালের rate
+        counters = self.read_counters()
+        if self.last_counters is not None:
+            last_time, last_counters = self.last_counters
+            elapsed = now - last_time
+            if elapsed > 0:
+                for key, value in counters.items():
+                    if key in last_counters:
+                        # কাউন্টার রিসেট হলে ঋণাত্মক delta বাদ
+                        self.metrics[key].append(now, max(0, value - last_counters[key]) / elapsed)
+        self.last_counters = (now, counters)
+        
+        stats = {key: ring.stats() for key, ring in self.metrics.items()}
+        latest = {key: value['latest'] for key, value in stats.items()}
+        self.snapshot = {
+            'cpu': latest['cpu_usage'],
+            'memory': latest['memory_usage'],
+            'network': {'sent_bps': latest['net_sent_bps'], 'recv_bps': latest['net_recv_bps']},
+            'disk': {
+                'read_bps': latest['disk_read_bps'],
+                'write_bps': latest['disk_write_bps'],
+                'read_iops': latest['disk_read_iops'],
+                'write_iops': latest['disk_write_iops'],
+                'busy_percent': latest['disk_busy_percent']
+            },
+            'process': {'read_bps': latest['process_read_bps'], 'write_bps': latest['process_write_bps']},
+            'saturated': self.saturated_resources(latest),
+            'timestamp': datetime.fromtimestamp(now).isoformat(),
+            'stats': stats
         }
+        return self.snapshot
+    
+    def saturated_resources(self, latest: Dict[str, float]):
+        """থ্রেশহোল্ড পার হওয়া I/O রিসোর্স ('network', 'disk')"""
+        saturated = []
+        if max(latest['net_sent_bps'], latest['net_recv_bps']) >= self.network_threshold:
+            saturated.append('network')
+        if (latest['disk_read_bps'] + latest['disk_write_bps'] >= self.disk_threshold or
+                latest['disk_busy_percent'] >= self.disk_busy_threshold):
+            saturated.append('disk')
+        return saturated
+    
+    def get_current_metrics(self):
+        """কারেন্ট মেট্রিক্স পান - সর্বশেষ snapshot (মনিটরিং না চললে একবার স্যাম্পল)"""
+        snapshot = self.snapshot
+        if snapshot is None:
+            snapshot = self.sample()
+        return snapshot
     
     def is_overloaded(self):
         """ওভারলোডেড কি না চেক করুন"""
@@ -83,6 +224,10 @@ class ResourceMonitor:
         
         return False
     
+    def is_io_saturated(self):
+        """নেটওয়ার্ক বা ডিস্ক স্যাচুরেটেড কি না - বেশি থ্রেড দিলে শুধু কিউ লম্বা হয়"""
+        return bool(self.get_current_metrics()['saturated'])
+    
     def get_optimal_thread_count(self, base_threads=4):
         """অপটিমাল থ্রেড কাউন্ট পান"""
         metrics = self.get_current_metrics()
@@ -103,34 +248,122 @@ class ResourceMonitor:
     def stop_monitoring(self):
         """মনিটরিং বন্ধ করুন"""
         self.monitoring = False
+        self.stop_event.set()
         if self.monitor_thread:
             self.monitor_thread.join(timeout=5)
 
+# টাস্ক ক্লাস - net: HTTP/API কল, cpu: PIL এনকোড/রিসাইজ, disk: ফাইল লেখা
+TASK_CLASSES = ('net', 'cpu', 'disk')
+
+class PoolState:
+    """একটি নামযুক্ত পুলের স্কেলিং সীমা ও মেট্রিক্স"""
+    
+    def __init__(self, name, base_workers, min_workers=1, max_workers=None, use_processes=False):
+        self.name = name
+        self.base_workers = max(1, base_workers)
+        self.min_workers = min_workers
+        self.max_workers = max_workers or self.base_workers
+        self.current_workers = self.base_workers
+        self.use_processes = use_processes
+        
+        self.lock = threading.Lock()
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.pending = 0
+        self.mean_seconds = 0.0  # সাবমিট থেকে শেষ পর্যন্ত সময়ের EWMA
+    
+    def clamp(self, workers):
+        return max(self.min_workers, min(self.max_workers, workers))
+    
+    def task_submitted(self):
+        with self.lock:
+            self.submitted += 1
+            self.pending += 1
+    
+    def task_finished(self, seconds, success=True):
+        with self.lock:
+            self.pending -= 1
+            self.completed += 1
+            if not success:
+                self.failed += 1
+            self.mean_seconds = seconds if self.completed == 1 else 0.9 * self.mean_seconds + 0.1 * seconds
+    
+    def report(self):
+        """পুলের মেট্রিক্স"""
+        return {
+            'kind': 'process' if self.use_processes else 'thread',
+            'base_workers': self.base_workers,
+            'current_workers': self.current_workers,
+            'max_workers': self.max_workers,
+            'submitted': self.submitted,
+            'completed': self.completed,
+            'failed': self.failed,
+            'pending': self.pending,
+            'mean_task_seconds': round(self.mean_seconds, 4)
+        }
+
 class AutoScaler:
-    """অটো স্কেলার ক্লাস"""
+    """অটো স্কেলার ক্লাস
     
-    def __init__(self, base_workers=4):
+    net, cpu ও disk - তিনটি নামযুক্ত পুল, প্রতিটির নিজস্ব নীতি:
+        net  - অনেক থ্রেড; কিউ লম্বা হলে বাড়ে, NIC স্যাচুরেটেড হলে কমে
+        cpu  - প্রায় কোর সংখ্যার সমান (ইচ্ছা করলে প্রসেস); শুধু মেমরি চাপে কমে
+        disk - কয়েকটি থ্রেড; ডিস্ক স্যাচুরেটেড হলে কমে
+    current_workers/base_workers হলো net পুলের (আগের একক পুলের আচরণ)।
+    """
+    
+    def __init__(self, base_workers=4, cpu_workers=None, io_workers=2, cpu_processes=False):
         self.resource_monitor = ResourceMonitor()
-        self.base_workers = base_workers
-        self.current_workers = base_workers
+        cpu_workers = cpu_workers or os.cpu_count() or 1
+        self.pools = {
+            'net': PoolState('net', base_workers, max_workers=base_workers * 4),
+            'cpu': PoolState('cpu', cpu_workers, use_processes=cpu_processes),
+            'disk': PoolState('disk', io_workers, max_workers=io_workers * 2)
+        }
+        self.policies = {
+            'net': self.net_policy,
+            'cpu': self.cpu_policy,
+            'disk': self.disk_policy
+        }
         self.scaling_enabled = True
         self.scaling_history = []
+        self.resize_listeners = {name: [] for name in self.pools}
         
         # Start monitoring
         self.resource_monitor.start_monitoring()
     
-    def adjust_workers(self, current_queue_size=0):
-        """ওয়ার্কার্স অ্যাডজাস্ট করুন"""
-        if not self.scaling_enabled:
-            return self.current_workers
-        
+    @property
+    def base_workers(self):
+        return self.pools['net'].base_workers
+    
+    @property
+    def current_workers(self):
+        return self.pools['net'].current_workers
+    
+    @current_workers.setter
+    def current_workers(self, workers):
+        self.pools['net'].current_workers = workers
+    
+    def pool(self, task_class='net'):
+        """টাস্ক ক্লাসের পুল"""
+        if task_class not in self.pools:
+            raise ValueError(f"Unknown task class: {task_class} (expected one of {', '.join(self.pools)})")
+        return self.pools[task_class]
+    
+    def add_resize_listener(self, callback, task_class='net'):
+        """পুলের ওয়ার্কার সংখ্যা বদলালে callback(new_workers) ডাকা হবে"""
+        self.resize_listeners[self.pool(task_class).name].append(callback)
+    
+    def net_policy(self, pool, current_queue_size):
+        """নেটওয়ার্ক পুল - কিউ ও CPU/মেমরি/NIC দেখে"""
         # Get optimal thread count
-        optimal_threads = self.resource_monitor.get_optimal_thread_count(self.base_workers)
+        optimal_threads = self.resource_monitor.get_optimal_thread_count(pool.base_workers)
         
         # Adjust based on queue size
         if current_queue_size > 100:
             # Large queue, increase workers
-            optimal_threads = min(optimal_threads * 2, self.base_workers * 4)
+            optimal_threads = min(optimal_threads * 2, pool.max_workers)
         elif current_queue_size < 10:
             # Small queue, decrease workers
             optimal_threads = max(1, optimal_threads // 2)
@@ -140,21 +373,57 @@ class AutoScaler:
             # Reduce workers if overloaded
             optimal_threads = max(1, optimal_threads // 2)
         
+        # NIC স্যাচুরেটেড হলে বাড়ানো নয়, এক-চতুর্থাংশ কমান
+        if 'network' in self.resource_monitor.get_current_metrics()['saturated']:
+            optimal_threads = max(1, min(optimal_threads, pool.current_workers * 3 // 4))
+        
+        return optimal_threads
+    
+    def cpu_policy(self, pool, current_queue_size):
+        """CPU পুল - কোর সংখ্যা; CPU ব্যস্ত থাকাই স্বাভাবিক, তাই শুধু মেমরি চাপে কমে"""
+        if self.resource_monitor.get_current_metrics()['memory'] > self.resource_monitor.memory_threshold:
+            return max(1, pool.base_workers // 2)
+        return pool.base_workers
+    
+    def disk_policy(self, pool, current_queue_size):
+        """ডিস্ক পুল - কিউ জমলে একটু বাড়ে, ডিস্ক স্যাচুরেটেড হলে কমে"""
+        if 'disk' in self.resource_monitor.get_current_metrics()['saturated']:
+            return max(1, pool.current_workers // 2)
+        if current_queue_size > pool.current_workers * 4:
+            return pool.current_workers + 1
+        if current_queue_size < pool.current_workers:
+            # কিউ প্রায় খালি হলে ধীরে base এ ফেরা
+            return max(pool.base_workers, pool.current_workers - 1)
+        return pool.current_workers
+    
+    def adjust_workers(self, current_queue_size=0, task_class='net'):
+        """ওয়ার্কার্স অ্যাডজাস্ট করুন"""
+        pool = self.pool(task_class)
+        if not self.scaling_enabled:
+            return pool.current_workers
+        
+        optimal_threads = pool.clamp(self.policies[pool.name](pool, current_queue_size))
+        
         # Update current workers
-        old_workers = self.current_workers
-        self.current_workers = optimal_threads
+        old_workers = pool.current_workers
+        pool.current_workers = optimal_threads
         
         # Record scaling event
         if old_workers != optimal_threads:
-            self.record_scaling_event(old_workers, optimal_threads)
-            print(f"Auto-scaling: {old_workers} -> {optimal_threads} workers")
+            self.record_scaling_event(old_workers, optimal_threads, pool.name)
+            print(f"Auto-scaling [{pool.name}]: {old_workers} -> {optimal_threads} workers")
+            SCALER_DECISIONS.inc(pool=pool.name, direction='up' if optimal_threads > old_workers else 'down')
+            POOL_WORKERS.set(optimal_threads, pool=pool.name)
+            for callback in self.resize_listeners[pool.name]:
+                callback(optimal_threads)
         
         return optimal_threads
     
-    def record_scaling_event(self, old_count, new_count):
+    def record_scaling_event(self, old_count, new_count, pool='net'):
         """স্কেলিং ইভেন্ট রেকর্ড করুন"""
         event = {
             'timestamp': datetime.now().isoformat(),
+            'pool': pool,
             'old_workers': old_count,
             'new_workers': new_count,
             'metrics': self.resource_monitor.get_current_metrics()
@@ -172,10 +441,13 @@ class AutoScaler:
             return {}
         
         total_scales = len(self.scaling_history)
-        avg_workers = sum(event['new_workers'] for event in self.scaling_history) / total_scales
+        net_events = [event for event in self.scaling_history if event['pool'] == 'net']
+        avg_workers = (sum(event['new_workers'] for event in net_events) / len(net_events)
+                       if net_events else self.current_workers)
         
         return {
             'total_scaling_events': total_scales,
+            'events_by_pool': dict(Counter(event['pool'] for event in self.scaling_history)),
             'average_workers': avg_workers,
             'current_workers': self.current_workers,
             'last_scaling': self.scaling_history[-1] if self.scaling_history else None
@@ -190,7 +462,9 @@ class AutoScaler:
             'current_workers': self.current_workers,
             'resource_metrics': self.resource_monitor.get_current_metrics(),
             'scaling_stats': self.get_scaling_stats(),
-            'scaling_history_count': len(self.scaling_history)
+            'scaling_history_count': len(self.scaling_history),
+            'pools': {name: pool.report() for name, pool in self.pools.items()},
+            'concurrency_limits': {name: limiter.report() for name, limiter in all_limiters().items()}
         }
         
         return report
@@ -200,38 +474,229 @@ class AutoScaler:
         self.resource_monitor.stop_monitoring()
         self.scaling_enabled = False
 
+class ResizableThreadPool:
+    """চলন্ত অবস্থায় বড়/ছোট করা যায় এমন থ্রেড পুল
+    
+    ThreadPoolExecutor এর max_workers তৈরির পর বদলানো যায় না। এখানে resize()
+    সাথে সাথে নতুন থ্রেড চালু করে; কমালে বাড়তি থ্রেড হাতের টাস্ক শেষ করে
+    (অথবা কিউতে অপেক্ষারত অবস্থায় জেগে উঠে) অবসর নেয়। pending একটি কাউন্টার।
+    """
+    
+    def __init__(self, max_workers=4, thread_name_prefix='SmartWorker'):
+        self.thread_name_prefix = thread_name_prefix
+        self.queue = queue.SimpleQueue()
+        self.lock = threading.Lock()
+        self.threads = set()
+        self.thread_counter = itertools.count()
+        
+        self.target = 0
+        self.alive = 0
+        self.pending = 0  # সাবমিট হয়েছে কিন্তু শেষ হয়নি (চলমান সহ)
+        self.closed = False
+        
+        self.resize(max_workers)
+    
+    def submit(self, func, *args, **kwargs):
+        """টাস্ক সাবমিট করুন"""
+        if self.closed:
+            raise RuntimeError("cannot schedule new futures after shutdown")
+        
+        future = concurrent.futures.Future()
+        with self.lock:
+            self.pending += 1
+        self.queue.put((future, func, args, kwargs))
+        return future
+    
+    def resize(self, workers: int):
+        """ওয়ার্কার সংখ্যা বদলান"""
+        workers = max(1, int(workers))
+        with self.lock:
+            if self.closed:
+                return
+            self.target = workers
+            grow = workers - self.alive
+            if grow > 0:
+                self.alive += grow
+        
+        for _ in range(grow):
+            thread = threading.Thread(
+                target=self._worker,
+                name=f"{self.thread_name_prefix}_{next(self.thread_counter)}",
+                daemon=True
+            )
+            with self.lock:
+                self.threads.add(thread)
+            thread.start()
+        
+        # অপেক্ষারত থ্রেডগুলো জাগান, বাড়তি থাকলে তারা অবসর নেবে
+        for _ in range(-grow):
+            self.queue.put(None)
+    
+    def _retire_if_surplus(self):
+        """বাড়তি থ্রেড হলে অবসর - lock ধরে ডাকতে হবে"""
+        if self.alive > self.target or (self.closed and self.pending == 0):
+            self.alive -= 1
+            self.threads.discard(threading.current_thread())
+            if self.closed:
+                # শাটডাউনে সেন্টিনেল আগে পেয়ে আবার অপেক্ষায় থাকা থ্রেডকে জাগান
+                self.queue.put(None)
+            return True
+        return False
+    
+    def _worker(self):
+        """ওয়ার্কার লুপ"""
+        while True:
+            item = self.queue.get()
+            if item is None:
+                with self.lock:
+                    if self._retire_if_surplus():
+                        return
+                continue
+            
+            future, func, args, kwargs = item
+            if future.set_running_or_notify_cancel():
+                try:
+                    result = func(*args, **kwargs)
+                except BaseException as e:
+                    future.set_exception(e)
+                else:
+                    future.set_result(result)
+            
+            # শেষ হওয়া টাস্কের রেফারেন্স ধরে রাখবেন না
+            del item, future, func, args, kwargs
+            
+            with self.lock:
+                self.pending -= 1
+                if self._retire_if_surplus():
+                    return
+    
+    @property
+    def size(self):
+        """বর্তমানে জীবিত ওয়ার্কার"""
+        return self.alive
+    
+    def shutdown(self, wait=True):
+        """শাটডাউন করুন - কিউতে থাকা টাস্ক শেষ হবে"""
+        with self.lock:
+            self.closed = True
+            threads = list(self.threads)
+        
+        for _ in threads:
+            self.queue.put(None)
+        
+        if wait:
+            for thread in threads:
+                thread.join()
+
 class SmartThreadPool:
-    """স্মার্ট থ্রেড পুল ক্লাস"""
+    """স্মার্ট থ্রেড পুল ক্লাস
     
-    def __init__(self, auto_scaler=None):
-        self.auto_scaler = auto_scaler or AutoScaler()
-        self.executor = None
-        self.tasks = []
+    প্রতিটি টাস্কের task_class (net/cpu/disk) অনুযায়ী আলাদা পুলে যায়।
+    AutoScaler এর প্রতিটি সিদ্ধান্ত resize callback দিয়ে সেই পুলে পৌঁছায়
+    (প্রসেস পুলের সাইজ স্থির)। শুধু চলমান future গুলো রাখা হয়; শেষ হওয়া
+    টাস্কের ফলাফল পরের wait_completion পর্যন্ত থাকে, তারপর ছেড়ে দেওয়া হয়।
+    """
+    
+    def __init__(self, auto_scaler=None, config=None, adjust_interval=1.0):
+        if auto_scaler is None:
+            config = config or get_config()
+            concurrency = config.concurrency
+            auto_scaler = AutoScaler(
+                base_workers=concurrency['net_concurrency'],
+                cpu_workers=concurrency['cpu_workers'],
+                io_workers=concurrency['io_workers'],
+                cpu_processes=concurrency['cpu_processes']
+            )
+        self.auto_scaler = auto_scaler
+        for task_class in self.auto_scaler.pools:
+            self.auto_scaler.add_resize_listener(
+                lambda workers, task_class=task_class: self.resize(task_class, workers),
+                task_class
+            )
+        self.executors = {}
+        self.lock = threading.Lock()
+        self.task_done = threading.Condition(self.lock)
+        self.inflight = set()
+        self.finished = []
         self.results = []
+        self.submitted = 0
+        self.completed = 0
         self.running = False
         
-    def submit_task(self, func, *args, **kwargs):
-        """টাস্ক সাবমিট করুন"""
-        if not self.executor or self.executor._shutdown:
-            # Create new executor with current worker count
-            worker_count = self.auto_scaler.current_workers
-            self.executor = concurrent.futures.ThreadPoolExecutor(
-                max_workers=worker_count,
-                thread_name_prefix='SmartWorker'
-            )
-        
-        # Adjust workers based on queue size
-        pending_tasks = len([t for t in self.tasks if not t.done()])
-        self.auto_scaler.adjust_workers(pending_tasks)
+        # প্রতি সাবমিটে নয়, এত সেকেন্ডে একবার স্কেলিং (পুল অনুযায়ী)
+        self.adjust_interval = adjust_interval
+        self.last_adjust = {}
+    
+    @property
+    def executor(self):
+        """net পুলের executor"""
+        return self.executors.get('net')
+    
+    def resize(self, task_class: str, workers: int):
+        """AutoScaler এর resize callback"""
+        executor = self.executors.get(task_class)
+        if isinstance(executor, ResizableThreadPool) and not executor.closed:
+            executor.resize(workers)
+    
+    def get_executor(self, task_class: str):
+        """টাস্ক ক্লাসের executor (না থাকলে তৈরি)"""
+        executor = self.executors.get(task_class)
+        if isinstance(executor, ResizableThreadPool) and executor.closed:
+            executor = None
+        
+        if executor is None:
+            pool = self.auto_scaler.pool(task_class)
+            if pool.use_processes:
+                executor = concurrent.futures.ProcessPoolExecutor(max_workers=pool.current_workers)
+            else:
+                # Create new executor with current worker count
+                executor = ResizableThreadPool(
+                    max_workers=pool.current_workers,
+                    thread_name_prefix=f'SmartWorker-{task_class}'
+                )
+            self.executors[task_class] = executor
+        return executor
+    
+    def submit_task(self, func, *args, task_class='net', **kwargs):
+        """টাস্ক সাবমিট করুন - task_class: 'net', 'cpu' বা 'disk'"""
+        pool = self.auto_scaler.pool(task_class)
+        executor = self.get_executor(task_class)
+        
+        # Adjust workers based on queue size (O(1) কাউন্টার)
+        now = time.monotonic()
+        if now - self.last_adjust.get(task_class, 0.0) >= self.adjust_interval:
+            self.last_adjust[task_class] = now
+            QUEUE_DEPTH.set(pool.pending, queue=f'pool_{task_class}')
+            self.auto_scaler.adjust_workers(pool.pending, task_class)
         
         # Submit task
-        future = self.executor.submit(func, *args, **kwargs)
-        self.tasks.append(future)
+        pool.task_submitted()
+        future = executor.submit(func, *args, **kwargs)
+        with self.lock:
+            self.submitted += 1
+            self.inflight.add(future)
+        future.add_done_callback(functools.partial(self._task_done, pool, time.monotonic()))
         
         return future
     
+    def _task_done(self, pool, submitted_at, future):
+        """শেষ হওয়া future এর ফলাফল রাখুন এবং future ছেড়ে দিন"""
+        if future.cancelled():
+            record = {'success': False, 'error': 'cancelled'}
+        elif future.exception() is not None:
+            record = {'success': False, 'error': str(future.exception())}
+        else:
+            record = {'success': True, 'result': future.result()}
+        pool.task_finished(time.monotonic() - submitted_at, record['success'])
+        
+        with self.lock:
+            self.inflight.discard(future)
+            self.completed += 1
+            self.finished.append(record)
+            self.task_done.notify_all()
+    
     def submit_batch(self, tasks):
-        """ব্যাচ টাস্ক সাবমিট করুন"""
+        """ব্যাচ টাস্ক সাবমিট করুন - প্রতিটি টাস্কে ঐচ্ছিক 'task_class'"""
         futures = []
         
         for task in tasks:
@@ -239,6 +704,7 @@ class SmartThreadPool:
                 future = self.submit_task(
                     task['func'],
                     *task.get('args', []),
+                    task_class=task.get('task_class', 'net'),
                     **task.get('kwargs', {})
                 )
                 futures.append(future)
@@ -246,54 +712,53 @@ class SmartThreadPool:
         return futures
     
     def wait_completion(self, timeout=None):
-        """কমপ্লিশনের জন্য অপেক্ষা করুন"""
-        if not self.tasks:
-            return []
+        """কমপ্লিশনের জন্য অপেক্ষা করুন - আগের কলের পর শেষ হওয়া টাস্কের ফলাফল"""
+        with self.lock:
+            inflight = list(self.inflight)
         
         # Wait for completion
-        done, not_done = concurrent.futures.wait(
-            self.tasks,
-            timeout=timeout,
-            return_when=concurrent.futures.ALL_COMPLETED
-        )
+        done = set()
+        if inflight:
+            done, not_done = concurrent.futures.wait(
+                inflight,
+                timeout=timeout,
+                return_when=concurrent.futures.ALL_COMPLETED
+            )
         
-        # Collect results
-        self.results = []
-        for future in done:
-            try:
-                result = future.result(timeout=1)
-                self.results.append({
-                    'success': True,
-                    'result': result
-                })
-            except Exception as e:
-                self.results.append({
-                    'success': False,
-                    'error': str(e)
-                })
+        # Collect results (done callback শেষ হওয়া পর্যন্ত অপেক্ষা)
+        with self.task_done:
+            self.task_done.wait_for(lambda: self.inflight.isdisjoint(done))
+            self.results, self.finished = self.finished, []
         
         return self.results
     
     def get_stats(self):
         """স্ট্যাটস পান"""
-        if not self.executor:
+        if not self.executors:
             return {}
         
-        pending = len([t for t in self.tasks if not t.done()])
-        completed = len([t for t in self.tasks if t.done()])
+        pools = {}
+        for task_class, executor in self.executors.items():
+            pool = self.auto_scaler.pool(task_class)
+            pools[task_class] = dict(
+                pool.report(),
+                live_workers=executor.size if isinstance(executor, ResizableThreadPool) else pool.current_workers
+            )
         
         return {
-            'total_tasks': len(self.tasks),
-            'pending_tasks': pending,
-            'completed_tasks': completed,
+            'total_tasks': self.submitted,
+            'pending_tasks': sum(pool['pending'] for pool in pools.values()),
+            'completed_tasks': self.completed,
             'worker_count': self.auto_scaler.current_workers,
-            'executor_active': not self.executor._shutdown
+            'executor_active': bool(self.executors),
+            'pools': pools
         }
     
     def shutdown(self):
         """শাটডাউন করুন"""
-        if self.executor:
-            self.executor.shutdown(wait=True)
+        for executor in self.executors.values():
+            executor.shutdown(wait=True)
+        self.executors = {}
         self.auto_scaler.stop()
 
 # Usage example
@@ -8,36 +8,97 @@ import sys
 import json
 import shutil
 import zipfile
+import time
+import math
+import fnmatch
 import hashlib
+import concurrent.futures
+from collections import Counter
 from datetime import datetime
 from typing import List, Dict, Optional
 
+from archive_io import (ParallelZipWriter, extract_member, extract_indexed, index_entry,
+                        index_from_zip, IO_BUFFER_SIZE)
+from append_log import RecordLog, EventLog
+
+# আগেই কমপ্রেসড - আবার deflate করলে শুধু CPU খরচ, সাইজ কমে না
+STORED_EXTENSIONS = {'.png', '.jpg', '.jpeg', '.webp', '.gif', '.zip', '.gz', '.bz2', '.xz', '.7z', '.mp4', '.webm'}
+TEXT_EXTENSIONS = {'.json', '.jsonl', '.txt', '.csv', '.log', '.md', '.html', '.xml', '.yaml', '.yml'}
+
+# অজানা টাইপে প্রথম এত বাইটের entropy দেখে সিদ্ধান্ত
+ENTROPY_PROBE_SIZE = 4096
+ENTROPY_THRESHOLD = 7.5  # bits/byte
+
+TEXT_COMPRESSION = {
+    'deflate': zipfile.ZIP_DEFLATED,
+    'lzma': zipfile.ZIP_LZMA
+}
+
+def byte_entropy(data: bytes):
+    """Shannon entropy (bits/byte)"""
+    if not data:
+        return 0.0
+    total = len(data)
+    return -sum(count / total * math.log2(count / total) for count in Counter(data).values())
+
+def choose_compression(file_path: str, text_compression=zipfile.ZIP_DEFLATED):
+    """ফাইলের জন্য (class, compress_type)"""
+    ext = os.path.splitext(file_path)[1].lower()
+    if ext in STORED_EXTENSIONS:
+        return 'media', zipfile.ZIP_STORED
+    if ext in TEXT_EXTENSIONS:
+        return 'text', text_compression
+    
+    try:
+        with open(file_path, 'rb') as f:
+            probe = f.read(ENTROPY_PROBE_SIZE)
+    except OSError:
+        return 'other', zipfile.ZIP_DEFLATED
+    
+    if byte_entropy(probe) >= ENTROPY_THRESHOLD:
+        return 'other', zipfile.ZIP_STORED
+    return 'other', zipfile.ZIP_DEFLATED
+
 class BackupManager:
     """ব্যাকআপ ম্যানেজার ক্লাস"""
     
-    def __init__(self, backup_dir="backups"):
+    def __init__(self, backup_dir="backups", text_compression="deflate", max_workers=None):
         self.backup_dir = backup_dir
-        self.metadata_file = os.path.join(backup_dir, "backup_metadata.json")
+        self.text_compression = TEXT_COMPRESSION[text_compression]
+        self.max_workers = max_workers
+        self.last_archive_mb_per_sec = 0.0
+        self.metadata_file = os.path.join(backup_dir, "backup_metadata.jsonl")
         
         # Create backup directory
         os.makedirs(backup_dir, exist_ok=True)
         
-        # Load metadata
-        self.metadata = self.load_metadata()
+        # Load metadata - অ্যাপেন্ড-অনলি লগ, নাম অনুযায়ী ইনডেক্স মেমোরিতে
+        self.backups = self.load_metadata()
     
     def load_metadata(self):
-        """মেটাডাটা লোড করুন"""
-        if os.path.exists(self.metadata_file):
-            with open(self.metadata_file, 'r') as f:
-                return json.load(f)
-        return {"backups": []}
+        """মেটাডাটা লোড করুন (পুরনো backup_metadata.json একবার মাইগ্রেট হয়)"""
+        backups = RecordLog(self.metadata_file, key="name")
+        
+        legacy_file = os.path.join(self.backup_dir, "backup_metadata.json")
+        if os.path.exists(legacy_file):
+            with open(legacy_file, 'r') as f:
+                for backup in json.load(f).get("backups", []):
+                    if backup["name"] not in backups:
+                        backups.put(backup)
+            os.replace(legacy_file, legacy_file + ".bak")
+        
+        return backups
+    
+    @property
+    def metadata(self):
+        """পুরনো {"backups": [...]} আকারে মেটাডাটা"""
+        return {"backups": self.backups.values()}
     
     def save_metadata(self):
-        """মেটাডাটা সেভ করুন"""
-        with open(self.metadata_file, 'w') as f:
-            json.dump(self.metadata, f, indent=2)
+        """মেটাডাটা কমপ্যাক্ট করুন - প্রতিটি আপডেট লেখার সময়ই সেভ হয়"""
+        self.backups.compact()
     
-    def create_backup(self, source_dirs: List[str], backup_name: str = None):
+    def create_backup(self, source_dirs: List[str], backup_name: str = None, catalogue=None):
         """ব্যাকআপ তৈরি করুন"""
         
         if backup_name is None:
@@ -46,21 +107,74 @@ class BackupManager:
         
         backup_path = os.path.join(self.backup_dir, backup_name + ".zip")
         
-        # Create zip file
-        with zipfile.ZipFile(backup_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            total_files = 0
+        # Collect files
+        entries = []
+        for source_dir in source_dirs:
+            for file_path in self.list_source_files(source_dir, catalogue):
+                entries.append((file_path, os.path.relpath(file_path, start=source_dir)))
+        
+        total_files, compression, checksum = self.write_archive(backup_path, entries)
+        
+        return self.register_backup(backup_name, backup_path, total_files, source_dirs,
+                                    checksum=checksum, compression=compression)
+    
+    def write_archive(self, backup_path: str, entries, extra_members: Optional[Dict[str, str]] = None):
+        """(file_path, arcname) এন্ট্রি গুলো zip এ লিখুন - (ফাইল সংখ্যা, কমপ্রেশন স্ট্যাটস, SHA-256)
+        
+        মেম্বারগুলো ওয়ার্কার পুলে কমপ্রেস হয়, চেকসাম লেখার সময়ই হয়।
+        """
+        start = time.perf_counter()
+        writer = ParallelZipWriter(backup_path, max_workers=self.max_workers)
+        try:
+            writer.write_files(entries, lambda path: choose_compression(path, self.text_compression))
+            for arcname, content in (extra_members or {}).items():
+                writer.writestr(arcname, content)
+            checksum = writer.close()
+            elapsed = time.perf_counter() - start
             
-            for source_dir in source_dirs:
-                if os.path.exists(source_dir):
-                    for root, dirs, files in os.walk(source_dir):
-                        for file in files:
-                            file_path = os.path.join(root, file)
-                            arcname = os.path.relpath(file_path, start=source_dir)
-                            zipf.write(file_path, arcname)
-                            total_files += 1
-        
-        # Calculate checksum
-        checksum = self.calculate_checksum(backup_path)
+            # মেম্বার ইনডেক্স - সিলেক্টিভ রিস্টোর সরাসরি অফসেটে যায়
+            self.save_index(backup_path, {arcname: index_entry(member)
+                                          for arcname, member in writer.members.items()})
+        except BaseException:
+            # ইনডেক্স/মেটাডাটা ছাড়া অর্ধেক আর্কাইভ ব্যাকআপ ফোল্ডারে থাকবে না
+            writer.abort()
+            index_path = self.index_path_for(backup_path)
+            for path in (index_path, index_path + ".tmp"):
+                if os.path.exists(path):
+                    os.remove(path)
+            raise
+        
+        stats = {}
+        total_files = 0
+        for member in writer.members.values():
+            if member.file_class is None:
+                continue
+            class_stats = stats.setdefault(member.file_class, {'files': 0, 'bytes_in': 0, 'bytes_out': 0, 'seconds': 0.0})
+            class_stats['files'] += 1
+            class_stats['bytes_in'] += member.file_size
+            class_stats['bytes_out'] += member.compress_size
+            class_stats['seconds'] += member.seconds
+            total_files += 1
+        
+        # seconds = ওয়ার্কারদের মোট সময়, তাই MB/s প্রতি ওয়ার্কার হিসেবে
+        for class_stats in stats.values():
+            class_stats['ratio'] = (class_stats['bytes_out'] / class_stats['bytes_in']
+                                    if class_stats['bytes_in'] else 1.0)
+            class_stats['mb_per_sec'] = (class_stats['bytes_in'] / (1024 * 1024) / class_stats['seconds']
+                                         if class_stats['seconds'] > 0 else 0.0)
+        
+        total_bytes = sum(class_stats['bytes_in'] for class_stats in stats.values())
+        self.last_archive_mb_per_sec = total_bytes / (1024 * 1024) / elapsed if elapsed > 0 else 0.0
+        
+        return total_files, stats, checksum
+    
+    def register_backup(self, backup_name: str, backup_path: str, total_files: int,
+                        source_dirs: List[str], checksum: Optional[str] = None, **extra):
+        """ব্যাকআপ মেটাডাটায় যোগ করুন"""
+        
+        # Calculate checksum (write_archive লেখার সময়ই দিয়ে দেয়)
+        if checksum is None:
+            checksum = self.calculate_checksum(backup_path)
         
         # Update metadata
         backup_info = {
@@ -72,80 +186,187 @@ class BackupManager:
             "checksum": checksum,
             "source_dirs": source_dirs
         }
+        backup_info.update(extra)
         
-        self.metadata["backups"].append(backup_info)
-        self.save_metadata()
+        self.backups.put(backup_info)
         
         print(f"Backup created: {backup_name}")
         print(f"  Size: {backup_info['size_mb']:.2f} MB")
         print(f"  Files: {total_files}")
         print(f"  Path: {backup_path}")
+        if "compression" in backup_info:
+            print(f"  Throughput: {self.last_archive_mb_per_sec:.1f} MB/s")
+        for file_class, class_stats in sorted(backup_info.get("compression", {}).items()):
+            print(f"  {file_class}: {class_stats['files']} files, "
+                  f"ratio {class_stats['ratio']:.2f}, {class_stats['mb_per_sec']:.1f} MB/s")
         
         return backup_info
     
+    @staticmethod
+    def list_source_files(source_dir: str, catalogue=None):
+        """ব্যাকআপের ফাইল তালিকা - ক্যাটালগের আওতায় থাকলে ডিরেক্টরি না ঘুরে"""
+        if not os.path.exists(source_dir):
+            return []
+        
+        if catalogue is not None and catalogue.covers(source_dir):
+            return [path for path in catalogue.files_under(source_dir) if os.path.exists(path)]
+        
+        files = []
+        for root, dirs, filenames in os.walk(source_dir):
+            for file in filenames:
+                files.append(os.path.join(root, file))
+        return files
+    
     def calculate_checksum(self, filepath: str, algorithm="sha256"):
         """চেকসাম ক্যালকুলেট করুন"""
         hash_func = hashlib.new(algorithm)
         
         with open(filepath, 'rb') as f:
-            for chunk in iter(lambda: f.read(4096), b""):
+            for chunk in iter(lambda: f.read(IO_BUFFER_SIZE), b""):
                 hash_func.update(chunk)
         
         return hash_func.hexdigest()
     
     def list_backups(self):
         """ব্যাকআপ লিস্ট করুন"""
-        return self.metadata.get("backups", [])
+        return self.backups.values()
     
-    def restore_backup(self, backup_name: str, target_dir: str = "."):
-        """ব্যাকআপ রিস্টোর করুন"""
+    def restore_backup(self, backup_name: str, target_dir: str = ".", verify_archive=False):
+        """ব্যাকআপ রিস্টোর করুন (মেম্বার CRC স্ট্রিম করার সময় যাচাই হয়)"""
         
         # Find backup
-        backup_info = None
-        for backup in self.metadata["backups"]:
-            if backup["name"] == backup_name:
-                backup_info = backup
-                break
-        
+        backup_info = self.find_backup(backup_name)
         if not backup_info:
             raise ValueError(f"Backup not found: {backup_name}")
         
         backup_path = backup_info["path"]
         
-        # Verify checksum
-        current_checksum = self.calculate_checksum(backup_path)
-        if current_checksum != backup_info["checksum"]:
-            raise ValueError("Backup file corrupted: checksum mismatch")
+        # পুরো আর্কাইভের চেকসাম শুধু চাইলে - আলাদা একটি পূর্ণ রিড লাগে
+        if verify_archive:
+            current_checksum = self.calculate_checksum(backup_path)
+            if current_checksum != backup_info["checksum"]:
+                raise ValueError("Backup file corrupted: checksum mismatch")
         
         # Create target directory
         os.makedirs(target_dir, exist_ok=True)
         
         # Extract backup
-        with zipfile.ZipFile(backup_path, 'r') as zipf:
-            zipf.extractall(target_dir)
+        self.extract_archive(backup_path, target_dir)
         
         print(f"Backup restored: {backup_name} -> {target_dir}")
         
         return True
     
+    @staticmethod
+    def index_path_for(backup_path: str):
+        """আর্কাইভের মেম্বার ইনডেক্স ফাইল"""
+        return os.path.splitext(backup_path)[0] + ".index.json"
+    
+    def save_index(self, backup_path: str, index: Dict):
+        """মেম্বার ইনডেক্স সেভ করুন"""
+        index_path = self.index_path_for(backup_path)
+        tmp_path = index_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f)
+        os.replace(tmp_path, index_path)
+    
+    def load_index(self, backup_path: str):
+        """মেম্বার ইনডেক্স লোড করুন (পুরানো ব্যাকআপে একবার তৈরি করে সেভ)"""
+        index_path = self.index_path_for(backup_path)
+        if os.path.exists(index_path):
+            with open(index_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        
+        index = index_from_zip(backup_path)
+        self.save_index(backup_path, index)
+        return index
+    
+    def find_backup(self, backup_name: str):
+        """নাম দিয়ে ব্যাকআপ খুঁজুন"""
+        return self.backups.get(backup_name)
+    
+    def restore_plan(self, backup_name: str):
+        """রিস্টোরযোগ্য মেম্বার - {arcname: (archive_path, index entry)}"""
+        backup_info = self.find_backup(backup_name)
+        if not backup_info:
+            raise ValueError(f"Backup not found: {backup_name}")
+        
+        index = self.load_index(backup_info["path"])
+        return {arcname: (backup_info["path"], entry) for arcname, entry in index.items()}
+    
+    @staticmethod
+    def select_members(plan: Dict, paths: Optional[List[str]] = None, pattern: Optional[str] = None,
+                       date_from: Optional[datetime] = None, date_to: Optional[datetime] = None):
+        """paths (ফাইল বা ফোল্ডার), glob pattern ও mtime রেঞ্জ দিয়ে মেম্বার ফিল্টার"""
+        prefixes = tuple(path.rstrip("/") + "/" for path in paths) if paths else ()
+        exact = set(paths) if paths else set()
+        start = date_from.timestamp() if date_from else None
+        end = date_to.timestamp() if date_to else None
+        
+        selected = {}
+        for arcname, item in plan.items():
+            if paths and arcname not in exact and not arcname.startswith(prefixes):
+                continue
+            if pattern and not fnmatch.fnmatch(arcname, pattern):
+                continue
+            mtime = item[1].get("mtime") or 0
+            if (start is not None and mtime < start) or (end is not None and mtime > end):
+                continue
+            selected[arcname] = item
+        return selected
+    
+    def restore(self, backup_name: str, target_dir: str = ".", paths: Optional[List[str]] = None,
+                pattern: Optional[str] = None, date_from: Optional[datetime] = None,
+                date_to: Optional[datetime] = None, max_workers=None):
+        """নির্বাচিত মেম্বারগুলো প্যারালালে রিস্টোর করুন - রিস্টোর হওয়া ফাইল সংখ্যা রিটার্ন করে"""
+        plan = self.select_members(self.restore_plan(backup_name), paths, pattern, date_from, date_to)
+        
+        def work(item):
+            arcname, (archive_path, entry) = item
+            try:
+                return extract_indexed(archive_path, arcname, entry, target_dir)
+            except zipfile.BadZipFile as e:
+                raise ValueError(f"Backup file corrupted: {archive_path}: {e}")
+        
+        start = time.perf_counter()
+        total_bytes = sum(entry["size"] for _, entry in plan.values())
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers or self.max_workers) as executor:
+            list(executor.map(work, sorted(plan.items())))
+        elapsed = time.perf_counter() - start
+        
+        rate = total_bytes / (1024 * 1024) / elapsed if elapsed > 0 else 0
+        print(f"Restored {len(plan)} files from {backup_name} -> {target_dir} ({rate:.1f} MB/s)")
+        return len(plan)
+    
+    def extract_archive(self, backup_path: str, target_dir: str, skip=()):
+        """আর্কাইভ এক পাসে এক্সট্র্যাক্ট করুন - CRC না মিললে ValueError"""
+        with zipfile.ZipFile(backup_path, 'r') as zipf:
+            for info in zipf.infolist():
+                if info.filename in skip:
+                    continue
+                try:
+                    extract_member(zipf, info, target_dir)
+                except zipfile.BadZipFile as e:
+                    raise ValueError(f"Backup file corrupted: {backup_path}: {e}")
+    
     def delete_backup(self, backup_name: str):
         """ব্যাকআপ ডিলিট করুন"""
         
         # Find and remove backup
-        for i, backup in enumerate(self.metadata["backups"]):
-            if backup["name"] == backup_name:
-                # Delete file
-                if os.path.exists(backup["path"]):
-                    os.remove(backup["path"])
-                
-                # Remove from metadata
-                self.metadata["backups"].pop(i)
-                self.save_metadata()
-                
-                print(f"Backup deleted: {backup_name}")
-                return True
-        
-        return False
+        backup = self.find_backup(backup_name)
+        if backup is None:
+            return False
+        
+        # Delete file
+        for path in (backup["path"], self.index_path_for(backup["path"])):
+            if os.path.exists(path):
+                os.remove(path)
+        
+        # Remove from metadata
+        self.backups.delete(backup_name)
+        
+        print(f"Backup deleted: {backup_name}")
+        return True
     
     def auto_cleanup(self, max_backups=10, max_age_days=30):
         """অটো ক্লিনআপ করুন"""
@@ -156,120 +377,367 @@ class BackupManager:
         # Sort by creation date (newest first)
         backups.sort(key=lambda x: x["created_at"], reverse=True)
         
-        deleted_count = 0
+        deleted = set()
         
         for backup in backups[max_backups:]:
             # Delete if too many backups
-            self.delete_backup(backup["name"])
-            deleted_count += 1
+            if self.delete_backup(backup["name"]):
+                deleted.add(backup["name"])
         
         # Check age
         for backup in backups:
-            if deleted_count >= len(backups) - max_backups:
+            if len(deleted) >= len(backups) - max_backups:
                 break
+            if backup["name"] in deleted:
+                continue
             
             created_date = datetime.fromisoformat(backup["created_at"])
             age_days = (now - created_date).days
             
-            if age_days > max_age_days:
-                self.delete_backup(backup["name"])
-                deleted_count += 1
+            if age_days > max_age_days and self.delete_backup(backup["name"]):
+                deleted.add(backup["name"])
         
-        return deleted_count
+        # শুধু সত্যিই মুছে যাওয়া ব্যাকআপ গোনা হয়
+        return len(deleted)
 
 class IncrementalBackup(BackupManager):
-    """ইনক্রিমেন্টাল ব্যাকআপ ক্লাস"""
+    """ইনক্রিমেন্টাল ব্যাকআপ ক্লাস
     
-    def __init__(self, backup_dir="backups"):
-        super().__init__(backup_dir)
-        self.change_log = os.path.join(backup_dir, "change_log.json")
-        self.last_backup_time = None
-        
-        # Load change log
-        self.changes = self.load_change_log()
+    প্রথম আর্কাইভে (base) সব ফাইল থাকে, পরেরগুলোতে শুধু বদলানো ফাইল ও
+    মুছে যাওয়া ফাইলের তালিকা। প্রতিটি ফাইলের (size, mtime, hash) state
+    ফাইলে থাকে, তাই নতুন প্রসেসও জানে কী বদলেছে। রিস্টোর base থেকে
+    শুরু করে চেইনের ইনক্রিমেন্টগুলো পরপর প্রয়োগ করে।
+    """
+    
+    DELETED_MEMBER = ".deleted.json"
+    
+    def __init__(self, backup_dir="backups", text_compression="deflate", max_workers=None,
+                 max_chain_length=7):
+        super().__init__(backup_dir, text_compression, max_workers)
+        # চেইন এত লম্বা হলে পরের ব্যাকআপ নতুন base - পুরনো চেইন তখন পুরোটা মোছা যায়
+        self.max_chain_length = max_chain_length
+        self.change_log = os.path.join(backup_dir, "change_log.jsonl")
+        self.state_file = os.path.join(backup_dir, "incremental_state.json")
+        
+        # Load per-file state and change log
+        self.state = self.load_state()
+        self.change_events = self.load_change_log()
+        
+        times = [source["last_backup_time"] for source in self.state.values()]
+        self.last_backup_time = max(times) if times else None
     
     def load_change_log(self):
-        """চেঞ্জ লগ লোড করুন"""
-        if os.path.exists(self.change_log):
-            with open(self.change_log, 'r') as f:
-                return json.load(f)
-        return {"changes": []}
+        """চেঞ্জ লগ লোড করুন (পুরনো change_log.json একবার মাইগ্রেট হয়)"""
+        events = EventLog(self.change_log, group="backup")
+        
+        legacy_file = os.path.join(self.backup_dir, "change_log.json")
+        if os.path.exists(legacy_file):
+            with open(legacy_file, 'r') as f:
+                events.extend(json.load(f).get("changes", []))
+            os.replace(legacy_file, legacy_file + ".bak")
+        
+        return events
+    
+    @property
+    def changes(self):
+        """পুরো চেঞ্জ লগ পুরনো {"changes": [...]} আকারে (ফাইল পড়ে)"""
+        return {"changes": list(self.change_events)}
     
     def save_change_log(self):
-        """চেঞ্জ লগ সেভ করুন"""
-        with open(self.change_log, 'w') as f:
-            json.dump(self.changes, f, indent=2)
+        """চেঞ্জ লগ কমপ্যাক্ট করুন - মুছে যাওয়া ব্যাকআপের এন্ট্রি বাদ"""
+        return self.change_events.compact(lambda name: name in self.backups)
+    
+    def load_state(self):
+        """সোর্স অনুযায়ী ফাইল state লোড করুন"""
+        if os.path.exists(self.state_file):
+            with open(self.state_file, 'r') as f:
+                return json.load(f)
+        return {}
     
-    def detect_changes(self, source_dir: str):
-        """পরিবর্তন ডিটেক্ট করুন"""
+    def save_state(self):
+        """state সেভ করুন (অর্ধেক লেখা ফাইল যেন না থাকে)"""
+        tmp_file = self.state_file + ".tmp"
+        with open(tmp_file, 'w') as f:
+            json.dump(self.state, f)
+        os.replace(tmp_file, self.state_file)
+    
+    @staticmethod
+    def scan_source(source_dir: str):
+        """সোর্সের সব ফাইল - {relpath: (path, size, mtime_ns)}"""
+        files = {}
+        stack = [source_dir]
+        while stack:
+            current = stack.pop()
+            with os.scandir(current) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file():
+                        stat = entry.stat()
+                        rel = os.path.relpath(entry.path, source_dir).replace(os.sep, "/")
+                        files[rel] = (entry.path, stat.st_size, stat.st_mtime_ns)
+        return files
+    
+    def detect_changes(self, source_dir: str, previous: Optional[Dict] = None):
+        """পরিবর্তন ডিটেক্ট করুন - (changes, deleted, নতুন state)"""
+        if previous is None:
+            previous = self.state.get(os.path.abspath(source_dir), {}).get("files", {})
         
         changes = []
+        current = {}
+        
+        for rel, (file_path, size, mtime) in sorted(self.scan_source(source_dir).items()):
+            old = previous.get(rel)
+            
+            # size ও mtime একই হলে আবার হ্যাশ করা লাগে না
+            if old and old[0] == size and old[1] == mtime:
+                current[rel] = old
+                continue
+            
+            file_hash = self.calculate_checksum(file_path)
+            current[rel] = [size, mtime, file_hash]
+            
+            # শুধু touch হয়েছে, কনটেন্ট একই
+            if old and old[2] == file_hash:
+                continue
+            
+            changes.append({
+                "path": file_path,
+                "arcname": rel,
+                "status": "modified" if old else "added",
+                "modified": datetime.fromtimestamp(mtime / 1e9).isoformat(),
+                "size": size,
+                "hash": file_hash
+            })
+        
+        deleted = sorted(rel for rel in previous if rel not in current)
+        return changes, deleted, current
+    
+    def create_incremental_backup(self, source_dir: str, full=False):
+        """ইনক্রিমেন্টাল ব্যাকআপ তৈরি করুন (full=True বা base না থাকলে নতুন base)"""
         
-        for root, dirs, files in os.walk(source_dir):
-            for file in files:
-                file_path = os.path.join(root, file)
-                
-                # Get file stats
-                stat = os.stat(file_path)
-                modified_time = stat.st_mtime
-                
-                # Check if modified since last backup
-                if (self.last_backup_time is None or 
-                    modified_time > self.last_backup_time):
-                    
-                    changes.append({
-                        "path": file_path,
-                        "modified": datetime.fromtimestamp(modified_time).isoformat(),
-                        "size": stat.st_size
-                    })
-        
-        return changes
-    
-    def create_incremental_backup(self, source_dir: str):
-        """ইনক্রিমেন্টাল ব্যাকআপ তৈরি করুন"""
+        source_key = os.path.abspath(source_dir)
+        source_state = self.state.get(source_key, {})
+        
+        # আগের আর্কাইভ মুছে গেলে চেইন ভাঙা - নতুন base শুরু করুন
+        parent = source_state.get("last_backup")
+        if full or (parent and self.find_backup(parent) is None):
+            parent = None
+        elif parent and len(self.backup_chain(parent)) >= self.max_chain_length:
+            print(f"Backup chain reached {self.max_chain_length} archives, starting a new base")
+            parent = None
         
         # Detect changes
-        changes = self.detect_changes(source_dir)
+        changes, deleted, current = self.detect_changes(
+            source_dir, previous=source_state.get("files", {}) if parent else {}
+        )
         
-        if not changes:
+        if parent and not changes and not deleted:
             print("No changes detected since last backup")
+            source_state["files"] = current
+            self.save_state()
             return None
         
         # Create backup name
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        backup_name = f"incremental_{timestamp}"
-        
-        # Create backup
-        backup_info = self.create_backup([source_dir], backup_name)
-        
-        # Record changes
-        self.changes["changes"].extend(changes)
-        self.save_change_log()
+        backup_name = f"{'incremental' if parent else 'base'}_{timestamp}"
+        suffix = 1
+        while self.find_backup(backup_name) is not None:
+            suffix += 1
+            backup_name = f"{'incremental' if parent else 'base'}_{timestamp}_{suffix}"
+        backup_path = os.path.join(self.backup_dir, backup_name + ".zip")
         
-        # Update last backup time
+        # শুধু বদলানো ফাইল, মুছে যাওয়া ফাইলের তালিকা আলাদা মেম্বারে
+        total_files, compression, checksum = self.write_archive(
+            backup_path,
+            [(change["path"], change["arcname"]) for change in changes],
+            {self.DELETED_MEMBER: json.dumps(deleted)} if deleted else None
+        )
+        
+        backup_info = self.register_backup(
+            backup_name, backup_path, total_files, [source_dir],
+            checksum=checksum,
+            compression=compression,
+            backup_type="incremental" if parent else "base",
+            parent=parent,
+            deleted_count=len(deleted)
+        )
+        
+        # Record changes - শুধু নতুন লাইন যোগ হয়
+        for change in changes:
+            change.pop("arcname")
+            change["backup"] = backup_name
+        self.change_events.extend(changes)
+        
+        # Update state
         self.last_backup_time = datetime.now().timestamp()
+        self.state[source_key] = {
+            "last_backup": backup_name,
+            "last_backup_time": self.last_backup_time,
+            "files": current
+        }
+        self.save_state()
         
-        print(f"Incremental backup created with {len(changes)} changed files")
+        print(f"Incremental backup created with {len(changes)} changed and {len(deleted)} deleted files")
         
         return backup_info
+    
+    def backup_chain(self, backup_name: str):
+        """base থেকে এই ব্যাকআপ পর্যন্ত আর্কাইভের তালিকা"""
+        chain = []
+        name = backup_name
+        while name:
+            backup = self.find_backup(name)
+            if backup is None:
+                raise ValueError(f"Backup chain broken: {name} not found")
+            chain.append(backup)
+            name = backup.get("parent")
+        
+        chain.reverse()
+        return chain
+    
+    def restore_backup(self, backup_name: str, target_dir: str = ".", verify_archive=False):
+        """ব্যাকআপ রিস্টোর করুন - ইনক্রিমেন্টাল হলে base থেকে পুরো চেইন"""
+        chain = self.backup_chain(backup_name)
+        
+        # চাইলে শুরুর আগেই সব আর্কাইভের চেকসাম
+        if verify_archive:
+            for backup in chain:
+                if self.calculate_checksum(backup["path"]) != backup["checksum"]:
+                    raise ValueError(f"Backup file corrupted: checksum mismatch in {backup['name']}")
+        
+        os.makedirs(target_dir, exist_ok=True)
+        
+        for backup in chain:
+            self.extract_archive(backup["path"], target_dir, skip={self.DELETED_MEMBER})
+            
+            with zipfile.ZipFile(backup["path"], 'r') as zipf:
+                if self.DELETED_MEMBER in zipf.namelist():
+                    for rel in json.loads(zipf.read(self.DELETED_MEMBER)):
+                        file_path = os.path.join(target_dir, rel)
+                        if os.path.exists(file_path):
+                            os.remove(file_path)
+        
+        print(f"Backup restored: {backup_name} ({len(chain)} archive(s)) -> {target_dir}")
+        
+        return True
+    
+    def restore_plan(self, backup_name: str):
+        """চেইনের শেষ অবস্থা - পরের আর্কাইভ আগেরটাকে ওভাররাইড করে, মুছে যাওয়া ফাইল বাদ"""
+        plan = {}
+        for backup in self.backup_chain(backup_name):
+            index = self.load_index(backup["path"])
+            for arcname, entry in index.items():
+                if arcname != self.DELETED_MEMBER:
+                    plan[arcname] = (backup["path"], entry)
+            
+            if self.DELETED_MEMBER in index:
+                with zipfile.ZipFile(backup["path"], 'r') as zipf:
+                    for rel in json.loads(zipf.read(self.DELETED_MEMBER)):
+                        plan.pop(rel, None)
+        return plan
+    
+    def restore_point_in_time(self, source_dir: str, when: datetime, target_dir: str = "."):
+        """একটি সোর্সকে নির্দিষ্ট সময়ের অবস্থায় রিস্টোর করুন"""
+        source_key = os.path.abspath(source_dir)
+        candidates = [
+            backup for backup in self.backups.values()
+            if backup.get("backup_type") and
+            os.path.abspath(backup["source_dirs"][0]) == source_key and
+            datetime.fromisoformat(backup["created_at"]) <= when
+        ]
+        if not candidates:
+            raise ValueError(f"No backup of {source_dir} at or before {when.isoformat()}")
+        
+        latest = max(candidates, key=lambda backup: backup["created_at"])
+        return self.restore_backup(latest["name"], target_dir)
+    
+    def delete_backup(self, backup_name: str, force=False):
+        """ব্যাকআপ ডিলিট করুন - অন্য ইনক্রিমেন্ট এর উপর নির্ভর করলে force লাগবে"""
+        dependents = [backup["name"] for backup in self.backups.values()
+                      if backup.get("parent") == backup_name]
+        if dependents and not force:
+            print(f"Backup {backup_name} is needed by {', '.join(dependents)}, not deleted")
+            return False
+        
+        return super().delete_backup(backup_name)
+    
+    def chains(self):
+        """base ও তার সব ইনক্রিমেন্ট এক একটি চেইন - নতুন restore point এর চেইন আগে"""
+        backups = self.list_backups()
+        children = {}
+        roots = []
+        for backup in backups:
+            parent = backup.get("parent")
+            if parent and parent in self.backups:
+                children.setdefault(parent, []).append(backup)
+            else:
+                roots.append(backup)
+        
+        chains = []
+        for root in roots:
+            chain = [root]
+            for backup in chain:
+                chain.extend(children.get(backup["name"], []))
+            chains.append(chain)
+        
+        chains.sort(key=lambda chain: max(backup["created_at"] for backup in chain), reverse=True)
+        return chains
+    
+    def auto_cleanup(self, max_backups=10, max_age_days=30):
+        """অটো ক্লিনআপ - পুরো চেইন ধরে, পুরনোটা আগে (ইনক্রিমেন্ট আলাদা করে মোছা যায় না)
+        
+        সবচেয়ে নতুন চেইন ও যেসব চেইনে কোনো সোর্সের শেষ ব্যাকআপ আছে সেগুলো থাকে।
+        শেষে চেঞ্জ লগ কমপ্যাক্ট হয়।
+        """
+        now = datetime.now()
+        active = {source.get("last_backup") for source in self.state.values()}
+        
+        kept = 0
+        deleted_count = 0
+        for position, chain in enumerate(self.chains()):
+            names = {backup["name"] for backup in chain}
+            newest = max(datetime.fromisoformat(backup["created_at"]) for backup in chain)
+            expired = kept + len(chain) > max_backups or (now - newest).days > max_age_days
+            
+            if position == 0 or not expired or names & active:
+                kept += len(chain)
+                continue
+            
+            # ইনক্রিমেন্ট আগে, base শেষে - যাতে কোনোটার dependents না থাকে
+            for backup in sorted(chain, key=lambda backup: backup["created_at"], reverse=True):
+                if self.delete_backup(backup["name"]):
+                    deleted_count += 1
+        
+        if deleted_count:
+            self.save_change_log()
+        return deleted_count
 
 # ইউটিলিটি ফাংশন
 def backup_images_daily():
     """দৈনিক ইমেজ ব্যাকআপ"""
     manager = BackupManager()
     
-    # Source directories
-    sources = [
-        "outputs/images",
-        "outputs/metadata",
-        "prompts"
-    ]
+    # Source directories - লেআউট থেকে, যাতে base_dir/শার্ডিং কনফিগ মানা হয়
+    from config_loader import get_config
+    from output_layout import OutputLayout
+    from catalogue import Catalogue
+    from blob_store import BlobStore
+    
+    config = get_config()
+    sources = OutputLayout.from_config(config).backup_sources() + ["prompts"]
+    catalogue = Catalogue.from_config(config)
     
-    # Create backup
-    manager.create_backup(sources)
+    # Create snapshot - শুধু নতুন/বদলানো ডেটা স্টোরে যায়
+    store = BlobStore(os.path.join(manager.backup_dir, "store"))
+    try:
+        store.create_snapshot(sources, catalogue=catalogue)
+    finally:
+        if catalogue is not None:
+            catalogue.close()
     
-    # Auto cleanup old backups
-    manager.auto_cleanup(max_backups=7, max_age_days=7)
+    # Auto cleanup old snapshots (রেফকাউন্ট শূন্য হওয়া ব্লব মুছে যায়)
+    store.expire(max_snapshots=7, max_age_days=7)
     
     print("Daily backup completed")
 
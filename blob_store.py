@@ -0,0 +1,366 @@
+# mass_image_generator/blob_store.py
+"""
+ব্লব স্টোর - কনটেন্ট-অ্যাড্রেসড ডিডুপ্লিকেটিং ব্যাকআপ
+
+লেআউট (backups/store এর নিচে):
+    blobs/3f/3fa2...        SHA-256 নামে কনটেন্ট (টেক্সট চাঙ্ক zlib করা, নাম .z)
+    snapshots/<name>.json   প্রতিটি স্ন্যাপশটের ফাইল -> ব্লব তালিকা
+    refcounts.json          প্রতিটি ব্লব কয়টি স্ন্যাপশট রেফার করে
+
+ইমেজ পুরো ফাইল হিসেবে একটি ব্লব। টেক্সট ফাইল (প্রম্পট, মেটাডাটা) লাইনের
+কনটেন্ট দেখে চাঙ্কে ভাগ হয়, তাই প্রায়-একই প্রম্পট ফাইলের বেশিরভাগ চাঙ্ক
+আগের স্ন্যাপশটের সাথে শেয়ার হয়। আগের স্ন্যাপশটে একই size/mtime এর
+ফাইল আবার পড়া হয় না - ফলে সময় ও ডিস্ক শুধু নতুন ডেটার সমান।
+"""
+
+import os
+import json
+import zlib
+import hashlib
+import threading
+import concurrent.futures
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from backup_system import BackupManager, TEXT_EXTENSIONS
+
+# লাইন-ভিত্তিক চাঙ্কিং: গড়ে ~256 লাইন, সাইজ MIN..MAX এর মধ্যে
+CHUNK_BOUNDARY_MASK = 0xFF
+MIN_CHUNK_SIZE = 16 * 1024
+MAX_CHUNK_SIZE = 256 * 1024
+
+# বাইনারি ফাইল এর চেয়ে বড় হলে নির্দিষ্ট সাইজে ভাগ
+BINARY_CHUNK_SIZE = 4 * 1024 * 1024
+
+def text_chunks(file_path: str):
+    """কনটেন্ট-ডিফাইনড চাঙ্ক - বাউন্ডারি লাইনের হ্যাশ দিয়ে ঠিক হয়"""
+    chunk = []
+    size = 0
+    with open(file_path, 'rb') as f:
+        for line in f:
+            chunk.append(line)
+            size += len(line)
+            if size >= MAX_CHUNK_SIZE or (
+                    size >= MIN_CHUNK_SIZE and zlib.crc32(line) & CHUNK_BOUNDARY_MASK == 0):
+                yield b"".join(chunk)
+                chunk = []
+                size = 0
+    if chunk:
+        yield b"".join(chunk)
+
+def binary_chunks(file_path: str):
+    """বাইনারি ফাইল - ছোট হলে পুরোটা একটি চাঙ্ক"""
+    with open(file_path, 'rb') as f:
+        while True:
+            data = f.read(BINARY_CHUNK_SIZE)
+            if not data:
+                break
+            yield data
+
+class BlobStore:
+    """কনটেন্ট-অ্যাড্রেসড স্ন্যাপশট স্টোর"""
+    
+    def __init__(self, root="backups/store", max_workers=None):
+        self.root = root
+        self.blob_dir = os.path.join(root, "blobs")
+        self.snapshot_dir = os.path.join(root, "snapshots")
+        self.refcount_file = os.path.join(root, "refcounts.json")
+        self.max_workers = max_workers
+        
+        os.makedirs(self.blob_dir, exist_ok=True)
+        os.makedirs(self.snapshot_dir, exist_ok=True)
+        
+        self.refcounts = self.load_json(self.refcount_file, {})
+        self.lock = threading.Lock()
+    
+    @staticmethod
+    def load_json(path: str, default):
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        return default
+    
+    @staticmethod
+    def save_json(path: str, data):
+        """অ্যাটমিক JSON লেখা"""
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+    
+    def blob_path(self, blob_hash: str, compressed: bool):
+        return os.path.join(self.blob_dir, blob_hash[:2], blob_hash + (".z" if compressed else ""))
+    
+    def find_blob(self, blob_hash: str):
+        """ব্লবের পাথ ও কমপ্রেসড কি না, না থাকলে (None, False)"""
+        for compressed in (False, True):
+            path = self.blob_path(blob_hash, compressed)
+            if os.path.exists(path):
+                return path, compressed
+        return None, False
+    
+    def put_blob(self, data: bytes, compress: bool):
+        """ব্লব লিখুন (আগে থেকে থাকলে কিছু করে না) - (hash, নতুন লেখা বাইট)"""
+        blob_hash = hashlib.sha256(data).hexdigest()
+        if self.find_blob(blob_hash)[0] is not None:
+            return blob_hash, 0
+        
+        payload = data
+        if compress:
+            packed = zlib.compress(data, 6)
+            if len(packed) < len(data):
+                payload = packed
+            else:
+                compress = False
+        
+        path = self.blob_path(blob_hash, compress)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+        return blob_hash, len(payload)
+    
+    def read_blob(self, blob_hash: str):
+        """ব্লব পড়ুন ও হ্যাশ যাচাই করুন"""
+        path, compressed = self.find_blob(blob_hash)
+        if path is None:
+            raise ValueError(f"Missing blob: {blob_hash}")
+        
+        with open(path, 'rb') as f:
+            data = f.read()
+        if compressed:
+            data = zlib.decompress(data)
+        
+        if hashlib.sha256(data).hexdigest() != blob_hash:
+            raise ValueError(f"Corrupted blob: {blob_hash}")
+        return data
+    
+    def store_file(self, file_path: str):
+        """ফাইল চাঙ্ক করে স্টোরে রাখুন - (চাঙ্ক হ্যাশ, নতুন বাইট)"""
+        is_text = os.path.splitext(file_path)[1].lower() in TEXT_EXTENSIONS
+        chunks = text_chunks(file_path) if is_text else binary_chunks(file_path)
+        
+        hashes = []
+        new_bytes = 0
+        for data in chunks:
+            blob_hash, written = self.put_blob(data, compress=is_text)
+            hashes.append(blob_hash)
+            new_bytes += written
+        return hashes, new_bytes
+    
+    def list_snapshots(self):
+        """স্ন্যাপশটের নাম (created_at অনুযায়ী পুরানো থেকে নতুন)"""
+        return [name for _, name, _ in self.load_snapshots()]
+    
+    def load_snapshots(self):
+        """সব ম্যানিফেস্ট - (created_at, name, manifest), পুরানো থেকে নতুন
+        
+        নাম দিয়ে সাজানো যায় না: হাতে দেওয়া নাম বা একই সেকেন্ডের _2 সাফিক্স
+        তারিখের ক্রম ভাঙে।
+        """
+        snapshots = []
+        for filename in os.listdir(self.snapshot_dir):
+            if filename.endswith(".json"):
+                manifest = self.load_snapshot(filename[:-5])
+                snapshots.append((manifest["created_at"], filename[:-5], manifest))
+        snapshots.sort(key=lambda snapshot: snapshot[:2])
+        return snapshots
+    
+    def load_snapshot(self, name: str):
+        path = os.path.join(self.snapshot_dir, name + ".json")
+        if not os.path.exists(path):
+            raise ValueError(f"Snapshot not found: {name}")
+        return self.load_json(path, None)
+    
+    def create_snapshot(self, source_dirs: List[str], name: Optional[str] = None, catalogue=None):
+        """সোর্সগুলোর স্ন্যাপশট তৈরি করুন"""
+        started = datetime.now()
+        if name is None:
+            name = f"snapshot_{started.strftime('%Y%m%d_%H%M%S')}"
+            suffix = 1
+            while os.path.exists(os.path.join(self.snapshot_dir, name + ".json")):
+                suffix += 1
+                name = f"snapshot_{started.strftime('%Y%m%d_%H%M%S')}_{suffix}"
+        
+        # আগের স্ন্যাপশট থেকে (size, mtime) না বদলানো ফাইলের চাঙ্ক নেওয়া হয়
+        previous = {}
+        snapshots = self.load_snapshots()
+        if snapshots:
+            last = snapshots[-1][2]
+            for source_key, files in last["sources"].items():
+                for entry in files:
+                    previous[(source_key, entry["path"])] = entry
+        
+        manifest = {"name": name, "created_at": started.isoformat(), "sources": {}}
+        stats = {"files": 0, "reused": 0, "bytes": 0, "new_bytes": 0}
+        
+        def process(job):
+            source_key, rel, file_path, stat = job
+            old = previous.get((source_key, rel))
+            if old and old["size"] == stat.st_size and old["mtime"] == stat.st_mtime_ns:
+                return source_key, dict(old), 0, True
+            
+            hashes, new_bytes = self.store_file(file_path)
+            entry = {"path": rel, "size": stat.st_size, "mtime": stat.st_mtime_ns,
+                     "mode": stat.st_mode, "chunks": hashes}
+            return source_key, entry, new_bytes, False
+        
+        jobs = []
+        for source_dir in source_dirs:
+            if not os.path.isdir(source_dir):
+                continue
+            source_key = os.path.normpath(source_dir)
+            manifest["sources"][source_key] = []
+            for file_path in BackupManager.list_source_files(source_dir, catalogue):
+                rel = os.path.relpath(file_path, source_dir).replace(os.sep, "/")
+                jobs.append((source_key, rel, file_path, os.stat(file_path)))
+        
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for source_key, entry, new_bytes, reused in executor.map(process, jobs):
+                manifest["sources"][source_key].append(entry)
+                stats["files"] += 1
+                stats["reused"] += int(reused)
+                stats["bytes"] += entry["size"]
+                stats["new_bytes"] += new_bytes
+        
+        stats["seconds"] = (datetime.now() - started).total_seconds()
+        manifest["stats"] = stats
+        
+        # ব্লব লেখা শেষ হলে আগে রেফকাউন্ট, তারপর ম্যানিফেস্ট - মাঝে ক্র্যাশ হলে
+        # রেফকাউন্ট বেশি থাকে (gc ঠিক করে), কম কখনো নয় (তাতে জীবিত ব্লব মুছে যেত)
+        blobs = self.manifest_blobs(manifest)
+        with self.lock:
+            for blob_hash in blobs:
+                self.refcounts[blob_hash] = self.refcounts.get(blob_hash, 0) + 1
+            self.save_json(self.refcount_file, self.refcounts)
+        
+        try:
+            self.save_json(os.path.join(self.snapshot_dir, name + ".json"), manifest)
+        except BaseException:
+            with self.lock:
+                for blob_hash in blobs:
+                    self.refcounts[blob_hash] -= 1
+                self.save_json(self.refcount_file, self.refcounts)
+            raise
+        
+        print(f"Snapshot created: {name}")
+        print(f"  Files: {stats['files']} ({stats['reused']} unchanged)")
+        print(f"  New data: {stats['new_bytes'] / (1024 * 1024):.2f} MB "
+              f"of {stats['bytes'] / (1024 * 1024):.2f} MB in {stats['seconds']:.1f}s")
+        
+        return manifest
+    
+    @staticmethod
+    def manifest_blobs(manifest: Dict):
+        """একটি স্ন্যাপশটের আলাদা আলাদা ব্লব"""
+        return {blob_hash for files in manifest["sources"].values()
+                for entry in files for blob_hash in entry["chunks"]}
+    
+    @staticmethod
+    def restore_dir(source_key: str):
+        """সোর্সের রিস্টোর ফোল্ডার (target এর নিচে) - পুরো normalized পাথ, শুধু basename নয়
+        
+        তাই outputs/images ও archive/images আলাদা থাকে। absolute পাথের রুট ও
+        '..' অংশ বাদ যায়, যাতে target এর বাইরে কিছু না লেখা হয়।
+        """
+        drive, path = os.path.splitdrive(os.path.normpath(source_key))
+        parts = [part for part in path.replace("\\", "/").split("/") if part not in ("", ".", "..")]
+        return os.path.join(*parts) if parts else "."
+    
+    def restore_snapshot(self, name: str, target_dir: str = ".", paths: Optional[List[str]] = None):
+        """স্ন্যাপশট রিস্টোর করুন (paths দিলে শুধু সেই রিলেটিভ পাথগুলো)"""
+        manifest = self.load_snapshot(name)
+        wanted = set(paths) if paths else None
+        
+        jobs = []
+        for source_key, files in manifest["sources"].items():
+            for entry in files:
+                if wanted is None or entry["path"] in wanted:
+                    jobs.append((os.path.join(target_dir, self.restore_dir(source_key), entry["path"]), entry))
+        
+        def restore(job):
+            target, entry = job
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            tmp_target = target + ".part"
+            with open(tmp_target, 'wb') as f:
+                for blob_hash in entry["chunks"]:
+                    f.write(self.read_blob(blob_hash))
+            os.replace(tmp_target, target)
+            os.utime(target, ns=(entry["mtime"], entry["mtime"]))
+        
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            list(executor.map(restore, jobs))
+        
+        print(f"Snapshot restored: {name} ({len(jobs)} files) -> {target_dir}")
+        return len(jobs)
+    
+    def delete_snapshot(self, name: str):
+        """স্ন্যাপশট মুছুন ও রেফকাউন্ট শূন্য হওয়া ব্লব GC করুন"""
+        manifest = self.load_snapshot(name)
+        os.remove(os.path.join(self.snapshot_dir, name + ".json"))
+        
+        freed = 0
+        with self.lock:
+            for blob_hash in self.manifest_blobs(manifest):
+                count = self.refcounts.get(blob_hash, 0) - 1
+                if count > 0:
+                    self.refcounts[blob_hash] = count
+                    continue
+                
+                self.refcounts.pop(blob_hash, None)
+                path, _ = self.find_blob(blob_hash)
+                if path is not None:
+                    freed += os.path.getsize(path)
+                    os.remove(path)
+            self.save_json(self.refcount_file, self.refcounts)
+        
+        print(f"Snapshot deleted: {name} ({freed / (1024 * 1024):.2f} MB freed)")
+        return freed
+    
+    def expire(self, max_snapshots=7, max_age_days=7):
+        """পুরানো স্ন্যাপশট মুছুন - সবচেয়ে নতুনটি সবসময় থাকে"""
+        snapshots = self.load_snapshots()
+        cutoff = datetime.now() - timedelta(days=max_age_days)
+        
+        expired = []
+        for index, (created_at, name, _) in enumerate(snapshots[:-1]):
+            too_many = len(snapshots) - index > max_snapshots
+            if too_many or datetime.fromisoformat(created_at) < cutoff:
+                expired.append(name)
+        
+        if not expired:
+            return expired
+        
+        # মোছার আগে ম্যানিফেস্ট থেকে রেফকাউন্ট আবার গুনুন - আগের কোনো ক্র্যাশে
+        # refcounts.json পিছিয়ে থাকলেও জীবিত স্ন্যাপশটের ব্লব মুছবে না
+        refcounts = {}
+        for _, _, manifest in snapshots:
+            for blob_hash in self.manifest_blobs(manifest):
+                refcounts[blob_hash] = refcounts.get(blob_hash, 0) + 1
+        with self.lock:
+            self.refcounts = refcounts
+        
+        for name in expired:
+            self.delete_snapshot(name)
+        return expired
+    
+    def gc(self):
+        """সব ম্যানিফেস্ট থেকে রেফকাউন্ট আবার তৈরি করুন ও রেফার না হওয়া ব্লব মুছুন"""
+        refcounts = {}
+        for _, _, manifest in self.load_snapshots():
+            for blob_hash in self.manifest_blobs(manifest):
+                refcounts[blob_hash] = refcounts.get(blob_hash, 0) + 1
+        
+        removed = 0
+        for dirpath, dirnames, filenames in os.walk(self.blob_dir):
+            for filename in filenames:
+                blob_hash = filename.split(".")[0]
+                if blob_hash not in refcounts:
+                    os.remove(os.path.join(dirpath, filename))
+                    removed += 1
+        
+        with self.lock:
+            self.refcounts = refcounts
+            self.save_json(self.refcount_file, self.refcounts)
+        return removed
@@ -8,6 +8,7 @@ import sys
 import json
 import time
 import queue
+import hashlib
 import threading
 import concurrent.futures
 from datetime import datetime
@@ -18,8 +19,14 @@ from colorama import Fore, Style
 # Add parent directory to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from config_loader import AppConfig, get_config, add_concurrency_arguments, concurrency_overrides, describe_concurrency
 from multi_api_manager import APIManager
+from output_layout import OutputLayout
+from catalogue import Catalogue, image_info
+from metrics import IMAGES, BYTES_WRITTEN, QUEUE_DEPTH, add_metrics_arguments, start_from_args
+import tracing
 from utils.image_utils import ImageProcessor
+from utils.file_manager import FileManager
 
 class MassImageGenerator:
     """মাস ইমেজ জেনারেটর ক্লাস"""
@@ -28,10 +35,22 @@ class MassImageGenerator:
         self.prompt_file = prompt_file
         self.target_count = target_count
         self.config = config or self.load_default_config()
+        if not isinstance(self.config, AppConfig):
+            self.config = AppConfig(self.config)
+        self.concurrency = self.config.concurrency
         
         # ইনিশিয়ালাইজ ম্যানেজার
         self.api_manager = APIManager(config=self.config)
-        self.image_processor = ImageProcessor()
+        self.image_processor = ImageProcessor(max_workers=self.concurrency['cpu_workers'])
+        
+        # ডিস্কে লেখা আলাদা IO ওয়ার্কারে হয়, নেটওয়ার্ক থ্রেড আটকে থাকে না
+        io_workers = self.concurrency['io_workers']
+        self.io_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=io_workers,
+            thread_name_prefix='ImageWriter'
+        )
+        # ডিস্ক স্লো হলে মেমোরিতে অসীম ইমেজ জমা না হয়
+        self.pending_writes = threading.BoundedSemaphore(io_workers * 4)
         
         # ট্র্যাকিং ভেরিয়েবল
         self.generated_count = 0
@@ -44,26 +63,71 @@ class MassImageGenerator:
         self.lock = threading.Lock()
         self.running = True
         
+        # প্রায়-একই ইমেজ বাদ দেওয়ার ইনডেক্স (ঐচ্ছিক)
+        self.rejected_count = 0
+        self.similarity_index = None
+        self.setup_similarity_index()
+        
         # আউটপুট ডিরেক্টরি
         self.setup_output_directories()
         
+        # আউটপুট ক্যাটালগ - প্রতিটি লেখা ইমেজের রো
+        self.run_id = datetime.now().strftime('%Y%m%d_%H%M%S')
+        self.catalogue = Catalogue.from_config(self.config)
+    
     def load_default_config(self):
         """ডিফল্ট কনফিগারেশন লোড করুন"""
-        config_path = os.path.join(os.path.dirname(__file__), 'config.json')
-        with open(config_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return get_config()
     
     def setup_output_directories(self):
         """আউটপুট ডিরেক্টরি সেটআপ করুন"""
-        base_dir = self.config.get('output_settings', {}).get('base_dir', 'outputs')
+        self.layout = OutputLayout.from_config(self.config)
         
-        self.image_dir = os.path.join(base_dir, 'images', datetime.now().strftime('%Y%m%d'))
-        self.metadata_dir = os.path.join(base_dir, 'metadata', datetime.now().strftime('%Y%m%d'))
-        self.log_dir = os.path.join(base_dir, 'logs')
+        self.image_dir = self.layout.day_dir('images')
+        self.metadata_dir = self.layout.day_dir('metadata')
+        self.log_dir = os.path.join(self.layout.base_dir, 'logs')
         
         for directory in [self.image_dir, self.metadata_dir, self.log_dir]:
             os.makedirs(directory, exist_ok=True)
     
+    def setup_similarity_index(self):
+        """near-duplicate রিজেকশনের জন্য সিমিলারিটি ইনডেক্স লোড করুন"""
+        output_settings = self.config.get('output_settings', {})
+        if not output_settings.get('reject_near_duplicates', False):
+            return
+        
+        from similarity_index import SimilarityIndex
+        
+        self.near_duplicate_distance = output_settings.get('near_duplicate_distance', 3)
+        self.similarity_index = SimilarityIndex.from_config(self.config)
+    
+    def is_near_duplicate(self, image_data, filepath):
+        """আগের কোনো ইমেজের প্রায়-একই হলে True, না হলে পাথটি ইনডেক্সে রিজার্ভ হয়
+        
+        রিজার্ভেশন শুধু মেমোরিতে - সেভ সফল হলে commit_similarity, ব্যর্থ হলে
+        release_similarity, যাতে না লেখা ফাইল পরের ইমেজ বাদ না দেয়।
+        """
+        if self.similarity_index is None:
+            return False
+        
+        from similarity_index import hash_image_bytes
+        
+        value = hash_image_bytes(image_data, self.similarity_index.method)
+        matches = self.similarity_index.add_if_unique(
+            filepath, value, self.near_duplicate_distance, persist=False
+        )
+        return bool(matches)
+    
+    def commit_similarity(self, filepath, stat):
+        """সেভ হওয়া ইমেজের এন্ট্রি আসল size/mtime সহ ইনডেক্সে লিখুন"""
+        if self.similarity_index is not None:
+            self.similarity_index.persist(filepath, stat.st_size, stat.st_mtime_ns)
+    
+    def release_similarity(self, filepath):
+        """সেভ ব্যর্থ - রিজার্ভেশন বাতিল"""
+        if self.similarity_index is not None:
+            self.similarity_index.discard(filepath)
+    
     def load_prompts(self):
         """প্রম্পটস লোড করুন"""
         prompts = []
@@ -97,60 +161,158 @@ class MassImageGenerator:
     def generate_single_image(self, prompt, index):
         """একটি ইমেজ জেনারেট করুন"""
         
-        try:
-            # API থেকে ইমেজ জেনারেট করুন
-            image_data = self.api_manager.generate_image(prompt)
-            
-            if image_data:
-                # ফাইলনেম তৈরি করুন
-                timestamp = datetime.now().strftime('%H%M%S')
-                filename = f"image_{index:06d}_{timestamp}.png"
-                filepath = os.path.join(self.image_dir, filename)
-                
-                # ইমেজ সেভ করুন
-                self.image_processor.save_image(image_data, filepath)
-                
-                # মেটাডাটা সেভ করুন
-                metadata = {
-                    "prompt": prompt,
-                    "filename": filename,
-                    "generated_at": datetime.now().isoformat(),
-                    "api_used": self.api_manager.last_used_api,
-                    "index": index
-                }
+        with tracing.trace("generate_single_image", index=index):
+            try:
+                # API থেকে ইমেজ জেনারেট করুন
+                image_data = self.api_manager.generate_image(prompt)
                 
-                metadata_file = os.path.join(self.metadata_dir, f"meta_{index:06d}.json")
-                with open(metadata_file, 'w', encoding='utf-8') as f:
-                    json.dump(metadata, f, indent=2, ensure_ascii=False)
+                if image_data:
+                    api_used = self.api_manager.last_used_api
+                    
+                    # ডিস্কে লেখা IO ওয়ার্কারে পাঠান
+                    with tracing.span("wait_write_slot"):
+                        self.pending_writes.acquire()
+                    QUEUE_DEPTH.inc(queue='writes')
+                    future = self.io_executor.submit(
+                        tracing.bind(self.write_outputs), image_data, prompt, index, api_used
+                    )
+                    future.add_done_callback(self.write_done)
+                    
+                    return True
+                else:
+                    with self.lock:
+                        self.failed_count += 1
+                    IMAGES.inc(result='failed')
+                    return False
+            
+            except Exception as e:
+                # এরর লগ করুন
+                self.log_error(index, e)
                 
-                # সাফল্য রেকর্ড করুন
                 with self.lock:
-                    self.generated_count += 1
-                    self.update_progress()
+                    self.failed_count += 1
+                IMAGES.inc(result='failed')
                 
-                return True
-            else:
+                return False
+    
+    def write_done(self, future):
+        """লেখা শেষ - পরের ইমেজের জন্য জায়গা ছাড়ুন"""
+        QUEUE_DEPTH.dec(queue='writes')
+        self.pending_writes.release()
+    
+    @tracing.traced("write_outputs")
+    def write_outputs(self, image_data, prompt, index, api_used):
+        """ইমেজ ও মেটাডাটা সেভ করুন (IO ওয়ার্কারে চলে)"""
+        
+        reserved = None
+        try:
+            # ফাইলনেম তৈরি করুন
+            timestamp = datetime.now().strftime('%H%M%S')
+            filename = f"image_{index:06d}_{timestamp}.png"
+            content = image_data if isinstance(image_data, bytes) else None
+            filepath = self.layout.image_path(filename, content=content, index=index)
+            
+            # প্রায়-একই ইমেজ ডিস্কে লেখার (এবং ফোল্ডার তৈরির) আগেই বাদ দিন
+            with tracing.span("near_duplicate_check"):
+                duplicate = self.is_near_duplicate(image_data, filepath)
+            if duplicate:
                 with self.lock:
-                    self.failed_count += 1
+                    self.rejected_count += 1
+                IMAGES.inc(result='rejected')
                 return False
-                
+            reserved = filepath
+            
+            self.layout.ensure_parent(filepath)
+            
+            # ইমেজ সেভ করুন
+            self.image_processor.save_image(image_data, filepath)
+            stat = os.stat(filepath)
+            self.commit_similarity(filepath, stat)
+            reserved = None
+            BYTES_WRITTEN.inc(stat.st_size, kind='image')
+            
+            # মেটাডাটা সেভ করুন
+            metadata = {
+                "prompt": prompt,
+                "filename": filename,
+                "generated_at": datetime.now().isoformat(),
+                "api_used": api_used,
+                "index": index
+            }
+            
+            with tracing.span("metadata_write"):
+                metadata_file = self.layout.metadata_path(f"meta_{index:06d}.json", index=index)
+                self.layout.ensure_parent(metadata_file)
+                metadata_text = json.dumps(metadata, indent=2, ensure_ascii=False)
+                with open(metadata_file, 'w', encoding='utf-8') as f:
+                    f.write(metadata_text)
+            BYTES_WRITTEN.inc(len(metadata_text.encode('utf-8')), kind='metadata')
+            
+            with tracing.span("catalogue_record"):
+                self.record_in_catalogue(filepath, metadata_file, image_data, metadata)
+            
+            # সাফল্য রেকর্ড করুন
+            with self.lock:
+                self.generated_count += 1
+                self.update_progress()
+            IMAGES.inc(result='generated')
+            
+            return True
+        
         except Exception as e:
-            # এরর লগ করুন
-            error_log = os.path.join(self.log_dir, 'errors.log')
-            with open(error_log, 'a', encoding='utf-8') as f:
-                f.write(f"{datetime.now()} - Error generating image {index}: {str(e)}\n")
+            if reserved is not None:
+                self.release_similarity(reserved)
+            self.log_error(index, e)
             
             with self.lock:
                 self.failed_count += 1
+            IMAGES.inc(result='failed')
             
             return False
     
+    def record_in_catalogue(self, filepath, metadata_file, image_data, metadata):
+        """লেখা ইমেজ ক্যাটালগে যোগ করুন"""
+        if self.catalogue is None:
+            return
+        
+        stat = os.stat(filepath)
+        if isinstance(image_data, bytes):
+            file_hash = hashlib.blake2b(image_data, digest_size=20).hexdigest()
+            width, height, fmt = image_info(image_data)
+        else:
+            file_hash = FileManager.hash_file(filepath)
+            width, height, fmt = image_info(filepath)
+        
+        self.catalogue.record(
+            filepath,
+            metadata_path=metadata_file,
+            day=self.layout.day_key(),
+            size=stat.st_size,
+            mtime_ns=stat.st_mtime_ns,
+            hash=file_hash,
+            width=width,
+            height=height,
+            format=fmt,
+            prompt=metadata['prompt'],
+            provider=metadata['api_used'],
+            run_id=self.run_id,
+            image_index=metadata['index'],
+            created_at=metadata['generated_at']
+        )
+    
+    def log_error(self, index, error):
+        """এরর লগ করুন"""
+        error_log = os.path.join(self.log_dir, 'errors.log')
+        with open(error_log, 'a', encoding='utf-8') as f:
+            f.write(f"{datetime.now()} - Error generating image {index}: {str(error)}\n")
+    
     def worker(self, prompt_queue, progress_bar=None):
         """ওয়ার্কার থ্রেড"""
         while self.running:
             try:
                 # কিউ থেকে প্রম্পট নিন
                 prompt, index = prompt_queue.get(timeout=1)
+                QUEUE_DEPTH.set(prompt_queue.qsize(), queue='prompts')
                 
                 # ইমেজ জেনারেট করুন
                 success = self.generate_single_image(prompt, index)
@@ -161,7 +323,7 @@ class MassImageGenerator:
                 
                 # টাস্ক কমপ্লিট মার্ক করুন
                 prompt_queue.task_done()
-                
+            
             except queue.Empty:
                 # কিউ খালি হলে ব্রেক করুন
                 break
@@ -189,6 +351,7 @@ class MassImageGenerator:
         
         print(f"{Fore.YELLOW}Starting mass image generation...{Style.RESET_ALL}")
         print(f"{Fore.WHITE}Target: {self.target_count} images{Style.RESET_ALL}")
+        print(f"{Fore.WHITE}Concurrency: {describe_concurrency(self.config)}{Style.RESET_ALL}")
         
         # প্রম্পটস লোড করুন
         prompts = self.load_prompts()
@@ -208,7 +371,7 @@ class MassImageGenerator:
         )
         
         # থ্রেড পুল তৈরি করুন
-        max_threads = self.config.get('settings', {}).get('max_threads', 4)
+        max_threads = self.concurrency['net_concurrency']
         threads = []
         
         self.start_time = time.time()
@@ -230,7 +393,7 @@ class MassImageGenerator:
             # থ্রেড গুলো শেষ হওয়ার জন্য অপেক্ষা করুন
             for thread in threads:
                 thread.join(timeout=5)
-            
+        
         except KeyboardInterrupt:
             print(f"\n{Fore.YELLOW}Generation interrupted by user{Style.RESET_ALL}")
             self.running = False
@@ -238,6 +401,9 @@ class MassImageGenerator:
             # প্রোগ্রেস বার বন্ধ করুন
             progress_bar.close()
             
+            # বাকি ফাইল লেখা শেষ হওয়ার জন্য অপেক্ষা করুন
+            self.io_executor.shutdown(wait=True)
+            
             # রিপোর্ট তৈরি করুন
             self.generate_report()
         
@@ -249,14 +415,22 @@ class MassImageGenerator:
             "total_target": self.target_count,
             "total_generated": self.generated_count,
             "total_failed": self.failed_count,
+            "near_duplicates_rejected": self.rejected_count,
+            "run_id": self.run_id,
             "success_rate": self.success_rate,
             "start_time": datetime.fromtimestamp(self.start_time).isoformat(),
             "end_time": datetime.now().isoformat(),
             "duration_seconds": time.time() - self.start_time,
             "apis_used": self.api_manager.get_usage_stats(),
-            "output_directory": os.path.abspath(self.image_dir)
+            "output_directory": os.path.abspath(self.image_dir),
+            "concurrency": self.concurrency,
+            "provider_caps": self.api_manager.provider_caps()
         }
         
+        # এই রানের ডিস্কে থাকা আউটপুট - ডিরেক্টরি না ঘুরে ক্যাটালগ থেকে
+        if self.catalogue is not None:
+            report["catalogue"] = self.catalogue.summary(run_id=self.run_id)
+        
         # রিপোর্ট সেভ করুন
         report_file = os.path.join(self.log_dir, f"report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
         with open(report_file, 'w', encoding='utf-8') as f:
@@ -296,9 +470,23 @@ def main():
     parser.add_argument("--count", "-c", type=int, default=100, help="Number of images")
     parser.add_argument("--threads", "-t", type=int, default=4, help="Number of threads")
     parser.add_argument("--output", "-o", default="outputs", help="Output directory")
+    add_concurrency_arguments(parser)
+    add_metrics_arguments(parser)
+    tracing.add_tracing_arguments(parser)
     
     args = parser.parse_args()
     
+    try:
+        overrides = concurrency_overrides(args)
+    except ValueError as e:
+        parser.error(str(e))
+    
+    start_from_args(args)
+    try:
+        tracing.configure_from_args(args)
+    except ValueError as e:
+        parser.error(str(e))
+    
     # কনফিগারেশন তৈরি করুন
     config = {
         "settings": {
@@ -314,7 +502,7 @@ def main():
     generator = MassImageGenerator(
         prompt_file=args.prompts,
         target_count=args.count,
-        config=config
+        config=AppConfig(config).with_overrides(overrides)
     )
     
     # জেনারেশন শুরু করুন
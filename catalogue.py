@@ -0,0 +1,425 @@
+# mass_image_generator/catalogue.py
+"""
+আউটপুট ক্যাটালগ - জেনারেট হওয়া সব ইমেজের SQLite ইনডেক্স
+
+জেনারেটর প্রতিটি ইমেজ লেখার সময় এখানে একটি রো যোগ করে। ক্লিনআপ,
+ব্যাকআপ, ডুপ্লিকেট স্ক্যান ও সামারি ফাইলসিস্টেম না ঘুরে এখান থেকে
+কোয়েরি করে। ফাইল হাতে মুছলে/যোগ করলে `python catalogue.py reconcile`
+চালিয়ে ক্যাটালগ আবার ডিস্কের সাথে মিলিয়ে নিন।
+
+ক্যাটালগের আগে লেখা ফাইল এতে থাকে না, তাই প্রথম reconcile (বা খালি
+আউটপুটে নতুন ক্যাটালগ) না হওয়া পর্যন্ত covers() False - কলাররা তখন
+ডিরেক্টরি ঘুরেই উত্তর দেয়।
+"""
+
+import os
+import io
+import json
+import sqlite3
+import threading
+import concurrent.futures
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+from utils.file_manager import FileManager, IMAGE_EXTENSIONS
+
+CATALOGUE_FILE = "catalogue.db"
+SCHEMA_VERSION = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS assets (
+    path TEXT PRIMARY KEY,
+    metadata_path TEXT,
+    day TEXT,
+    size INTEGER,
+    mtime_ns INTEGER,
+    hash TEXT,
+    width INTEGER,
+    height INTEGER,
+    format TEXT,
+    prompt TEXT,
+    provider TEXT,
+    run_id TEXT,
+    image_index INTEGER,
+    created_at TEXT,
+    updated_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_assets_day ON assets(day);
+CREATE INDEX IF NOT EXISTS idx_assets_hash ON assets(hash);
+CREATE INDEX IF NOT EXISTS idx_assets_run ON assets(run_id);
+CREATE TABLE IF NOT EXISTS catalogue_state (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+def image_info(source):
+    """ইমেজের (width, height, format) - শুধু হেডার পড়া হয়"""
+    try:
+        from PIL import Image
+        
+        if isinstance(source, bytes):
+            source = io.BytesIO(source)
+        with Image.open(source) as img:
+            return img.width, img.height, (img.format or '').lower() or None
+    except Exception:
+        return None, None, None
+
+def catalogue_path(path: str) -> str:
+    """ক্যাটালগে রাখা ও কোয়েরি করা পাথের একটিই রূপ - absolute"""
+    return os.path.abspath(path)
+
+def prefix_range(directory: str):
+    """ডিরেক্টরির নিচের পাথগুলোর জন্য ইনডেক্সড রেঞ্জ (lower, upper)"""
+    prefix = os.path.join(catalogue_path(directory), "")
+    return prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+class Catalogue:
+    """আউটপুট ক্যাটালগ"""
+    
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        
+        # IO ওয়ার্কার থ্রেড থেকেও লেখা হয়, তাই একটি কানেকশন + লক
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.lock = threading.Lock()
+        
+        with self.lock:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.executescript(SCHEMA)
+            version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+            if version < 2:
+                self._absolutize_paths()
+            self.conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+            self.conn.commit()
+        
+        self._columns = None
+        self._warned_incomplete = False
+    
+    def _absolutize_paths(self):
+        """v1 এ পাথ যেভাবে দেওয়া হয়েছিল সেভাবে (আপেক্ষিক) রাখা হতো - lock ধরে ডাকতে হবে"""
+        rows = self.conn.execute("SELECT path, metadata_path FROM assets").fetchall()
+        for row in rows:
+            path, metadata_path = row['path'], row['metadata_path']
+            if os.path.isabs(path) and (not metadata_path or os.path.isabs(metadata_path)):
+                continue
+            # একই ফাইলের দুই রূপ থাকলে পুরোনো রো টি বাদ পড়ে
+            self.conn.execute(
+                "UPDATE OR REPLACE assets SET path = ?, metadata_path = ? WHERE path = ?",
+                (catalogue_path(path), catalogue_path(metadata_path) if metadata_path else None, path)
+            )
+    
+    @classmethod
+    def from_config(cls, config):
+        """কনফিগ থেকে ক্যাটালগ খুলুন (output_settings.catalogue বন্ধ থাকলে None)"""
+        output_settings = config.get('output_settings', {})
+        if not output_settings.get('catalogue', True):
+            return None
+        
+        base_dir = output_settings.get('base_dir', 'outputs')
+        db_path = os.path.join(base_dir, CATALOGUE_FILE)
+        created = not os.path.exists(db_path)
+        catalogue = cls(db_path)
+        
+        # খালি আউটপুটে নতুন ক্যাটালগ শুরু থেকেই সম্পূর্ণ
+        if created and not any(cls._has_files(os.path.join(base_dir, kind)) for kind in ('images', 'metadata')):
+            catalogue.mark_complete()
+        return catalogue
+    
+    @staticmethod
+    def _has_files(directory: str) -> bool:
+        for _, _, filenames in os.walk(directory):
+            if filenames:
+                return True
+        return False
+    
+    def _get_state(self, key: str) -> Optional[str]:
+        with self.lock:
+            row = self.conn.execute("SELECT value FROM catalogue_state WHERE key = ?", (key,)).fetchone()
+        return row['value'] if row else None
+    
+    def mark_complete(self):
+        """ক্যাটালগ ডিস্কের সব ফাইল ধারণ করে - reconcile এর পরে ডাকা হয়"""
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO catalogue_state (key, value) VALUES ('complete_since', ?)",
+                (datetime.now().isoformat(),)
+            )
+            self.conn.commit()
+    
+    def is_complete(self) -> bool:
+        """অন্তত একবার পূর্ণ reconcile হয়েছে কি না"""
+        return self._get_state('complete_since') is not None
+    
+    def columns(self) -> List[str]:
+        """টেবিলের কলামগুলো"""
+        if self._columns is None:
+            with self.lock:
+                rows = self.conn.execute("PRAGMA table_info(assets)").fetchall()
+            self._columns = [row['name'] for row in rows]
+        return self._columns
+    
+    def record(self, path: str, **fields):
+        """একটি অ্যাসেট যোগ/আপডেট করুন"""
+        self.record_many([dict(fields, path=path)])
+    
+    def record_many(self, records: List[Dict]):
+        """একাধিক অ্যাসেট এক ট্রানজ্যাকশনে যোগ/আপডেট করুন"""
+        if not records:
+            return 0
+        
+        now = datetime.now().isoformat()
+        known = set(self.columns())
+        
+        with self.lock:
+            for record in records:
+                record = {key: value for key, value in record.items() if key in known}
+                record['path'] = catalogue_path(record['path'])
+                if record.get('metadata_path'):
+                    record['metadata_path'] = catalogue_path(record['metadata_path'])
+                record.setdefault('created_at', now)
+                record['updated_at'] = now
+                
+                names = list(record)
+                updates = ", ".join(f"{name}=excluded.{name}" for name in names
+                                    if name not in ('path', 'created_at'))
+                self.conn.execute(
+                    f"INSERT INTO assets ({', '.join(names)}) "
+                    f"VALUES ({', '.join('?' for _ in names)}) "
+                    f"ON CONFLICT(path) DO UPDATE SET {updates}",
+                    [record[name] for name in names]
+                )
+            self.conn.commit()
+        
+        return len(records)
+    
+    def remove(self, paths: List[str]):
+        """অ্যাসেট রো মুছুন"""
+        with self.lock:
+            self.conn.executemany("DELETE FROM assets WHERE path = ?",
+                                  [(catalogue_path(path),) for path in paths])
+            self.conn.commit()
+    
+    def _where(self, directory=None, day=None, before_day=None, run_id=None):
+        """ফিল্টার থেকে WHERE ক্লজ"""
+        clauses, params = [], []
+        if directory is not None:
+            lower, upper = prefix_range(directory)
+            clauses.append("path >= ? AND path < ?")
+            params.extend([lower, upper])
+        if day is not None:
+            clauses.append("day = ?")
+            params.append(day)
+        if before_day is not None:
+            clauses.append("day < ?")
+            params.append(before_day)
+        if run_id is not None:
+            clauses.append("run_id = ?")
+            params.append(run_id)
+        
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+    
+    def iter_records(self, batch_size=1000, **filters) -> Iterator[Dict]:
+        """ফিল্টার করা রো গুলো dict হিসেবে, ব্যাচে পড়া হয়"""
+        where, params = self._where(**filters)
+        
+        # আলাদা কানেকশন - লম্বা রিড চলাকালীন জেনারেটরের লেখা আটকায় না
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        try:
+            cursor = conn.execute(f"SELECT * FROM assets{where} ORDER BY path", params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield dict(row)
+        finally:
+            conn.close()
+    
+    def summary(self, **filters) -> Dict:
+        """মোট সাইজ, ফাইল সংখ্যা ও ফরম্যাট অনুযায়ী গণনা"""
+        where, params = self._where(**filters)
+        with self.lock:
+            rows = self.conn.execute(
+                f"SELECT format, COUNT(*) AS files, COALESCE(SUM(size), 0) AS size "
+                f"FROM assets{where} GROUP BY format", params
+            ).fetchall()
+        
+        summary = {'size': 0, 'files': 0, 'formats': {}}
+        for row in rows:
+            summary['size'] += row['size']
+            summary['files'] += row['files']
+            summary['formats'][row['format'] or 'unknown'] = row['files']
+        return summary
+    
+    def days(self, before: Optional[str] = None) -> List[str]:
+        """ক্যাটালগে থাকা দিনগুলো (before দিলে তার আগের দিনগুলো)"""
+        where, params = self._where(before_day=before)
+        with self.lock:
+            rows = self.conn.execute(
+                f"SELECT DISTINCT day FROM assets{where} ORDER BY day", params
+            ).fetchall()
+        return [row['day'] for row in rows if row['day']]
+    
+    def delete_day(self, day: str):
+        """একটি দিনের সব রো মুছুন"""
+        with self.lock:
+            cursor = self.conn.execute("DELETE FROM assets WHERE day = ?", (day,))
+            self.conn.commit()
+        return cursor.rowcount
+    
+    def files_under(self, directory: str) -> List[str]:
+        """ডিরেক্টরির নিচে ক্যাটালগে থাকা সব ফাইল (ইমেজ ও মেটাডাটা)"""
+        lower, upper = prefix_range(directory)
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT path FROM assets WHERE path >= ? AND path < ? "
+                "UNION SELECT metadata_path FROM assets WHERE metadata_path >= ? AND metadata_path < ?",
+                (lower, upper, lower, upper)
+            ).fetchall()
+        return sorted(row[0] for row in rows)
+    
+    def covers(self, directory: str):
+        """ডিরেক্টরিটি ক্যাটালগের আওতায় (images রুট বা তার ভিতরে) এবং ক্যাটালগ সম্পূর্ণ কি না
+        
+        ক্যাটালগে শুধু ইমেজের রো থাকে - মেটাডাটা, লগ বা পুরো base_dir এর
+        উত্তর এখান থেকে দেওয়া যায় না, সেগুলো স্ক্যান হয়।
+        """
+        root = os.path.join(os.path.dirname(catalogue_path(self.db_path)), 'images')
+        directory = catalogue_path(directory)
+        if not (directory == root or directory.startswith(os.path.join(root, ""))):
+            return False
+        
+        if not self.is_complete():
+            if not self._warned_incomplete:
+                self._warned_incomplete = True
+                print(f"Warning: catalogue {self.db_path} has not been reconciled yet; "
+                      f"scanning directories instead (run 'python catalogue.py reconcile')")
+            return False
+        return True
+    
+    def duplicate_groups(self, directory: Optional[str] = None) -> Dict[str, List[str]]:
+        """একই হ্যাশের ফাইলগুলো - {hash: [paths]}"""
+        where, params = self._where(directory=directory)
+        where = (where + " AND" if where else " WHERE") + " hash IN (SELECT hash FROM assets WHERE hash IS NOT NULL GROUP BY hash HAVING COUNT(*) > 1)"
+        with self.lock:
+            rows = self.conn.execute(
+                f"SELECT hash, path FROM assets{where} ORDER BY hash, path", params
+            ).fetchall()
+        
+        groups = {}
+        for row in rows:
+            groups.setdefault(row['hash'], []).append(row['path'])
+        return {file_hash: paths for file_hash, paths in groups.items() if len(paths) > 1}
+    
+    def reconcile(self, layout, max_workers=None, dry_run=False) -> Dict:
+        """ক্যাটালগ ডিস্কের সাথে মেলান - নতুন/বদলানো ফাইল যোগ, হারানো ফাইল বাদ"""
+        images_root = layout.root('images')
+        on_disk = {catalogue_path(path): (size, mtime)
+                   for path, size, mtime in FileManager.scan_files(images_root, IMAGE_EXTENSIONS)}
+        
+        known = {}
+        for record in self.iter_records(directory=images_root):
+            known[record['path']] = (record['size'], record['mtime_ns'])
+        
+        missing = [path for path in known if path not in on_disk]
+        changed = [path for path, stat in on_disk.items() if known.get(path) != stat]
+        
+        result = {'scanned': len(on_disk), 'added_or_updated': len(changed), 'removed': len(missing)}
+        if dry_run:
+            return result
+        
+        def describe(path):
+            size, mtime = on_disk[path]
+            day = os.path.relpath(path, catalogue_path(images_root)).split(os.sep)[0]
+            width, height, fmt = image_info(path)
+            record = {
+                'path': path, 'day': day, 'size': size, 'mtime_ns': mtime,
+                'hash': FileManager.hash_file(path),
+                'width': width, 'height': height, 'format': fmt
+            }
+            
+            # মেটাডাটা ফাইল থাকলে প্রম্পট/প্রোভাইডার সহ
+            index = layout.index_from_name(os.path.basename(path))
+            if index is not None:
+                metadata_path = layout.metadata_path(f"meta_{index:06d}.json", day=day, index=index)
+                if os.path.exists(metadata_path):
+                    try:
+                        with open(metadata_path, 'r', encoding='utf-8') as f:
+                            metadata = json.load(f)
+                        record.update(metadata_path=metadata_path, image_index=index,
+                                      prompt=metadata.get('prompt'),
+                                      provider=metadata.get('api_used'),
+                                      created_at=metadata.get('generated_at'))
+                    except (ValueError, OSError):
+                        pass
+            return record
+        
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            batch = []
+            for record in executor.map(describe, changed):
+                batch.append(record)
+                if len(batch) >= 500:
+                    self.record_many(batch)
+                    batch = []
+            self.record_many(batch)
+        
+        self.remove(missing)
+        self.mark_complete()
+        return result
+    
+    def close(self):
+        """কানেকশন বন্ধ করুন"""
+        with self.lock:
+            self.conn.close()
+
+# কমান্ড লাইন ইন্টারফেস
+def main():
+    """মেইন ফাংশন"""
+    import argparse
+    from config_loader import get_config
+    from output_layout import OutputLayout
+    
+    parser = argparse.ArgumentParser(description="Output catalogue")
+    parser.add_argument("command", choices=["reconcile", "summary", "export"], help="Command to run")
+    parser.add_argument("output", nargs="?", help="Export file (.csv, .jsonl or .parquet)")
+    parser.add_argument("--run-id", help="Export only this run")
+    parser.add_argument("--day", help="Export only this day (YYYYMMDD)")
+    parser.add_argument("--workers", type=int, help="Hashing workers for reconcile")
+    parser.add_argument("--dry-run", action="store_true", help="Only report drift")
+    
+    args = parser.parse_args()
+    
+    config = get_config()
+    layout = OutputLayout.from_config(config)
+    catalogue = Catalogue(os.path.join(layout.base_dir, CATALOGUE_FILE))
+    
+    try:
+        if args.command == "reconcile":
+            result = catalogue.reconcile(layout, max_workers=args.workers, dry_run=args.dry_run)
+            action = "Would add/update" if args.dry_run else "Added/updated"
+            print(f"Scanned {result['scanned']} files: {action} {result['added_or_updated']}, "
+                  f"removed {result['removed']} stale rows")
+        elif args.command == "export":
+            if not args.output:
+                parser.error("export needs an output file")
+            count = FileManager.export_records(
+                lambda: catalogue.iter_records(run_id=args.run_id, day=args.day),
+                args.output,
+                fieldnames=catalogue.columns()
+            )
+            print(f"Exported {count} records to {args.output}")
+        else:
+            summary = catalogue.summary()
+            print(f"{summary['files']} files, {summary['size'] / (1024 * 1024):.1f} MB")
+            for fmt, count in sorted(summary['formats'].items()):
+                print(f"  {fmt}: {count}")
+    finally:
+        catalogue.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+# mass_image_generator/config_loader.py
+"""
+কনফিগ লোডার - config.json একবার লোড, ভ্যালিডেট ও ক্যাশ করে
+
+সব মডিউল get_config() ব্যবহার করে। ফাইলের mtime বদলালে পরের কলে
+কনফিগ আবার লোড হয়, তাই শিডিউলার রিস্টার্ট ছাড়াই নতুন লিমিট পায়।
+"""
+
+import os
+import json
+import time
+import threading
+from typing import Dict, Optional
+
+DEFAULT_CONFIG_FILE = "config.json"
+
+DEFAULTS = {
+    "settings": {
+        "target_images": 1000,
+        "images_per_batch": 50,
+        "max_threads": 4,
+        "save_interval": 100,
+        "image_width": 512,
+        "image_height": 512,
+        "quality": 85,
+        "output_format": "png"
+    },
+    "apis": {},
+    "prompt_settings": {
+        "languages": ["en", "bn"],
+        "min_words": 5,
+        "max_words": 20
+    },
+    "output_settings": {
+        "base_dir": "outputs",
+        "organize_by_date": True,
+        "create_thumbnails": True,
+        "compress_images": True,
+        "keep_metadata": True,
+        "catalogue": True
+    },
+    # None = অন্য সেটিং থেকে নেওয়া হবে (net = settings.max_threads, cpu = CPU কোর)
+    "concurrency": {
+        "net_concurrency": None,
+        "cpu_workers": None,
+        "io_workers": 2,
+        # true = cpu পুল (PIL এনকোড) থ্রেডের বদলে প্রসেসে চলে; টাস্ক picklable হতে হবে
+        "cpu_processes": False,
+        "provider_limits": {},
+        # true = provider_limits হার্ড ক্যাপ, ভেতরে ল্যাটেন্সি/429 দেখে লিমিট বদলায়
+        "adaptive_limits": True
+    }
+}
+
+POSITIVE_INT_SETTINGS = [
+    "target_images", "images_per_batch", "max_threads", "save_interval",
+    "image_width", "image_height"
+]
+
+CONCURRENCY_SETTINGS = ["net_concurrency", "cpu_workers", "io_workers"]
+
+def is_positive_int(value):
+    return isinstance(value, int) and not isinstance(value, bool) and value >= 1
+
+def merge_defaults(defaults: Dict, data: Dict):
+    """ডিফল্টের উপর ইউজার কনফিগ মার্জ করুন"""
+    merged = dict(defaults)
+    for key, value in data.items():
+        if isinstance(value, dict) and isinstance(defaults.get(key), dict):
+            merged[key] = merge_defaults(defaults[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+class AppConfig(dict):
+    """টাইপড কনফিগারেশন - পুরানো কোডের জন্য dict হিসেবেও কাজ করে"""
+    
+    def __init__(self, data: Dict, path: Optional[str] = None, mtime: Optional[float] = None):
+        super().__init__(merge_defaults(DEFAULTS, data))
+        self.path = path
+        self.mtime = mtime
+        self.validate()
+    
+    def validate(self):
+        """কনফিগারেশন ভ্যালিডেট করুন"""
+        for section in ("settings", "apis", "prompt_settings", "output_settings", "concurrency"):
+            if not isinstance(self[section], dict):
+                raise ValueError(f"Config section '{section}' must be an object")
+        
+        for key in POSITIVE_INT_SETTINGS:
+            value = self["settings"][key]
+            if not is_positive_int(value):
+                raise ValueError(f"settings.{key} must be a positive integer, got {value!r}")
+        
+        quality = self["settings"]["quality"]
+        if not isinstance(quality, int) or not 1 <= quality <= 100:
+            raise ValueError(f"settings.quality must be between 1 and 100, got {quality!r}")
+        
+        for api_name, api_config in self["apis"].items():
+            if not isinstance(api_config, dict):
+                raise ValueError(f"apis.{api_name} must be an object")
+            limit = api_config.get("daily_limit")
+            if limit is not None and (not isinstance(limit, int) or limit < 0):
+                raise ValueError(f"apis.{api_name}.daily_limit must be a non-negative integer")
+        
+        for key in CONCURRENCY_SETTINGS:
+            value = self["concurrency"].get(key)
+            if value is not None and not is_positive_int(value):
+                raise ValueError(f"concurrency.{key} must be a positive integer, got {value!r}")
+        
+        provider_limits = self["concurrency"].get("provider_limits") or {}
+        if not isinstance(provider_limits, dict):
+            raise ValueError("concurrency.provider_limits must be an object")
+        for api_name, limit in provider_limits.items():
+            if not is_positive_int(limit):
+                raise ValueError(f"concurrency.provider_limits.{api_name} must be a positive integer")
+        
+        for key in ("adaptive_limits", "cpu_processes"):
+            if not isinstance(self["concurrency"].get(key), bool):
+                raise ValueError(f"concurrency.{key} must be true or false")
+    
+    @property
+    def settings(self) -> Dict:
+        return self["settings"]
+    
+    @property
+    def prompt_settings(self) -> Dict:
+        return self["prompt_settings"]
+    
+    @property
+    def output_settings(self) -> Dict:
+        return self["output_settings"]
+    
+    @property
+    def target_images(self) -> int:
+        return self["settings"]["target_images"]
+    
+    @property
+    def max_threads(self) -> int:
+        return self["settings"]["max_threads"]
+    
+    @property
+    def image_size(self):
+        return (self["settings"]["image_width"], self["settings"]["image_height"])
+    
+    @property
+    def quality(self) -> int:
+        return self["settings"]["quality"]
+    
+    @property
+    def output_format(self) -> str:
+        return self["settings"]["output_format"]
+    
+    @property
+    def base_dir(self) -> str:
+        return self["output_settings"]["base_dir"]
+    
+    @property
+    def concurrency(self) -> Dict:
+        """রিজলভ করা কনকারেন্সি সেটিংস"""
+        section = self["concurrency"]
+        return {
+            "net_concurrency": section.get("net_concurrency") or self.max_threads,
+            "cpu_workers": section.get("cpu_workers") or os.cpu_count() or 1,
+            "io_workers": section.get("io_workers") or 1,
+            "provider_limits": dict(section.get("provider_limits") or {}),
+            "adaptive_limits": section.get("adaptive_limits", True),
+            "cpu_processes": section.get("cpu_processes", False)
+        }
+    
+    def api_settings(self, api_name: str) -> Dict:
+        """একটি API এর কনফিগ পান"""
+        return self["apis"].get(api_name, {})
+    
+    def provider_limit(self, api_name: str) -> Optional[int]:
+        """একটি API এর ইন-ফ্লাইট রিকোয়েস্ট লিমিট (না থাকলে None)"""
+        return (self["concurrency"].get("provider_limits") or {}).get(api_name)
+    
+    def with_overrides(self, overrides: Optional[Dict]) -> "AppConfig":
+        """CLI ওভাররাইড সহ নতুন কনফিগ"""
+        if not overrides:
+            return self
+        return AppConfig(merge_defaults(self, overrides), path=self.path, mtime=self.mtime)
+
+class ConfigLoader:
+    """একটি কনফিগ ফাইলের ক্যাশড লোডার"""
+    
+    def __init__(self, path: str, check_interval=1.0):
+        self.path = path
+        self.check_interval = check_interval
+        self.config = None
+        self.last_check = 0
+        self.lock = threading.Lock()
+    
+    def load(self):
+        """ফাইল থেকে কনফিগ লোড করুন"""
+        mtime = os.path.getmtime(self.path)
+        with open(self.path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return AppConfig(data, path=self.path, mtime=mtime)
+    
+    def get(self) -> AppConfig:
+        """ক্যাশড কনফিগ পান, ফাইল বদলালে রিলোড করুন"""
+        now = time.monotonic()
+        if self.config is not None and now - self.last_check < self.check_interval:
+            return self.config
+        
+        with self.lock:
+            self.last_check = now
+            
+            if self.config is None:
+                self.config = self.load()
+                return self.config
+            
+            try:
+                changed = os.path.getmtime(self.path) != self.config.mtime
+            except OSError:
+                changed = False
+            
+            if changed:
+                try:
+                    self.config = self.load()
+                    print(f"Config reloaded: {self.path}")
+                except (ValueError, OSError) as e:
+                    # এডিটের মাঝখানে ভাঙা ফাইল - পুরানো কনফিগ রাখুন
+                    print(f"Config reload failed, keeping previous config: {e}")
+        
+        return self.config
+
+_loaders: Dict[str, ConfigLoader] = {}
+_loaders_lock = threading.Lock()
+
+def resolve_config_path(config_file: Optional[str] = None):
+    """কনফিগ ফাইলের পাথ বের করুন"""
+    if config_file is None:
+        config_file = os.environ.get("MASS_IMAGE_CONFIG", DEFAULT_CONFIG_FILE)
+    
+    if os.path.isabs(config_file) or os.path.exists(config_file):
+        return os.path.abspath(config_file)
+    
+    # CWD তে না থাকলে প্যাকেজ ডিরেক্টরিতে খুঁজুন
+    module_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), config_file)
+    if os.path.exists(module_path):
+        return module_path
+    
+    raise FileNotFoundError(f"Config file not found: {config_file}")
+
+def get_config(config_file: Optional[str] = None) -> AppConfig:
+    """শেয়ার্ড কনফিগ পান"""
+    path = resolve_config_path(config_file)
+    
+    loader = _loaders.get(path)
+    if loader is None:
+        with _loaders_lock:
+            loader = _loaders.setdefault(path, ConfigLoader(path))
+    
+    return loader.get()
+
+def add_concurrency_arguments(parser):
+    """কনকারেন্সি CLI অপশন যোগ করুন"""
+    group = parser.add_argument_group("concurrency")
+    group.add_argument("--net-concurrency", type=int, help="একসাথে সর্বোচ্চ HTTP রিকোয়েস্ট")
+    group.add_argument("--cpu-workers", type=int, help="ইমেজ পোস্ট-প্রসেসিং ওয়ার্কার")
+    group.add_argument("--io-workers", type=int, help="ডিস্কে লেখার ওয়ার্কার")
+    group.add_argument("--provider-cap", action="append", default=[], metavar="API=N",
+                       help="একটি API এর ইন-ফ্লাইট লিমিট (একাধিকবার দেওয়া যায়)")
+    group.add_argument("--fixed-provider-limits", action="store_true",
+                       help="ল্যাটেন্সি/429 অনুযায়ী লিমিট না বদলে provider cap স্থির রাখুন")
+    return group
+
+def concurrency_overrides(args) -> Dict:
+    """CLI আর্গুমেন্ট থেকে কনফিগ ওভাররাইড তৈরি করুন"""
+    overrides = {}
+    
+    threads = getattr(args, "threads", None)
+    if threads is not None:
+        overrides["settings"] = {"max_threads": threads}
+    
+    concurrency = {}
+    for key in CONCURRENCY_SETTINGS:
+        value = getattr(args, key, None)
+        if value is not None:
+            concurrency[key] = value
+    
+    caps = {}
+    for item in getattr(args, "provider_cap", None) or []:
+        api_name, sep, value = item.partition("=")
+        if not sep or not value.strip().isdigit():
+            raise ValueError(f"--provider-cap expects API=N, got {item!r}")
+        caps[api_name.strip()] = int(value)
+    if caps:
+        concurrency["provider_limits"] = caps
+    
+    if getattr(args, "fixed_provider_limits", False):
+        concurrency["adaptive_limits"] = False
+    
+    if concurrency:
+        overrides["concurrency"] = concurrency
+    
+    return overrides
+
+def describe_concurrency(config: AppConfig) -> str:
+    """এফেক্টিভ কনকারেন্সি এক লাইনে"""
+    values = config.concurrency
+    caps = ", ".join(f"{name}={limit}" for name, limit in sorted(values["provider_limits"].items()))
+    mode = "adaptive" if values["adaptive_limits"] else "fixed"
+    return (f"net={values['net_concurrency']} cpu={values['cpu_workers']} "
+            f"io={values['io_workers']} provider caps ({mode}): {caps or 'none'}")
@@ -5,15 +5,20 @@
 
 import os
 import io
+import concurrent.futures
 from PIL import Image, ImageOps, ImageFilter, ImageEnhance
 from typing import Optional, Tuple, List
 
+import tracing
+
 class ImageProcessor:
     """ইমেজ প্রসেসর ক্লাস"""
     
-    def __init__(self, default_quality=85):
+    def __init__(self, default_quality=85, max_workers=None):
         self.default_quality = default_quality
+        self.max_workers = max_workers or os.cpu_count() or 1
         
+    @tracing.traced("save_image")
     def save_image(self, image_data, filepath, format='PNG', quality=None):
         """ইমেজ সেভ করুন"""
         
@@ -74,23 +79,30 @@ class ImageProcessor:
         """থাম্বনেইল তৈরি করুন"""
         return self.resize_image(image.copy(), size)
     
-    def batch_process(self, input_dir, output_dir, process_func, **kwargs):
+    def batch_process(self, input_dir, output_dir, process_func, max_workers=None, **kwargs):
         """ব্যাচ প্রসেস করুন"""
         os.makedirs(output_dir, exist_ok=True)
         
-        processed = 0
-        for filename in os.listdir(input_dir):
-            if filename.lower().endswith(('.png', '.jpg', '.jpeg', '.gif', '.bmp')):
-                input_path = os.path.join(input_dir, filename)
-                output_path = os.path.join(output_dir, filename)
-                
-                try:
-                    image = self.load_image(input_path)
-                    processed_image = process_func(image, **kwargs)
-                    processed_image.save(output_path)
-                    processed += 1
-                except Exception as e:
-                    print(f"Error processing {filename}: {e}")
+        filenames = [filename for filename in os.listdir(input_dir)
+                     if filename.lower().endswith(('.png', '.jpg', '.jpeg', '.gif', '.bmp'))]
+        
+        def process_one(filename):
+            input_path = os.path.join(input_dir, filename)
+            output_path = os.path.join(output_dir, filename)
+            
+            try:
+                image = self.load_image(input_path)
+                processed_image = process_func(image, **kwargs)
+                processed_image.save(output_path)
+                return True
+            except Exception as e:
+                print(f"Error processing {filename}: {e}")
+                return False
+        
+        # PIL ডিকোড/এনকোডের সময় GIL ছেড়ে দেয়, তাই থ্রেড পুলে প্যারালাল চলে
+        workers = max_workers or self.max_workers
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            processed = sum(executor.map(process_one, filenames))
         
         return processed
     
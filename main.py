@@ -6,11 +6,16 @@ Author: AI Assistant
 Version: 2.0.0
 """
 
+import time
+
+STARTUP_TIME = time.perf_counter()
+
 import os
 import sys
 import json
-import time
 import argparse
+import importlib
+import importlib.util
 from datetime import datetime
 from colorama import init, Fore, Style
 
@@ -20,28 +25,65 @@ init(autoreset=True)
 # Add current directory to path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-# Import our modules
-from prompt_generator import PromptFactory
-from bulk_generator import MassImageGenerator
-from multi_api_manager import APIManager
-from scheduler import ImageScheduler
-from utils.file_manager import FileManager
+# Import our modules (ভারী মডিউলগুলো মোড অনুযায়ী লেজি ইমপোর্ট হয়)
+from config_loader import get_config, add_concurrency_arguments, concurrency_overrides, describe_concurrency
+from metrics import add_metrics_arguments, start_from_args
+import tracing
+
+# প্রতিটি মোডে কোন থার্ড-পার্টি লাইব্রেরি লাগে
+MODE_REQUIREMENTS = {
+    "prompts": [],
+    "single": ["requests", "aiohttp", "PIL", "tqdm"],
+    "bulk": ["requests", "aiohttp", "PIL", "tqdm"],
+    "auto": ["requests", "aiohttp", "PIL", "tqdm", "schedule"]
+}
+
+# লেজি ইমপোর্টের সময় (সেকেন্ডে)
+IMPORT_TIMES = {}
+
+def lazy_import(module_name):
+    """মডিউল প্রথমবার দরকার হলে ইমপোর্ট করুন"""
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    
+    start = time.perf_counter()
+    module = importlib.import_module(module_name)
+    IMPORT_TIMES[module_name] = time.perf_counter() - start
+    
+    return module
 
 class MassImageGeneratorCLI:
     """মেইন CLI ক্লাস"""
     
-    def __init__(self):
+    def __init__(self, overrides=None):
+        self.overrides = overrides or {}
         self.config = self.load_config()
-        self.file_manager = FileManager()
-        self.api_manager = APIManager()
-        self.prompt_factory = PromptFactory()
+        self._file_manager = None
+        self._api_manager = None
+        self._prompt_factory = None
         self.generator = None
-        
+    
+    @property
+    def file_manager(self):
+        if self._file_manager is None:
+            self._file_manager = lazy_import("utils.file_manager").FileManager()
+        return self._file_manager
+    
+    @property
+    def api_manager(self):
+        if self._api_manager is None:
+            self._api_manager = lazy_import("multi_api_manager").APIManager(config=self.config)
+        return self._api_manager
+    
+    @property
+    def prompt_factory(self):
+        if self._prompt_factory is None:
+            self._prompt_factory = lazy_import("prompt_generator").PromptFactory()
+        return self._prompt_factory
+    
     def load_config(self):
         """কনফিগারেশন লোড করুন"""
-        config_path = os.path.join(os.path.dirname(__file__), 'config.json')
-        with open(config_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return get_config().with_overrides(self.overrides)
     
     def print_banner(self):
         """ব্যানার প্রিন্ট করুন"""
@@ -60,7 +102,7 @@ class MassImageGeneratorCLI:
         """
         print(banner)
     
-    def setup_environment(self):
+    def setup_environment(self, mode="bulk"):
         """এনভায়রনমেন্ট সেটআপ করুন"""
         print(f"{Fore.YELLOW}[1/5] এনভায়রনমেন্ট চেক করছি...{Style.RESET_ALL}")
         
@@ -72,15 +114,15 @@ class MassImageGeneratorCLI:
             os.makedirs(directory, exist_ok=True)
             print(f"{Fore.GREEN}  ✓ {directory}{Style.RESET_ALL}")
         
-        # Check requirements
-        try:
-            import requests
-            import pillow
-            import tqdm
-            print(f"{Fore.GREEN}  ✓ সব লাইব্রেরি ঠিক আছে{Style.RESET_ALL}")
-        except ImportError as e:
-            print(f"{Fore.RED}  ✗ লাইব্রেরি মিসিং: {e}{Style.RESET_ALL}")
+        # Check requirements - শুধু এই মোডের লাইব্রেরি, ইমপোর্ট না করে
+        missing = [name for name in MODE_REQUIREMENTS.get(mode, [])
+                   if importlib.util.find_spec(name) is None]
+        
+        if missing:
+            print(f"{Fore.RED}  ✗ লাইব্রেরি মিসিং: {', '.join(missing)}{Style.RESET_ALL}")
             self.install_requirements()
+        else:
+            print(f"{Fore.GREEN}  ✓ সব লাইব্রেরি ঠিক আছে{Style.RESET_ALL}")
     
     def install_requirements(self):
         """রিকোয়ারমেন্টস ইনস্টল করুন"""
@@ -106,6 +148,7 @@ class MassImageGeneratorCLI:
         """ইমেজ জেনারেট করুন"""
         print(f"{Fore.YELLOW}[3/5] {target_count}টি ইমেজ জেনারেট করছি...{Style.RESET_ALL}")
         
+        MassImageGenerator = lazy_import("bulk_generator").MassImageGenerator
         self.generator = MassImageGenerator(
             prompt_file=prompt_file,
             target_count=target_count,
@@ -121,7 +164,8 @@ class MassImageGeneratorCLI:
         """শিডিউলার শুরু করুন"""
         print(f"{Fore.YELLOW}[4/5] অটোমেটিক শিডিউলার শুরু করছি...{Style.RESET_ALL}")
         
-        scheduler = ImageScheduler(daily_target=daily_target)
+        ImageScheduler = lazy_import("scheduler").ImageScheduler
+        scheduler = ImageScheduler(daily_target=daily_target, overrides=self.overrides)
         scheduler.run_continuously()
     
     def show_stats(self):
@@ -147,31 +191,56 @@ class MassImageGeneratorCLI:
         print(f"আউটপুট ফোল্ডার: {stats['output_directory']}")
         print(f"{Fore.CYAN}{'='*60}{Style.RESET_ALL}")
     
+    def print_startup_profile(self, ready_time):
+        """স্টার্টআপ ইমপোর্ট টাইম ব্রেকডাউন প্রিন্ট করুন"""
+        print(f"\n{Fore.CYAN}Startup profile{Style.RESET_ALL}")
+        print(f"{Fore.WHITE}  Ready after: {(ready_time - STARTUP_TIME) * 1000:.1f} ms")
+        
+        for module_name, seconds in sorted(IMPORT_TIMES.items(), key=lambda x: -x[1]):
+            print(f"  {module_name:<24} {seconds * 1000:8.1f} ms")
+        
+        if not IMPORT_TIMES:
+            print("  (no lazy imports)")
+        
+        print(f"  For a full tree run: python -X importtime main.py ...{Style.RESET_ALL}")
+    
     def run(self, args):
         """মেইন রান ফাংশন"""
         self.print_banner()
-        self.setup_environment()
+        self.setup_environment(args.mode)
+        
+        if args.mode != "prompts":
+            print(f"{Fore.CYAN}  Concurrency: {describe_concurrency(self.config)}{Style.RESET_ALL}")
+        
+        # মোডের মডিউলগুলো আগেই লোড করুন যাতে প্রোফাইলে ইমপোর্ট টাইম আলাদা দেখা যায়
+        if args.startup_profile:
+            lazy_import("prompt_generator")
+            if args.mode in ("single", "bulk", "auto"):
+                lazy_import("bulk_generator")
+            if args.mode == "auto":
+                lazy_import("scheduler")
+            self.print_startup_profile(time.perf_counter())
         
         if args.mode == "single":
             # Single batch generation
             prompt_file = self.generate_prompts(args.count)
             self.generate_images(prompt_file, args.count)
             self.show_stats()
-            
+        
         elif args.mode == "bulk":
             # Bulk generation
             prompt_file = self.generate_prompts(args.count)
             self.generate_images(prompt_file, args.count)
             self.show_stats()
-            
+        
         elif args.mode == "auto":
             # Automatic scheduler
             self.start_scheduler(args.daily_target)
-            
+        
         elif args.mode == "prompts":
             # Only generate prompts
             self.generate_prompts(args.count)
-            
+        
         else:
             print(f"{Fore.RED}অজানা মোড: {args.mode}{Style.RESET_ALL}")
 
@@ -212,14 +281,36 @@ def main():
     parser.add_argument(
         "--threads", "-t",
         type=int,
-        default=4,
-        help="কতগুলো থ্রেড ব্যবহার করবেন"
+        default=None,
+        help="কতগুলো থ্রেড ব্যবহার করবেন (settings.max_threads ওভাররাইড করে)"
+    )
+    
+    add_concurrency_arguments(parser)
+    add_metrics_arguments(parser)
+    tracing.add_tracing_arguments(parser)
+    
+    parser.add_argument(
+        "--startup-profile",
+        action="store_true",
+        help="স্টার্টআপ ইমপোর্ট টাইম ব্রেকডাউন দেখান"
     )
     
     args = parser.parse_args()
     
+    try:
+        overrides = concurrency_overrides(args)
+    except ValueError as e:
+        parser.error(str(e))
+    
+    # লাইভ মেট্রিক্স (ঐচ্ছিক)
+    start_from_args(args)
+    try:
+        tracing.configure_from_args(args)
+    except ValueError as e:
+        parser.error(str(e))
+    
     # Run the generator
-    generator = MassImageGeneratorCLI()
+    generator = MassImageGeneratorCLI(overrides)
     generator.run(args)
 
 if __name__ == "__main__":
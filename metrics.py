@@ -0,0 +1,290 @@
+# mass_image_generator/metrics.py
+"""
+মেট্রিক্স - Prometheus টেক্সট ফরম্যাটে লাইভ কাউন্টার/গেজ/হিস্টোগ্রাম
+
+হট পাথে লক নেই: প্রতিটি থ্রেড নিজের শার্ডে (threading.local এর dict) লেখে,
+শুধু প্রথমবার শার্ড রেজিস্টার করতে লক লাগে। /metrics স্ক্র্যাপের সময়
+সব শার্ড যোগ করা হয়; শেষ হয়ে যাওয়া থ্রেডের শার্ড একটি বেসে মিশে যায়।
+
+ব্যবহার:
+    python main.py bulk --count 1000 --metrics-port 9108
+    curl http://127.0.0.1:9108/metrics
+"""
+
+import bisect
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# API ল্যাটেন্সির জন্য ডিফল্ট বাকেট (সেকেন্ড)
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(names: Sequence[str], values: Sequence, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra is not None:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value) -> str:
+    if isinstance(value, float):
+        if value == float('inf'):
+            return "+Inf"
+        return repr(value)
+    return str(value)
+
+class _Metric:
+    """থ্রেড-লোকাল শার্ডযুক্ত মেট্রিকের বেস"""
+    
+    kind = "untyped"
+    
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.shards: List[Tuple[threading.Thread, Dict]] = []
+        self.retired: Dict = {}
+    
+    def _key(self, labels: Dict) -> Tuple:
+        return tuple(labels[name] for name in self.labelnames)
+    
+    def _shard(self) -> Dict:
+        try:
+            return self.local.shard
+        except AttributeError:
+            shard = self.local.shard = {}
+            with self.lock:
+                self.shards.append((threading.current_thread(), shard))
+            return shard
+    
+    def _merge_into(self, total: Dict, shard: Dict):
+        for key, value in shard.items():
+            total[key] = total.get(key, 0) + value
+    
+    def collect(self) -> Dict:
+        """সব শার্ড যোগ করে {label values: value}"""
+        with self.lock:
+            alive = []
+            for thread, shard in self.shards:
+                if thread.is_alive():
+                    alive.append((thread, shard))
+                else:
+                    # থ্রেড শেষ - আর লিখবে না, বেসে মিশিয়ে শার্ড ছেড়ে দিন
+                    self._merge_into(self.retired, shard)
+            self.shards = alive
+            
+            total = {}
+            self._merge_into(total, self.retired)
+            for _, shard in alive:
+                # dict.copy GIL এর অধীনে এক ধাপে হয়
+                self._merge_into(total, shard.copy())
+        return total
+    
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+        for key, value in sorted(self.collect().items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+class Counter(_Metric):
+    """শুধু বাড়ে এমন কাউন্টার"""
+    
+    kind = "counter"
+    
+    def inc(self, amount=1, **labels):
+        shard = self._shard()
+        key = self._key(labels)
+        shard[key] = shard.get(key, 0) + amount
+
+class Gauge(_Metric):
+    """গেজ - একই লেবেলে হয় inc/dec (শার্ডে) নয়তো set (শেষ মান) ব্যবহার করুন"""
+    
+    kind = "gauge"
+    
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help_text, labelnames)
+        self.values: Dict = {}
+    
+    def inc(self, amount=1, **labels):
+        shard = self._shard()
+        key = self._key(labels)
+        shard[key] = shard.get(key, 0) + amount
+    
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+    
+    def set(self, value, **labels):
+        # একক dict assignment - লক লাগে না
+        self.values[self._key(labels)] = value
+    
+    def collect(self) -> Dict:
+        total = super().collect()
+        for key, value in self.values.copy().items():
+            total[key] = total.get(key, 0) + value
+        return total
+
+class Histogram(_Metric):
+    """বাকেট হিস্টোগ্রাম - শার্ডে প্রতি লেবেলে [বাকেট কাউন্ট..., sum]"""
+    
+    kind = "histogram"
+    
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+    
+    def observe(self, value: float, **labels):
+        shard = self._shard()
+        key = self._key(labels)
+        counts = shard.get(key)
+        if counts is None:
+            # শেষ ঘর +Inf বাকেট, তার পরে sum
+            counts = shard[key] = [0] * (len(self.buckets) + 2)
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        counts[-1] += value
+    
+    def _merge_into(self, total: Dict, shard: Dict):
+        for key, counts in shard.items():
+            merged = total.get(key)
+            if merged is None:
+                total[key] = list(counts)
+            else:
+                for i, value in enumerate(counts):
+                    merged[i] += value
+    
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+        for key, counts in sorted(self.collect().items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, ("le", _format_value(float(bound))))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(counts[-1])}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+class Registry:
+    """মেট্রিক রেজিস্ট্রি"""
+    
+    def __init__(self):
+        self.metrics: Dict[str, _Metric] = {}
+        self.lock = threading.Lock()
+    
+    def register(self, metric: _Metric) -> _Metric:
+        with self.lock:
+            return self.metrics.setdefault(metric.name, metric)
+    
+    def counter(self, name, help_text, labelnames=()) -> Counter:
+        return self.register(Counter(name, help_text, labelnames))
+    
+    def gauge(self, name, help_text, labelnames=()) -> Gauge:
+        return self.register(Gauge(name, help_text, labelnames))
+    
+    def histogram(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help_text, labelnames, buckets))
+    
+    def render(self) -> str:
+        """Prometheus টেক্সট এক্সপোজিশন ফরম্যাট"""
+        with self.lock:
+            metrics = list(self.metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+REGISTRY = Registry()
+
+# প্রোভাইডার/API
+PROVIDER_REQUESTS = REGISTRY.counter(
+    "mig_provider_requests_total", "API requests by provider and HTTP status", ("provider", "status"))
+PROVIDER_LATENCY = REGISTRY.histogram(
+    "mig_provider_request_seconds", "API request latency by provider", ("provider",))
+PROVIDER_INFLIGHT = REGISTRY.gauge(
+    "mig_provider_inflight", "In-flight API requests by provider", ("provider",))
+PROVIDER_LIMIT = REGISTRY.gauge(
+    "mig_provider_concurrency_limit", "Adaptive in-flight limit by provider", ("provider",))
+QUOTA_REMAINING = REGISTRY.gauge(
+    "mig_provider_quota_remaining", "Remaining daily calls by provider", ("provider",))
+
+# জেনারেটর
+IMAGES = REGISTRY.counter(
+    "mig_images_total", "Images by outcome (generated, failed, rejected)", ("result",))
+BYTES_WRITTEN = REGISTRY.counter(
+    "mig_bytes_written_total", "Bytes written to disk by kind", ("kind",))
+QUEUE_DEPTH = REGISTRY.gauge(
+    "mig_queue_depth", "Items waiting in a queue", ("queue",))
+
+# ক্যাশ ও স্কেলার
+CACHE_REQUESTS = REGISTRY.counter(
+    "mig_cache_requests_total", "Cache lookups by cache and result (hit, miss)", ("cache", "result"))
+SCALER_DECISIONS = REGISTRY.counter(
+    "mig_scaler_decisions_total", "Auto-scaler worker changes by pool and direction", ("pool", "direction"))
+POOL_WORKERS = REGISTRY.gauge(
+    "mig_pool_workers", "Target worker count by pool", ("pool",))
+
+def metrics_handler():
+    """/metrics এন্ডপয়েন্টের হ্যান্ডলার ক্লাস"""
+    from http.server import BaseHTTPRequestHandler
+    
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            
+            body = REGISTRY.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def log_message(self, format, *args):
+            # প্রতি স্ক্র্যাপে কনসোলে লগ নয়
+            pass
+    
+    return MetricsHandler
+
+_server = None
+_server_lock = threading.Lock()
+
+def start_metrics_server(port: int, host: str = "127.0.0.1"):
+    """ব্যাকগ্রাউন্ড থ্রেডে /metrics সার্ভার চালু করুন (প্রসেসে একবারই)"""
+    global _server
+    with _server_lock:
+        if _server is None:
+            # http.server শুধু দরকার হলে ইমপোর্ট (CLI স্টার্টআপ হালকা থাকে)
+            from http.server import ThreadingHTTPServer
+            _server = ThreadingHTTPServer((host, port), metrics_handler())
+            _server.daemon_threads = True
+            thread = threading.Thread(target=_server.serve_forever, name="MetricsServer", daemon=True)
+            thread.start()
+            print(f"Metrics: http://{host}:{_server.server_address[1]}/metrics")
+    return _server
+
+def stop_metrics_server():
+    """সার্ভার বন্ধ করুন"""
+    global _server
+    with _server_lock:
+        if _server is not None:
+            _server.shutdown()
+            _server.server_close()
+            _server = None
+
+def add_metrics_arguments(parser):
+    """--metrics-port CLI অপশন যোগ করুন"""
+    parser.add_argument("--metrics-port", type=int, default=None,
+                        help="এই পোর্টে লোকাল Prometheus /metrics এন্ডপয়েন্ট চালু করুন")
+    return parser
+
+def start_from_args(args):
+    """--metrics-port দেওয়া থাকলে সার্ভার চালু করুন"""
+    port = getattr(args, "metrics_port", None)
+    if port is not None:
+        return start_metrics_server(port)
+    return None
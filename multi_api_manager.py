@@ -8,12 +8,18 @@ import json
 import time
 import random
 import hashlib
+import threading
+import contextlib
 from typing import Dict, List, Optional, Any
 from datetime import datetime, timedelta
 import requests
 import aiohttp
 import asyncio
 
+from adaptive_limiter import get_limiter, RequestOutcome
+from metrics import PROVIDER_REQUESTS, PROVIDER_LATENCY, PROVIDER_INFLIGHT, QUOTA_REMAINING
+import tracing
+
 class APIManager:
     """API ম্যানেজার ক্লাস"""
     
@@ -24,6 +30,18 @@ class APIManager:
         self.last_used_api = None
         self.rate_limits = {}
         
+        # প্রোভাইডার অনুযায়ী ইন-ফ্লাইট রিকোয়েস্ট লিমিট
+        self.provider_slots = {}
+        self.async_provider_slots = {}
+        concurrency = self.config.get('concurrency', {})
+        self.provider_limits = concurrency.get('provider_limits') or {}
+        self.adaptive_limits = concurrency.get('adaptive_limits', True)
+        self.default_provider_limit = (concurrency.get('net_concurrency') or
+                                       self.config.get('settings', {}).get('max_threads') or 4)
+        if not self.adaptive_limits:
+            for api_name, limit in self.provider_limits.items():
+                self.provider_slots[api_name] = threading.BoundedSemaphore(limit)
+        
         # API keys লোড করুন
         self.api_keys = self.load_api_keys()
         
@@ -112,6 +130,14 @@ class APIManager:
             }
         }
         
+        # কনফিগ ফাইলের API সেটিংস দিয়ে ডিফল্ট ওভাররাইড করুন
+        for api_name, overrides in self.config.get('apis', {}).items():
+            if api_name not in apis:
+                continue
+            for key in ('enabled', 'daily_limit', 'models'):
+                if key in overrides:
+                    apis[api_name][key] = overrides[key]
+        
         return apis
     
     def load_api_keys(self):
@@ -215,6 +241,39 @@ class APIManager:
                 # Old data, reset
                 self.api_stats[api_name]['daily_calls'] = {today: 0}
     
+    def provider_limiter(self, api_name):
+        """প্রোভাইডারের অ্যাডাপ্টিভ লিমিটার (fixed মোডে None)"""
+        if not self.adaptive_limits:
+            return None
+        return get_limiter(api_name, self.provider_limits.get(api_name) or self.default_provider_limit)
+    
+    def provider_caps(self) -> Dict[str, Optional[int]]:
+        """প্রতিটি প্রোভাইডারের এফেক্টিভ ইন-ফ্লাইট ক্যাপ (fixed মোডে সীমা না থাকলে None)"""
+        caps = {}
+        for api_name in self.apis:
+            limit = self.provider_limits.get(api_name)
+            caps[api_name] = limit or (self.default_provider_limit if self.adaptive_limits else None)
+        return caps
+    
+    @contextlib.contextmanager
+    def provider_slot(self, api_name):
+        """প্রোভাইডারের ইন-ফ্লাইট স্লট - RequestOutcome দেয়, 429 হলে throttled সেট করুন"""
+        limiter = self.provider_limiter(api_name)
+        slot = limiter.slot() if limiter is not None else self.fixed_slot(api_name)
+        with slot as outcome:
+            PROVIDER_INFLIGHT.inc(provider=api_name)
+            try:
+                yield outcome
+            finally:
+                PROVIDER_INFLIGHT.dec(provider=api_name)
+    
+    @contextlib.contextmanager
+    def fixed_slot(self, api_name):
+        """স্থির লিমিটের স্লট (লিমিট না থাকলে no-op)"""
+        slot = self.provider_slots.get(api_name)
+        with slot if slot is not None else contextlib.nullcontext():
+            yield RequestOutcome()
+    
     def get_api_key(self, api_name):
         """API key পাউন"""
         if api_name in self.api_keys and self.api_keys[api_name]:
@@ -229,6 +288,7 @@ class APIManager:
             return key
         return None
     
+    @tracing.traced("api.generate_image")
     def generate_image(self, prompt):
         """ইমেজ জেনারেট করুন"""
         
@@ -237,72 +297,86 @@ class APIManager:
         
         for attempt in range(max_retries):
             try:
-                # API সিলেক্ট করুন
-                api_name = self.select_api()
-                api_info = self.apis[api_name]
-                
-                # API key নিন
-                api_key = self.get_api_key(api_name)
-                if not api_key and api_info['requires_auth']:
-                    print(f"No API key for {api_name}, skipping...")
-                    continue
-                
-                # Headers প্রিপেয়ার করুন
-                headers = {}
-                for key, value in api_info['headers_template'].items():
-                    headers[key] = value.format(api_key=api_key)
-                
-                # Payload প্রিপেয়ার করুন
-                payload = self.prepare_payload(api_info['payload_template'], prompt)
-                
-                # Model সিলেক্ট করুন
-                model = random.choice(api_info['models'])
-                
-                # Request URL তৈরি করুন
-                if api_name == "huggingface":
-                    url = f"{api_info['base_url']}/{model}"
-                elif api_name == "replicate":
-                    url = api_info['base_url']
-                elif api_name == "stability":
-                    url = f"{api_info['base_url']}/{model}/text-to-image"
-                else:
-                    url = api_info['base_url']
-                
-                # Request সেন্ড করুন
-                response = requests.post(url, headers=headers, json=payload, timeout=60)
-                
-                # Response চেক করুন
-                if response.status_code == 200:
-                    # Update stats
-                    self.update_stats(api_name, success=True)
+                with tracing.span("select_provider") as span:
+                    # API সিলেক্ট করুন
+                    api_name = self.select_api()
+                    api_info = self.apis[api_name]
+                    span.set(provider=api_name)
+                    
+                    # API key নিন
+                    api_key = self.get_api_key(api_name)
+                    if not api_key and api_info['requires_auth']:
+                        print(f"No API key for {api_name}, skipping...")
+                        continue
+                    
+                    # Headers প্রিপেয়ার করুন
+                    headers = {}
+                    for key, value in api_info['headers_template'].items():
+                        headers[key] = value.format(api_key=api_key)
+                    
+                    # Payload প্রিপেয়ার করুন
+                    payload = self.prepare_payload(api_info['payload_template'], prompt)
                     
-                    # Get image data
+                    # Model সিলেক্ট করুন
+                    model = random.choice(api_info['models'])
+                    
+                    # Request URL তৈরি করুন
                     if api_name == "huggingface":
-                        return response.content
+                        url = f"{api_info['base_url']}/{model}"
                     elif api_name == "replicate":
-                        # Replicate returns a JSON with get URL
-                        result = response.json()
-                        if 'urls' in result and 'get' in result['urls']:
-                            get_url = result['urls']['get']
-                            # Poll for result
-                            return self.poll_replicate_result(get_url, headers)
+                        url = api_info['base_url']
                     elif api_name == "stability":
-                        result = response.json()
-                        if 'artifacts' in result and result['artifacts']:
-                            import base64
-                            image_data = base64.b64decode(result['artifacts'][0]['base64'])
-                            return image_data
+                        url = f"{api_info['base_url']}/{model}/text-to-image"
+                    else:
+                        url = api_info['base_url']
                 
-                else:
-                    print(f"API {api_name} error: {response.status_code} - {response.text}")
-                    self.update_stats(api_name, success=False)
-                    
-                    # Rate limit হলে delay করুন
-                    if response.status_code == 429:
-                        time.sleep(retry_delay * (attempt + 1))
+                # Request সেন্ড করুন
+                with self.provider_slot(api_name) as outcome:
+                    start = time.perf_counter()
+                    with tracing.span("http.post", provider=api_name) as span:
+                        response = requests.post(url, headers=headers, json=payload, timeout=60)
+                        span.set(status=response.status_code)
+                    # লিমিটার শুধু POST এর রাউন্ড ট্রিপ দেখে (পোলিং/ডাউনলোড নয়)
+                    outcome.latency = time.perf_counter() - start
+                    PROVIDER_LATENCY.observe(outcome.latency, provider=api_name)
+                    PROVIDER_REQUESTS.inc(provider=api_name, status=response.status_code)
                     
-                    continue
+                    # Response চেক করুন
+                    if response.status_code == 200:
+                        # Update stats
+                        self.update_stats(api_name, success=True)
+                        
+                        # Get image data
+                        if api_name == "huggingface":
+                            return response.content
+                        elif api_name == "replicate":
+                            # Replicate returns a JSON with get URL
+                            result = response.json()
+                            if 'urls' in result and 'get' in result['urls']:
+                                get_url = result['urls']['get']
+                                # Poll for result
+                                return self.poll_replicate_result(get_url, headers)
+                        elif api_name == "stability":
+                            result = response.json()
+                            if 'artifacts' in result and result['artifacts']:
+                                import base64
+                                image_data = base64.b64decode(result['artifacts'][0]['base64'])
+                                return image_data
                     
+                    else:
+                        print(f"API {api_name} error: {response.status_code} - {response.text}")
+                        self.update_stats(api_name, success=False)
+                        
+                        # Rate limit হলে লিমিট কমান ও delay করুন; অন্য এরর ল্যাটেন্সি স্যাম্পল নয়
+                        if response.status_code == 429:
+                            outcome.throttled = True
+                        else:
+                            outcome.dropped = True
+                
+                # স্লট ছেড়ে তারপর অপেক্ষা
+                if response.status_code == 429:
+                    time.sleep(retry_delay * (attempt + 1))
+            
             except Exception as e:
                 print(f"Error with API {api_name}: {str(e)}")
                 if api_name in self.apis:
@@ -324,13 +398,15 @@ class APIManager:
         
         return payload
     
+    @tracing.traced("replicate.poll")
     def poll_replicate_result(self, get_url, headers, max_attempts=30):
         """Replicate result পোল করুন"""
         
         for attempt in range(max_attempts):
             time.sleep(2)  # Wait 2 seconds between polls
             
-            response = requests.get(get_url, headers=headers)
+            with tracing.span("replicate.poll_get", attempt=attempt):
+                response = requests.get(get_url, headers=headers)
             
             if response.status_code == 200:
                 result = response.json()
@@ -341,7 +417,8 @@ class APIManager:
                         output_url = result['output'][0] if isinstance(result['output'], list) else result['output']
                         
                         # Download image
-                        image_response = requests.get(output_url)
+                        with tracing.span("replicate.download"):
+                            image_response = requests.get(output_url)
                         if image_response.status_code == 200:
                             return image_response.content
                 
@@ -380,6 +457,10 @@ class APIManager:
         
         # Update last used time
         self.api_stats[api_name]['last_used'] = datetime.now().isoformat()
+        
+        if api_name in self.apis:
+            remaining = self.apis[api_name]['daily_limit'] - self.api_stats[api_name]['daily_calls'][today]
+            QUOTA_REMAINING.set(max(0, remaining), provider=api_name)
     
     def get_usage_stats(self):
         """ইউজেজ স্ট্যাটস গেট করুন"""
@@ -444,36 +525,45 @@ class AsyncAPIManager(APIManager):
                     url = api_info['base_url']
                 
                 # Async request
-                async with aiohttp.ClientSession() as session:
-                    async with session.post(url, headers=headers, json=payload, timeout=60) as response:
-                        
-                        if response.status == 200:
-                            self.update_stats(api_name, success=True)
+                async with self.async_provider_slot(api_name) as outcome:
+                    async with aiohttp.ClientSession() as session:
+                        start = time.perf_counter()
+                        async with session.post(url, headers=headers, json=payload, timeout=60) as response:
+                            outcome.latency = time.perf_counter() - start
+                            PROVIDER_LATENCY.observe(outcome.latency, provider=api_name)
+                            PROVIDER_REQUESTS.inc(provider=api_name, status=response.status)
                             
-                            if api_name == "huggingface":
-                                return await response.read()
-                            elif api_name == "replicate":
-                                result = await response.json()
-                                if 'urls' in result:
-                                    get_url = result['urls']['get']
-                                    return await self.poll_replicate_result_async(get_url, headers)
-                            elif api_name == "stability":
-                                result = await response.json()
-                                if 'artifacts' in result:
-                                    import base64
-                                    image_data = base64.b64decode(result['artifacts'][0]['base64'])
-                                    return image_data
-                        
-                        else:
-                            error_text = await response.text()
-                            print(f"API {api_name} error: {response.status} - {error_text}")
-                            self.update_stats(api_name, success=False)
-                            
-                            if response.status == 429:
-                                await asyncio.sleep(2 * (attempt + 1))
-                            
-                            continue
+                            if response.status == 200:
+                                self.update_stats(api_name, success=True)
+                                
+                                if api_name == "huggingface":
+                                    return await response.read()
+                                elif api_name == "replicate":
+                                    result = await response.json()
+                                    if 'urls' in result:
+                                        get_url = result['urls']['get']
+                                        return await self.poll_replicate_result_async(get_url, headers)
+                                elif api_name == "stability":
+                                    result = await response.json()
+                                    if 'artifacts' in result:
+                                        import base64
+                                        image_data = base64.b64decode(result['artifacts'][0]['base64'])
+                                        return image_data
                             
+                            else:
+                                error_text = await response.text()
+                                print(f"API {api_name} error: {response.status} - {error_text}")
+                                self.update_stats(api_name, success=False)
+                                
+                                if response.status == 429:
+                                    outcome.throttled = True
+                                else:
+                                    outcome.dropped = True
+                
+                # স্লট ছেড়ে তারপর অপেক্ষা
+                if outcome.throttled:
+                    await asyncio.sleep(2 * (attempt + 1))
+            
             except Exception as e:
                 print(f"Error with API {api_name}: {str(e)}")
                 if api_name in self.apis:
@@ -482,6 +572,29 @@ class AsyncAPIManager(APIManager):
         
         return None
     
+    @contextlib.asynccontextmanager
+    async def async_provider_slot(self, api_name):
+        """async পাথের জন্য প্রোভাইডার স্লট - থ্রেড পাথের সাথে একই লিমিটার"""
+        limiter = self.provider_limiter(api_name)
+        slot = limiter.async_slot() if limiter is not None else self.async_fixed_slot(api_name)
+        async with slot as outcome:
+            PROVIDER_INFLIGHT.inc(provider=api_name)
+            try:
+                yield outcome
+            finally:
+                PROVIDER_INFLIGHT.dec(provider=api_name)
+    
+    @contextlib.asynccontextmanager
+    async def async_fixed_slot(self, api_name):
+        """async পাথের স্থির লিমিটের স্লট (লিমিট না থাকলে no-op)"""
+        limit = self.provider_limits.get(api_name)
+        if limit and api_name not in self.async_provider_slots:
+            self.async_provider_slots[api_name] = asyncio.Semaphore(limit)
+        
+        slot = self.async_provider_slots.get(api_name)
+        async with slot if slot is not None else contextlib.nullcontext():
+            yield RequestOutcome()
+    
     async def poll_replicate_result_async(self, get_url, headers, max_attempts=30):
         """Async replicate result পোল করুন"""
         
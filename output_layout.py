@@ -0,0 +1,223 @@
+# mass_image_generator/output_layout.py
+"""
+আউটপুট লেআউট - ইমেজ/মেটাডাটা কোথায় থাকবে তার একমাত্র পাথ রিজলভার
+
+ডিফল্ট লেআউট:   outputs/images/YYYYMMDD/image_000001_120000.png
+শার্ডেড লেআউট:   outputs/images/YYYYMMDD/3f/a2/image_000001_120000.png
+
+শার্ডিং কনফিগ (output_settings.sharding):
+    enabled  - শার্ডিং চালু কি না (ডিফল্ট false)
+    key      - "name" (ফাইলনেমের হ্যাশ), "content" (কনটেন্টের হ্যাশ) বা "index"
+    levels   - কয় লেভেল ডিরেক্টরি (ডিফল্ট 2)
+    width    - প্রতি লেভেলে কয়টি hex অক্ষর (ডিফল্ট 2 = 256টি ফোল্ডার)
+    index_bucket - "index" কী তে প্রতি শার্ডে কয়টি ইমেজ (ডিফল্ট 1000)
+"""
+
+import os
+import hashlib
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+
+DAY_FORMAT = "%Y%m%d"
+
+class OutputLayout:
+    """আউটপুট পাথ রিজলভার"""
+    
+    def __init__(self, base_dir="outputs", sharding: Optional[Dict] = None):
+        sharding = sharding or {}
+        
+        self.base_dir = base_dir
+        self.sharded = bool(sharding.get('enabled', False))
+        self.shard_key = sharding.get('key', 'name')
+        self.levels = int(sharding.get('levels', 2))
+        self.width = int(sharding.get('width', 2))
+        self.index_bucket = int(sharding.get('index_bucket', 1000))
+        
+        if self.shard_key not in ('name', 'content', 'index'):
+            raise ValueError(f"Unknown shard key: {self.shard_key}")
+        if self.levels < 1 or self.width < 1:
+            raise ValueError("sharding levels and width must be positive")
+        
+        # ইতিমধ্যে তৈরি ডিরেক্টরি - প্রতি ফাইলে makedirs এড়াতে
+        self.created_dirs = set()
+        self.lock = threading.Lock()
+    
+    @classmethod
+    def from_config(cls, config):
+        """কনফিগ থেকে লেআউট তৈরি করুন"""
+        output_settings = config.get('output_settings', {})
+        return cls(
+            base_dir=output_settings.get('base_dir', 'outputs'),
+            sharding=output_settings.get('sharding')
+        )
+    
+    def root(self, kind='images'):
+        """একটি ধরনের রুট ডিরেক্টরি (images/metadata)"""
+        return os.path.join(self.base_dir, kind)
+    
+    @staticmethod
+    def day_key(when: Optional[datetime] = None):
+        """তারিখের ফোল্ডার নাম"""
+        return (when or datetime.now()).strftime(DAY_FORMAT)
+    
+    def day_dir(self, kind='images', day: Optional[str] = None):
+        """একটি দিনের ডিরেক্টরি"""
+        return os.path.join(self.root(kind), day or self.day_key())
+    
+    def shard_parts(self, filename: str, content: Optional[bytes] = None, index: Optional[int] = None):
+        """ফাইলের শার্ড ডিরেক্টরি অংশগুলো (শার্ডিং বন্ধ থাকলে খালি)"""
+        if not self.sharded:
+            return []
+        
+        digits = self.levels * self.width
+        if self.shard_key == 'index' and index is not None:
+            digest = f"{index // self.index_bucket:0{digits}x}"[-digits:]
+        elif self.shard_key == 'content' and content is not None:
+            digest = hashlib.blake2b(content, digest_size=16).hexdigest()
+        else:
+            digest = hashlib.blake2b(filename.encode('utf-8'), digest_size=16).hexdigest()
+        
+        return [digest[i * self.width:(i + 1) * self.width] for i in range(self.levels)]
+    
+    def shard_path(self, day_dir: str, filename: str, content: Optional[bytes] = None,
+                   index: Optional[int] = None):
+        """যেকোনো দিনের ডিরেক্টরির নিচে ফাইলের পাথ"""
+        return os.path.join(day_dir, *self.shard_parts(filename, content, index), filename)
+    
+    def image_path(self, filename: str, day: Optional[str] = None, content: Optional[bytes] = None,
+                   index: Optional[int] = None):
+        """ইমেজ ফাইলের পাথ"""
+        return self.shard_path(self.day_dir('images', day), filename, content, index)
+    
+    def metadata_path(self, filename: str, day: Optional[str] = None, index: Optional[int] = None):
+        """মেটাডাটা ফাইলের পাথ (কনটেন্ট জানা থাকে না, তাই নাম/ইনডেক্স দিয়ে শার্ড)"""
+        return self.shard_path(self.day_dir('metadata', day), filename, index=index)
+    
+    def ensure_parent(self, filepath: str):
+        """ফাইলের প্যারেন্ট ডিরেক্টরি একবারই তৈরি করুন"""
+        directory = os.path.dirname(filepath)
+        if directory in self.created_dirs:
+            return directory
+        
+        os.makedirs(directory, exist_ok=True)
+        with self.lock:
+            self.created_dirs.add(directory)
+        return directory
+    
+    def day_dirs(self, kind='images'):
+        """তারিখ অনুযায়ী ফোল্ডারগুলো - (day, path, date) তালিকা"""
+        root = self.root(kind)
+        if not os.path.isdir(root):
+            return []
+        
+        days = []
+        with os.scandir(root) as entries:
+            for entry in entries:
+                if not entry.is_dir():
+                    continue
+                try:
+                    date = datetime.strptime(entry.name, DAY_FORMAT)
+                except ValueError:
+                    continue
+                days.append((entry.name, entry.path, date))
+        
+        days.sort()
+        return days
+    
+    @staticmethod
+    def iter_files(directory: str):
+        """ডিরেক্টরি ও তার শার্ডের সব ফাইল (os.DirEntry)"""
+        stack = [directory]
+        while stack:
+            current = stack.pop()
+            with os.scandir(current) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file():
+                        yield entry
+    
+    def backup_sources(self):
+        """ব্যাকআপে যাওয়া আউটপুট ডিরেক্টরি"""
+        return [self.root('images'), self.root('metadata')]
+    
+    def reshard_day(self, day: str, kind='images', batch_size=1000, dry_run=False):
+        """একটি দিনের ফাইলগুলো কারেন্ট লেআউটে সরান (ব্যাচে os.rename)"""
+        day_dir = self.day_dir(kind, day)
+        if not os.path.isdir(day_dir):
+            return 0
+        
+        # প্রথমে পুরো প্ল্যান, তারপর টার্গেট ডিরেক্টরি অনুযায়ী গ্রুপ
+        plan: Dict[str, List] = {}
+        for entry in self.iter_files(day_dir):
+            content = None
+            if self.sharded and self.shard_key == 'content' and kind == 'images':
+                with open(entry.path, 'rb') as f:
+                    content = f.read()
+            
+            target = self.shard_path(day_dir, entry.name, content=content,
+                                     index=self.index_from_name(entry.name))
+            if os.path.normpath(target) != os.path.normpath(entry.path):
+                plan.setdefault(os.path.dirname(target), []).append((entry.path, target))
+        
+        moves = [move for group in plan.values() for move in group]
+        if dry_run:
+            for source, target in moves:
+                print(f"  {source} -> {target}")
+            return len(moves)
+        
+        for directory in plan:
+            os.makedirs(directory, exist_ok=True)
+        
+        for start in range(0, len(moves), batch_size):
+            batch = moves[start:start + batch_size]
+            for source, target in batch:
+                os.rename(source, target)
+            print(f"  {day}: moved {start + len(batch)}/{len(moves)} files")
+        
+        self.remove_empty_dirs(day_dir)
+        return len(moves)
+    
+    @staticmethod
+    def index_from_name(filename: str):
+        """image_000123_... বা meta_000123.json থেকে ইনডেক্স বের করুন"""
+        parts = os.path.splitext(filename)[0].split('_')
+        if len(parts) >= 2 and parts[1].isdigit():
+            return int(parts[1])
+        return None
+    
+    @staticmethod
+    def remove_empty_dirs(directory: str):
+        """খালি শার্ড ফোল্ডার মুছে ফেলুন (রুট বাদে)"""
+        for dirpath, dirnames, filenames in os.walk(directory, topdown=False):
+            if dirpath != directory and not os.listdir(dirpath):
+                os.rmdir(dirpath)
+
+# কমান্ড লাইন ইন্টারফেস
+def main():
+    """মেইন ফাংশন"""
+    import argparse
+    from config_loader import get_config
+    
+    parser = argparse.ArgumentParser(description="Output layout migration")
+    parser.add_argument("command", choices=["reshard"], help="Command to run")
+    parser.add_argument("--day", help="Only this day (YYYYMMDD)")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Renames per batch")
+    parser.add_argument("--dry-run", action="store_true", help="Only print planned moves")
+    
+    args = parser.parse_args()
+    
+    layout = OutputLayout.from_config(get_config())
+    
+    total = 0
+    for kind in ('images', 'metadata'):
+        days = [args.day] if args.day else [day for day, _, _ in layout.day_dirs(kind)]
+        for day in days:
+            total += layout.reshard_day(day, kind, batch_size=args.batch_size, dry_run=args.dry_run)
+    
+    action = "Would move" if args.dry_run else "Moved"
+    print(f"{action} {total} files")
+
+if __name__ == "__main__":
+    main()
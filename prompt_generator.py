@@ -6,21 +6,110 @@
 import os
 import json
 import random
-from typing import List, Dict
+from typing import List, Dict, Optional, Sequence
 from datetime import datetime
 
+from config_loader import get_config
+from vocabulary_store import VocabularyStore, MappedWordList
+
+class AliasSampler:
+    """ওয়েটেড স্যাম্পলার - Vose alias method, O(1) ড্র"""
+    
+    def __init__(self, items: Sequence, weights: Optional[Sequence[float]] = None):
+        self.items = items
+        self.size = len(items)
+        self.prob = None
+        self.alias = None
+        
+        # ওয়েট না থাকলে বা সব সমান হলে ইউনিফর্ম ড্র
+        if weights is not None and len(set(weights)) > 1:
+            self.build_table(weights)
+    
+    def build_table(self, weights):
+        """alias টেবিল তৈরি করুন"""
+        if len(weights) != self.size:
+            raise ValueError("weights and items must have the same length")
+        if any(w < 0 for w in weights):
+            raise ValueError("weights must be non-negative")
+        
+        total = float(sum(weights))
+        if total <= 0:
+            raise ValueError("at least one weight must be positive")
+        
+        scaled = [w * self.size / total for w in weights]
+        prob = [0.0] * self.size
+        alias = [0] * self.size
+        
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        
+        while small and large:
+            s = small.pop()
+            l = large.pop()
+            prob[s] = scaled[s]
+            alias[s] = l
+            scaled[l] = (scaled[l] + scaled[s]) - 1.0
+            if scaled[l] < 1.0:
+                small.append(l)
+            else:
+                large.append(l)
+        
+        # Floating point residue - এরা নিজেরাই নিজের alias
+        for i in large + small:
+            prob[i] = 1.0
+            alias[i] = i
+        
+        self.prob = prob
+        self.alias = alias
+    
+    def draw(self):
+        """একটি আইটেম ড্র করুন"""
+        i = random.randrange(self.size)
+        if self.prob is None or random.random() < self.prob[i]:
+            return self.items[i]
+        return self.items[self.alias[i]]
+    
+    def __len__(self):
+        return self.size
+
 class PromptFactory:
     """প্রম্পট ফ্যাক্টরি ক্লাস"""
     
-    def __init__(self, config_file="config.json"):
-        # লোড কনফিগারেশন
-        config_path = os.path.join(os.path.dirname(__file__), config_file)
-        with open(config_path, 'r', encoding='utf-8') as f:
-            self.config = json.load(f)
+    # স্যাম্পল করা যায় এমন ভোকাবুলারি
+    VOCABULARIES = [
+        "subjects_bn", "subjects_en", "styles", "colors", "adjectives_bn",
+        "adjectives_en", "adverbs", "media", "lighting", "composition"
+    ]
+    
+    def __init__(self, config_file=None):
+        # লোড কনফিগারেশন (শেয়ার্ড ক্যাশ থেকে, None হলে MASS_IMAGE_CONFIG/ডিফল্ট)
+        self.config_file = config_file
+        self.config = get_config(config_file)
+        
+        self.prompt_settings = self.config.get('prompt_settings', {})
         
         # বাংলা এবং ইংলিশ ডেটা
         self.load_data()
+        self.load_external_vocabularies()
+        self.build_samplers()
+        
+    def refresh(self):
+        """কনফিগ রিলোড হলে prompt_settings আবার পড়ুন - বদলালে স্যাম্পলার নতুন করে তৈরি"""
+        config = get_config(self.config_file)
+        if config is self.config:
+            return False
         
+        self.config = config
+        prompt_settings = config.get('prompt_settings', {})
+        if prompt_settings == self.prompt_settings:
+            return False
+        
+        self.prompt_settings = prompt_settings
+        self.load_data()
+        self.load_external_vocabularies()
+        self.build_samplers()
+        return True
+    
     def load_data(self):
         """ডেটা লোড করুন"""
         # বিষয়বস্তু
@@ -97,14 +186,55 @@ class PromptFactory:
             "centered", "dynamic angle", "bird's eye view", "worm's eye view"
         ]
     
-    def generate_single_prompt(self, language="en"):
+    def load_external_vocabularies(self):
+        """এক্সটার্নাল ওয়ার্ড লিস্ট দিয়ে বিল্ট-ইন ভোকাবুলারি রিপ্লেস করুন"""
+        self.vocabulary_store = None
+        
+        vocab_dir = self.prompt_settings.get('vocabulary_dir')
+        if not vocab_dir or not os.path.isdir(vocab_dir):
+            return
+        
+        self.vocabulary_store = VocabularyStore(vocab_dir)
+        for name in self.VOCABULARIES:
+            word_list = self.vocabulary_store.lookup(name)
+            if word_list is not None:
+                setattr(self, name, word_list)
+    
+    def build_samplers(self):
+        """ভোকাবুলারি স্যাম্পলার তৈরি করুন"""
+        # কনফিগ থেকে per-term ওয়েট, যেমন:
+        # "term_weights": {"styles": {"vector art": 3, "anime": 0.5}}
+        term_weights = self.prompt_settings.get('term_weights', {})
+        
+        self.samplers = {}
+        for name in self.VOCABULARIES:
+            items = getattr(self, name)
+            weights = None
+            
+            configured = term_weights.get(name)
+            if configured and isinstance(items, MappedWordList):
+                # বড় corpus এ per-term ওয়েট টেবিল বানালে পুরো ফাইল পড়তে হবে
+                print(f"Warning: term_weights ignored for external vocabulary '{name}'")
+            elif configured:
+                weights = [float(configured.get(term, 1.0)) for term in items]
+            
+            self.samplers[name] = AliasSampler(items, weights)
+    
+    def pick(self, vocabulary):
+        """ভোকাবুলারি থেকে একটি টার্ম নিন"""
+        return self.samplers[vocabulary].draw()
+    
+    def generate_single_prompt(self, language="en", subject=None, style=None):
         """একটি প্রম্পট জেনারেট করুন"""
         
+        if style is None:
+            style = self.pick("styles")
+        
         if language == "bn":
-            subject = random.choice(self.subjects_bn)
-            adjective = random.choice(self.adjectives_bn)
-            style = random.choice(self.styles)
-            color = random.choice(self.colors)
+            if subject is None:
+                subject = self.pick("subjects_bn")
+            adjective = self.pick("adjectives_bn")
+            color = self.pick("colors")
             
             templates = [
                 f"{adjective} {subject}, {style} স্টাইল, {color} রং",
@@ -114,14 +244,14 @@ class PromptFactory:
             ]
             
         else:  # English
-            subject = random.choice(self.subjects_en)
-            adjective = random.choice(self.adjectives_en)
-            style = random.choice(self.styles)
-            color = random.choice(self.colors)
-            adverb = random.choice(self.adverbs)
-            media = random.choice(self.media)
-            light = random.choice(self.lighting)
-            comp = random.choice(self.composition)
+            if subject is None:
+                subject = self.pick("subjects_en")
+            adjective = self.pick("adjectives_en")
+            color = self.pick("colors")
+            adverb = self.pick("adverbs")
+            media = self.pick("media")
+            light = self.pick("lighting")
+            comp = self.pick("composition")
             
             templates = [
                 f"{adjective} {subject}, {style} style, {color} colors, {media}",
@@ -133,9 +263,18 @@ class PromptFactory:
         
         return random.choice(templates)
     
-    def generate_batch(self, count=1000, language="mixed"):
+    def generate_batch(self, count=1000, language="mixed", mode=None):
         """বহু সংখ্যক প্রম্পট জেনারেট করুন"""
         
+        # প্রতি ব্যাচে কারেন্ট কনফিগ (দীর্ঘ সময় চলা শিডিউলারে হট-রিলোড)
+        self.refresh()
+        
+        if mode is None:
+            mode = self.prompt_settings.get('sampling_mode', 'random')
+        
+        if mode == "balanced":
+            return self.generate_balanced_batch(count, language)
+        
         prompts = set()
         attempt = 0
         max_attempts = count * 2
@@ -165,6 +304,47 @@ class PromptFactory:
         
         return list(prompts)
     
+    def generate_balanced_batch(self, count=1000, language="mixed"):
+        """(subject, style) সেল জুড়ে সমানভাবে কোটা ভাগ করে প্রম্পট জেনারেট করুন"""
+        
+        # ভাষা অনুযায়ী কোটা ভাগ করুন (mixed = ২/৩ ইংরেজি, ১/৩ বাংলা)
+        if language == "mixed":
+            bn_quota = count // 3
+            quotas = {"en": count - bn_quota, "bn": bn_quota}
+        else:
+            quotas = {language: count}
+        
+        prompts = []
+        seen = set()
+        
+        for lang, quota in quotas.items():
+            subjects = self.subjects_bn if lang == "bn" else self.subjects_en
+            styles = self.styles
+            cells = len(subjects) * len(styles)
+            
+            # প্রতিটি সেল base বার, বাকিটা আলাদা আলাদা সেলে
+            base, extra = divmod(quota, cells)
+            cell_ids = list(range(cells)) * base if base else []
+            cell_ids.extend(random.sample(range(cells), extra))
+            
+            for cell in cell_ids:
+                subject = subjects[cell // len(styles)]
+                style = styles[cell % len(styles)]
+                
+                # একই সেলে ইউনিক প্রম্পটের জন্য কয়েকবার চেষ্টা করুন
+                for _ in range(5):
+                    prompt = self.generate_single_prompt(lang, subject=subject, style=style)
+                    if prompt not in seen:
+                        seen.add(prompt)
+                        prompts.append(prompt)
+                        break
+        
+        if len(prompts) < count:
+            print(f"Warning: Could only generate {len(prompts)} unique prompts")
+        
+        random.shuffle(prompts)
+        return prompts
+    
     def generate_from_template(self, template_count=100):
         """টেম্পলেট থেকে প্রম্পট জেনারেট করুন"""
         
@@ -190,14 +370,14 @@ class PromptFactory:
             
             # প্লেসহোল্ডার রিপ্লেস করুন
             prompt = template
-            prompt = prompt.replace("{adjective}", random.choice(self.adjectives_en))
-            prompt = prompt.replace("{subject}", random.choice(self.subjects_en))
-            prompt = prompt.replace("{style}", random.choice(self.styles))
-            prompt = prompt.replace("{color}", random.choice(self.colors))
-            prompt = prompt.replace("{media}", random.choice(self.media))
-            prompt = prompt.replace("{lighting}", random.choice(self.lighting))
-            prompt = prompt.replace("{composition}", random.choice(self.composition))
-            prompt = prompt.replace("{adverb}", random.choice(self.adverbs))
+            prompt = prompt.replace("{adjective}", self.pick("adjectives_en"))
+            prompt = prompt.replace("{subject}", self.pick("subjects_en"))
+            prompt = prompt.replace("{style}", self.pick("styles"))
+            prompt = prompt.replace("{color}", self.pick("colors"))
+            prompt = prompt.replace("{media}", self.pick("media"))
+            prompt = prompt.replace("{lighting}", self.pick("lighting"))
+            prompt = prompt.replace("{composition}", self.pick("composition"))
+            prompt = prompt.replace("{adverb}", self.pick("adverbs"))
             
             prompts.append(prompt)
         
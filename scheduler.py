@@ -15,22 +15,24 @@ from colorama import Fore, Style
 # Add parent directory to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from config_loader import get_config, add_concurrency_arguments, concurrency_overrides, describe_concurrency
 from prompt_generator import PromptFactory
 from bulk_generator import MassImageGenerator
+from output_layout import OutputLayout
+from catalogue import Catalogue
+from metrics import add_metrics_arguments, start_from_args
+import tracing
 
 class ImageScheduler:
     """ইমেজ শিডিউলার ক্লাস"""
     
-    def __init__(self, daily_target=200, config_file="config.json"):
+    def __init__(self, daily_target=200, config_file=None, overrides=None):
         self.daily_target = daily_target
         self.config_file = config_file
+        self.overrides = overrides or {}
         self.running = False
         self.thread = None
         
-        # Load config
-        with open(config_file, 'r') as f:
-            self.config = json.load(f)
-        
         # Initialize components
         self.prompt_factory = PromptFactory(config_file)
         self.generator = None
@@ -47,6 +49,11 @@ class ImageScheduler:
         # Create logs directory
         os.makedirs("outputs/logs", exist_ok=True)
     
+    @property
+    def config(self):
+        """কারেন্ট কনফিগ - ফাইল বদলালে অটো রিলোড হয়, CLI ওভাররাইড সহ"""
+        return get_config(self.config_file).with_overrides(self.overrides)
+    
     def load_stats(self):
         """স্ট্যাটস লোড করুন"""
         stats_file = "outputs/logs/scheduler_stats.json"
@@ -128,7 +135,7 @@ class ImageScheduler:
             print(f"{Fore.YELLOW}{'='*60}{Style.RESET_ALL}")
             
             return results
-            
+        
         except Exception as e:
             print(f"{Fore.RED}❌ Error in daily generation: {str(e)}{Style.RESET_ALL}")
             
@@ -175,21 +182,48 @@ class ImageScheduler:
         
         cutoff_date = datetime.now() - timedelta(days=days_to_keep)
         
-        # Cleanup old image directories
-        base_dir = "outputs/images"
-        if os.path.exists(base_dir):
-            for folder in os.listdir(base_dir):
-                folder_path = os.path.join(base_dir, folder)
-                
+        # Cleanup old image and metadata directories (shards included)
+        layout = OutputLayout.from_config(self.config)
+        catalogue = Catalogue.from_config(self.config)
+        similarity_index = None
+        if self.config.get('output_settings', {}).get('reject_near_duplicates', False):
+            from similarity_index import SimilarityIndex
+            similarity_index = SimilarityIndex.from_config(self.config)
+        pruned = 0
+        
+        # দিনের ফোল্ডারের নাম থেকে (ক্যাটালগে না থাকা দিনও মুছবে), সাথে ক্যাটালগে
+        # থাকা পুরানো দিন যাদের ফোল্ডার আগেই হাতে মোছা হয়েছে (রো বাদ দিতে)
+        old_days = {day for kind in ('images', 'metadata')
+                    for day, _, folder_date in layout.day_dirs(kind)
+                    if folder_date < cutoff_date}
+        if catalogue is not None:
+            old_days.update(catalogue.days(before=layout.day_key(cutoff_date)))
+        old_days = sorted(old_days)
+        
+        for day in old_days:
+            for kind in ('images', 'metadata'):
+                folder_path = layout.day_dir(kind, day)
+                if not os.path.isdir(folder_path):
+                    continue
                 try:
-                    # Try to parse date from folder name
-                    folder_date = datetime.strptime(folder, "%Y%m%d")
-                    
-                    if folder_date < cutoff_date:
-                        shutil.rmtree(folder_path)
-                        print(f"  Deleted: {folder_path}")
-                except:
-                    pass
+                    shutil.rmtree(folder_path)
+                    print(f"  Deleted: {folder_path}")
+                except OSError as e:
+                    print(f"  Could not delete {folder_path}: {e}")
+            
+            if catalogue is not None:
+                catalogue.delete_day(day)
+            
+            # মোছা ইমেজ যেন নতুন ইমেজকে near-duplicate বলে বাদ না দেয়
+            if similarity_index is not None:
+                pruned += similarity_index.remove_under(layout.day_dir('images', day))
+        
+        if catalogue is not None:
+            catalogue.close()
+        
+        if pruned:
+            similarity_index.compact()
+            print(f"  Removed {pruned} entries from the similarity index")
         
         print(f"{Fore.GREEN}✓ Cleanup completed{Style.RESET_ALL}")
     
@@ -249,6 +283,13 @@ class ImageScheduler:
         print(f"{Fore.WHITE}Runs Today: {self.stats['runs_today']}{Style.RESET_ALL}")
         print(f"{Fore.WHITE}Success Rate: {self.stats.get('success_rate', 0):.1f}%{Style.RESET_ALL}")
         
+        catalogue = Catalogue.from_config(self.config)
+        if catalogue is not None:
+            summary = catalogue.summary()
+            catalogue.close()
+            print(f"{Fore.WHITE}Catalogue: {summary['files']} images, "
+                  f"{summary['size'] / (1024 * 1024):.1f} MB{Style.RESET_ALL}")
+        
         # Next run
         if schedule.jobs:
             next_run = schedule.next_run()
@@ -271,13 +312,14 @@ class ImageScheduler:
         self.print_status()
         
         print(f"\n{Fore.GREEN}✅ Scheduler started!{Style.RESET_ALL}")
+        print(f"{Fore.CYAN}Concurrency: {describe_concurrency(self.config)}{Style.RESET_ALL}")
         print(f"{Fore.YELLOW}Press Ctrl+C to stop{Style.RESET_ALL}")
         
         try:
             while self.running:
                 schedule.run_pending()
                 time.sleep(60)  # Check every minute
-                
+        
         except KeyboardInterrupt:
             print(f"\n{Fore.YELLOW}🛑 Scheduler stopped by user{Style.RESET_ALL}")
             self.running = False
@@ -312,10 +354,25 @@ def main():
     parser.add_argument("--daily", "-d", type=int, default=200, help="Daily target images")
     parser.add_argument("--run-once", "-r", action="store_true", help="Run once and exit")
     parser.add_argument("--small-batch", "-s", type=int, help="Run a small batch")
+    parser.add_argument("--threads", "-t", type=int, help="Number of threads")
+    add_concurrency_arguments(parser)
+    add_metrics_arguments(parser)
+    tracing.add_tracing_arguments(parser)
     
     args = parser.parse_args()
     
-    scheduler = ImageScheduler(daily_target=args.daily)
+    try:
+        overrides = concurrency_overrides(args)
+    except ValueError as e:
+        parser.error(str(e))
+    
+    start_from_args(args)
+    try:
+        tracing.configure_from_args(args)
+    except ValueError as e:
+        parser.error(str(e))
+    
+    scheduler = ImageScheduler(daily_target=args.daily, overrides=overrides)
     
     if args.run_once:
         # Run once
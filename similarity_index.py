@@ -0,0 +1,353 @@
+# mass_image_generator/similarity_index.py
+"""
+সিমিলারিটি ইনডেক্স - পারসেপচুয়াল হ্যাশ (dHash/pHash) দিয়ে প্রায়-একই ইমেজ খোঁজে
+
+৬৪-বিট হ্যাশগুলো multi-index hashing এ রাখা হয়: হ্যাশকে কয়েকটি ব্লকে ভাগ
+করা হয়, আর Hamming দূরত্ব r হলে pigeonhole অনুযায়ী অন্তত একটি ব্লক হুবহু
+মিলবে (r < ব্লক সংখ্যা)। তাই কোয়েরি শুধু ওই বাকেটগুলো দেখে।
+"""
+
+import io
+import os
+import json
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+from PIL import Image
+
+HASH_BITS = 64
+
+# uint8 এর popcount টেবিল (numpy < 2.0 এর জন্য)
+POPCOUNT_TABLE = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+def popcount64(values):
+    """uint64 অ্যারের প্রতিটি এলিমেন্টের সেট বিট"""
+    values = np.ascontiguousarray(values, dtype=np.uint64)
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(values)
+    return POPCOUNT_TABLE[values.view(np.uint8)].reshape(values.shape + (8,)).sum(axis=-1)
+
+def hamming_distance(a: int, b: int):
+    """দুটি হ্যাশের Hamming দূরত্ব"""
+    return bin(a ^ b).count("1")
+
+def bits_to_int(bits):
+    """bool অ্যারে থেকে ইন্টিজার হ্যাশ"""
+    value = 0
+    for bit in bits.flatten():
+        value = (value << 1) | int(bit)
+    return value
+
+def _prepare(image, size):
+    """ছোট গ্রেস্কেল ইমেজ তৈরি করুন (JPEG হলে draft দিয়ে ছোট করে ডিকোড)"""
+    # draft শুধু JPEG এ কাজ করে - পুরো রেজোলিউশনে ডিকোড এড়ায়
+    image.draft("L", (size[0] * 4, size[1] * 4))
+    return image.convert("L").resize(size, Image.Resampling.BILINEAR)
+
+def dhash(image, hash_size=8):
+    """ডিফারেন্স হ্যাশ"""
+    pixels = np.asarray(_prepare(image, (hash_size + 1, hash_size)), dtype=np.int16)
+    return bits_to_int(pixels[:, 1:] > pixels[:, :-1])
+
+_DCT_CACHE = {}
+
+def _dct_matrix(n):
+    """n x n DCT-II ম্যাট্রিক্স"""
+    if n not in _DCT_CACHE:
+        k = np.arange(n)[:, None]
+        i = np.arange(n)[None, :]
+        matrix = np.cos(np.pi * (2 * i + 1) * k / (2 * n)) * np.sqrt(2.0 / n)
+        matrix[0, :] = np.sqrt(1.0 / n)
+        _DCT_CACHE[n] = matrix
+    return _DCT_CACHE[n]
+
+def phash(image, hash_size=8, highfreq_factor=4):
+    """DCT ভিত্তিক পারসেপচুয়াল হ্যাশ"""
+    n = hash_size * highfreq_factor
+    pixels = np.asarray(_prepare(image, (n, n)), dtype=np.float64)
+    dct = _dct_matrix(n)
+    coefficients = (dct @ pixels @ dct.T)[:hash_size, :hash_size]
+    # DC কম্পোনেন্ট বাদ দিয়ে মিডিয়ান
+    median = np.median(coefficients.flatten()[1:])
+    return bits_to_int(coefficients > median)
+
+HASH_METHODS = {"dhash": dhash, "phash": phash}
+
+def hash_image_file(filepath: str, method="dhash"):
+    """ইমেজ ফাইলের পারসেপচুয়াল হ্যাশ"""
+    with Image.open(filepath) as image:
+        return HASH_METHODS[method](image)
+
+def hash_image_bytes(data: bytes, method="dhash"):
+    """মেমোরির ইমেজ ডেটার পারসেপচুয়াল হ্যাশ"""
+    with Image.open(io.BytesIO(data)) as image:
+        return HASH_METHODS[method](image)
+
+class SimilarityIndex:
+    """multi-index hashing ভিত্তিক ইনক্রিমেন্টাল হ্যাশ ইনডেক্স"""
+    
+    def __init__(self, index_file: Optional[str] = None, method="dhash", blocks=4):
+        if not 1 <= blocks <= HASH_BITS:
+            raise ValueError("blocks must be between 1 and 64")
+        
+        self.index_file = index_file
+        self.method = method
+        self.blocks = blocks
+        self.lock = threading.RLock()
+        
+        # path -> (size, mtime_ns, hash)
+        self.entries: Dict[str, tuple] = {}
+        # প্রতিটি ব্লকের জন্য block value -> paths
+        self.tables: List[Dict[int, set]] = [{} for _ in range(blocks)]
+        
+        # ব্লকগুলোর (shift, mask)
+        widths = [HASH_BITS // blocks + (1 if i < HASH_BITS % blocks else 0) for i in range(blocks)]
+        self.block_layout = []
+        shift = HASH_BITS
+        for width in widths:
+            shift -= width
+            self.block_layout.append((shift, (1 << width) - 1))
+        
+        if index_file and os.path.exists(index_file):
+            self.load()
+    
+    @classmethod
+    def from_config(cls, config):
+        """জেনারেটরের near-duplicate ইনডেক্স (output_settings.reject_near_duplicates বন্ধ থাকলে None)"""
+        output_settings = config.get('output_settings', {})
+        if not output_settings.get('reject_near_duplicates', False):
+            return None
+        return cls(
+            os.path.join(output_settings.get('base_dir', 'outputs'), 'similarity_index.jsonl'),
+            method=output_settings.get('similarity_method', 'dhash')
+        )
+    
+    @property
+    def max_radius(self):
+        """গ্যারান্টিড সঠিক সর্বোচ্চ কোয়েরি রেডিয়াস"""
+        return self.blocks - 1
+    
+    def _block_keys(self, value: int):
+        return [(value >> shift) & mask for shift, mask in self.block_layout]
+    
+    def _insert(self, filepath, size, mtime, value):
+        if filepath in self.entries:
+            self._remove(filepath)
+        self.entries[filepath] = (size, mtime, value)
+        for table, key in zip(self.tables, self._block_keys(value)):
+            table.setdefault(key, set()).add(filepath)
+    
+    def _remove(self, filepath):
+        _, _, value = self.entries.pop(filepath)
+        for table, key in zip(self.tables, self._block_keys(value)):
+            bucket = table.get(key)
+            if bucket is not None:
+                bucket.discard(filepath)
+                if not bucket:
+                    del table[key]
+    
+    def load(self):
+        """ইনডেক্স ফাইল লোড করুন (পরের লাইন আগেরটাকে ওভাররাইড করে)"""
+        with open(self.index_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # অর্ধেক লেখা শেষ লাইন
+                    continue
+                
+                if record.get("deleted"):
+                    if record["path"] in self.entries:
+                        self._remove(record["path"])
+                else:
+                    self._insert(record["path"], record["size"], record["mtime"], int(record["hash"], 16))
+    
+    def _append(self, records):
+        if not self.index_file or not records:
+            return
+        directory = os.path.dirname(self.index_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.index_file, 'a', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    
+    def add(self, filepath: str, value: int, size=0, mtime=0):
+        """একটি হ্যাশ যোগ করুন"""
+        with self.lock:
+            self._insert(filepath, size, mtime, value)
+            self._append([{"path": filepath, "size": size, "mtime": mtime, "hash": f"{value:016x}"}])
+    
+    def query(self, value: int, max_distance=3):
+        """max_distance এর মধ্যে থাকা ইমেজগুলো (path, distance)"""
+        if max_distance > self.max_radius:
+            raise ValueError(f"max_distance must be <= {self.max_radius} for {self.blocks} blocks")
+        
+        with self.lock:
+            candidates = set()
+            for table, key in zip(self.tables, self._block_keys(value)):
+                candidates.update(table.get(key, ()))
+            
+            matches = []
+            for filepath in candidates:
+                distance = hamming_distance(value, self.entries[filepath][2])
+                if distance <= max_distance:
+                    matches.append((filepath, distance))
+        
+        matches.sort(key=lambda x: x[1])
+        return matches
+    
+    def add_if_unique(self, filepath: str, value: int, max_distance=3, size=0, mtime=0, persist=True):
+        """কাছাকাছি কিছু না থাকলে যোগ করুন - থাকলে মিলগুলো রিটার্ন করে
+        
+        persist=False হলে এন্ট্রি শুধু মেমোরিতে রিজার্ভ হয় (একই সময়ে আসা প্রায়-একই
+        ইমেজ আটকায়) - ফাইল লেখা সফল হলে persist(), ব্যর্থ হলে discard()।
+        """
+        with self.lock:
+            matches = [m for m in self.query(value, max_distance) if m[0] != filepath]
+            if matches:
+                return matches
+            if persist:
+                self.add(filepath, value, size=size, mtime=mtime)
+            else:
+                self._insert(filepath, size, mtime, value)
+            return []
+    
+    def persist(self, filepath: str, size: int, mtime: int):
+        """রিজার্ভ করা এন্ট্রি ডিস্কের আসল size/mtime সহ ইনডেক্স ফাইলে লিখুন"""
+        with self.lock:
+            value = self.entries[filepath][2]
+            self.add(filepath, value, size=size, mtime=mtime)
+    
+    def discard(self, filepath: str):
+        """রিজার্ভ করা (ফাইলে না লেখা) এন্ট্রি মেমোরি থেকে বাদ দিন"""
+        with self.lock:
+            if filepath in self.entries:
+                self._remove(filepath)
+    
+    def update_directory(self, directory: str, max_workers=None):
+        """ডিরেক্টরির নতুন/বদলানো ইমেজ ইনডেক্স করুন, মুছে যাওয়াগুলো বাদ দিন"""
+        import concurrent.futures
+        from utils.file_manager import FileManager
+        
+        files = FileManager.scan_files(directory)
+        seen = {path for path, _, _ in files}
+        changed = [(path, size, mtime) for path, size, mtime in files
+                   if self.entries.get(path, (None, None))[:2] != (size, mtime)]
+        
+        def work(entry):
+            try:
+                return entry, hash_image_file(entry[0], self.method)
+            except Exception as e:
+                print(f"Error hashing {entry[0]}: {e}")
+                return entry, None
+        
+        records = []
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for (path, size, mtime), value in executor.map(work, changed):
+                if value is None:
+                    continue
+                with self.lock:
+                    self._insert(path, size, mtime, value)
+                records.append({"path": path, "size": size, "mtime": mtime, "hash": f"{value:016x}"})
+        
+        prefix = os.path.join(directory, "")
+        with self.lock:
+            removed = [path for path in self.entries if path.startswith(prefix) and path not in seen]
+            for path in removed:
+                self._remove(path)
+        records.extend({"path": path, "deleted": True} for path in removed)
+        
+        with self.lock:
+            self._append(records)
+        
+        return len(changed), len(removed)
+    
+    def remove_under(self, directory: str):
+        """ডিরেক্টরির নিচের সব এন্ট্রি বাদ দিন (যেমন ক্লিনআপে মোছা দিন) - বাদ পড়া সংখ্যা"""
+        prefix = os.path.join(os.path.normpath(directory), "")
+        with self.lock:
+            removed = [path for path in self.entries if os.path.normpath(path).startswith(prefix)]
+            for path in removed:
+                self._remove(path)
+            self._append([{"path": path, "deleted": True} for path in removed])
+        return len(removed)
+    
+    def compact(self):
+        """ইনডেক্স ফাইল নতুন করে লিখুন (শুধু লাইভ এন্ট্রি)"""
+        if not self.index_file:
+            return
+        with self.lock:
+            tmp_file = self.index_file + ".tmp"
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                for path, (size, mtime, value) in self.entries.items():
+                    record = {"path": path, "size": size, "mtime": mtime, "hash": f"{value:016x}"}
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            os.replace(tmp_file, self.index_file)
+    
+    def find_clusters(self, max_distance=3, prefix: Optional[str] = None):
+        """max_distance এর মধ্যে থাকা ইমেজগুলোর ক্লাস্টার"""
+        if max_distance > self.max_radius:
+            raise ValueError(f"max_distance must be <= {self.max_radius} for {self.blocks} blocks")
+        
+        with self.lock:
+            paths = [p for p in self.entries if prefix is None or p.startswith(prefix)]
+            hashes = np.array([self.entries[p][2] for p in paths], dtype=np.uint64)
+        
+        # হুবহু একই হ্যাশ আগে একসাথে করুন, তারপর ইউনিক হ্যাশগুলোর উপর কাজ
+        hashes, inverse = np.unique(hashes, return_inverse=True)
+        parent = list(range(len(hashes)))
+        
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+        
+        def union(a, b):
+            ra, rb = find(a), find(b)
+            if ra != rb:
+                parent[max(ra, rb)] = min(ra, rb)
+        
+        for shift, mask in self.block_layout:
+            keys = (hashes >> np.uint64(shift)) & np.uint64(mask)
+            order = np.argsort(keys, kind="stable")
+            sorted_keys = keys[order]
+            
+            starts = np.r_[0, np.flatnonzero(np.diff(sorted_keys)) + 1]
+            sizes = np.diff(np.r_[starts, len(order)])
+            in_small_group = np.repeat(sizes, sizes) <= 256
+            
+            # ছোট বাকেট - sorted অর্ডারে k দূরের জোড়াগুলো একসাথে (vectorized)
+            k = 1
+            while k < len(order):
+                same = (sorted_keys[:-k] == sorted_keys[k:]) & in_small_group[:-k]
+                if not same.any():
+                    break
+                left = order[:-k][same]
+                right = order[k:][same]
+                hits = popcount64(hashes[left] ^ hashes[right]) <= max_distance
+                for a, b in zip(left[hits], right[hits]):
+                    union(int(a), int(b))
+                k += 1
+            
+            # বড় বাকেট (অনেক একই রকম হ্যাশ) - সারি ধরে
+            for start, size in zip(starts[sizes > 256], sizes[sizes > 256]):
+                group = order[start:start + size]
+                values = hashes[group]
+                for i in range(len(group) - 1):
+                    distances = popcount64(values[i] ^ values[i + 1:])
+                    for b in group[i + 1:][distances <= max_distance]:
+                        union(int(group[i]), int(b))
+        
+        clusters = {}
+        for path, i in zip(paths, inverse.tolist()):
+            clusters.setdefault(find(i), []).append(path)
+        
+        result = [sorted(members) for members in clusters.values() if len(members) > 1]
+        result.sort(key=lambda members: (-len(members), members[0]))
+        return result
@@ -0,0 +1,212 @@
+# mass_image_generator/tracing.py
+"""
+ট্রেসিং - একটি ইমেজের জীবনচক্রের প্রতিটি ধাপের সময় (স্প্যান)
+
+generate_single_image একটি রুট ট্রেস শুরু করে (sample_rate অনুপাতে), তার
+নিচে প্রোভাইডার সিলেকশন, POST, Replicate পোলিং, ডাউনলোড, ফাইল ও মেটাডাটা
+লেখা আলাদা স্প্যান। ফলাফল Chrome trace-event ফরম্যাটে (JSON array) লেখা হয়,
+তাই ফাইলটি সরাসরি Perfetto (ui.perfetto.dev) বা chrome://tracing এ খোলা যায়।
+
+ট্রেসিং বন্ধ থাকলে বা ট্রেসটি স্যাম্পল না হলে span() একটি ContextVar পড়ে
+শেয়ার করা no-op রিটার্ন করে - আর কোনো কাজ হয় না।
+
+ব্যবহার:
+    python main.py bulk --count 500 --trace-file outputs/logs/trace.json --trace-sample 0.1
+"""
+
+import os
+import json
+import atexit
+import random
+import itertools
+import functools
+import threading
+import contextvars
+import time
+from typing import Optional
+
+# এতগুলো ইভেন্ট জমলে ফাইলে লেখা হয়
+FLUSH_EVENTS = 1000
+
+# বর্তমান স্যাম্পলড ট্রেসের id (স্যাম্পল না হলে None)
+_current = contextvars.ContextVar('trace_id', default=None)
+
+_tracer = None
+
+class _NoopSpan:
+    """ট্রেসিং বন্ধ থাকলে ব্যবহৃত স্প্যান"""
+    
+    __slots__ = ()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        return False
+    
+    def set(self, **args):
+        pass
+
+NOOP = _NoopSpan()
+
+class Span:
+    """একটি স্যাম্পলড স্প্যান - শেষ হলে একটি "X" (complete) ইভেন্ট"""
+    
+    __slots__ = ('name', 'args', 'trace_id', 'root', 'start', 'token')
+    
+    def __init__(self, name: str, trace_id: int, args: dict, root=False):
+        self.name = name
+        self.args = args
+        self.trace_id = trace_id
+        self.root = root
+        self.token = None
+    
+    def __enter__(self):
+        if self.root:
+            self.token = _current.set(self.trace_id)
+        self.start = time.perf_counter_ns()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter_ns()
+        if exc_type is not None:
+            self.args['error'] = exc_type.__name__
+        if self.token is not None:
+            _current.reset(self.token)
+        
+        tracer = _tracer
+        if tracer is not None:
+            self.args['trace'] = self.trace_id
+            tracer.record(self.name, self.start, end, self.args)
+        return False
+    
+    def set(self, **args):
+        """স্প্যানে আর্গুমেন্ট যোগ করুন (যেমন HTTP স্ট্যাটাস)"""
+        self.args.update(args)
+
+class Tracer:
+    """ইভেন্ট বাফার করে Chrome trace-event JSON array ফাইলে লেখে"""
+    
+    def __init__(self, path: str, sample_rate: float = 0.1):
+        if not 0 < sample_rate <= 1:
+            raise ValueError(f"trace sample rate must be in (0, 1], got {sample_rate}")
+        
+        self.path = path
+        self.sample_rate = sample_rate
+        self.pid = os.getpid()
+        self.trace_ids = itertools.count(1)
+        self.events = []
+        self.named_threads = set()
+        self.lock = threading.Lock()
+        
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.file = open(path, 'w', encoding='utf-8')
+        # array ফরম্যাটে শেষের ] না থাকলেও ভিউয়ার ফাইল পড়তে পারে (ক্র্যাশেও কাজে লাগে)
+        self.file.write("[\n")
+    
+    def record(self, name: str, start_ns: int, end_ns: int, args: dict):
+        """একটি complete ইভেন্ট বাফারে রাখুন"""
+        tid = threading.get_native_id()
+        event = {
+            "name": name, "ph": "X", "pid": self.pid, "tid": tid,
+            "ts": start_ns / 1000, "dur": (end_ns - start_ns) / 1000, "args": args
+        }
+        
+        with self.lock:
+            if tid not in self.named_threads:
+                self.named_threads.add(tid)
+                self.events.append({
+                    "name": "thread_name", "ph": "M", "pid": self.pid, "tid": tid,
+                    "args": {"name": threading.current_thread().name}
+                })
+            self.events.append(event)
+            full = len(self.events) >= FLUSH_EVENTS
+        
+        if full:
+            self.flush()
+    
+    def flush(self):
+        """বাফারের ইভেন্ট ফাইলে লিখুন"""
+        with self.lock:
+            events, self.events = self.events, []
+            if self.file.closed:
+                return
+            self.file.write("".join(json.dumps(event, default=str) + ",\n" for event in events))
+            self.file.flush()
+    
+    def close(self):
+        """বাকি ইভেন্ট লিখে array বন্ধ করুন"""
+        self.flush()
+        with self.lock:
+            if self.file.closed:
+                return
+            process = {"name": "process_name", "ph": "M", "pid": self.pid,
+                       "args": {"name": "mass_image_generator"}}
+            self.file.write(json.dumps(process) + "\n]\n")
+            self.file.close()
+
+def configure(path: Optional[str], sample_rate: float = 0.1):
+    """ট্রেসিং চালু করুন (path None হলে বন্ধ)"""
+    global _tracer
+    close()
+    if path:
+        _tracer = Tracer(path, sample_rate)
+        atexit.register(close)
+        print(f"Tracing {sample_rate:.0%} of images to {path}")
+    return _tracer
+
+def close():
+    """ট্রেসিং বন্ধ করে ফাইল শেষ করুন"""
+    global _tracer
+    tracer, _tracer = _tracer, None
+    if tracer is not None:
+        tracer.close()
+
+def trace(name: str, **args):
+    """রুট স্প্যান - sample_rate অনুপাতে স্যাম্পল হয়, বাকিগুলো no-op"""
+    tracer = _tracer
+    if tracer is None or random.random() >= tracer.sample_rate:
+        return NOOP
+    return Span(name, next(tracer.trace_ids), args, root=True)
+
+def span(name: str, **args):
+    """বর্তমান ট্রেসের চাইল্ড স্প্যান (ট্রেস না থাকলে no-op)"""
+    trace_id = _current.get()
+    if trace_id is None:
+        return NOOP
+    return Span(name, trace_id, args)
+
+def traced(name: str):
+    """পুরো ফাংশনকে একটি স্প্যানে মোড়ানোর ডেকোরেটর"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _current.get() is None:
+                return func(*args, **kwargs)
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def bind(func):
+    """অন্য থ্রেডে চালানোর জন্য বর্তমান ট্রেস সহ ফাংশন (ট্রেস না থাকলে একই ফাংশন)"""
+    if _current.get() is None:
+        return func
+    return functools.partial(contextvars.copy_context().run, func)
+
+def add_tracing_arguments(parser):
+    """--trace-file/--trace-sample CLI অপশন যোগ করুন"""
+    parser.add_argument("--trace-file", default=None,
+                        help="স্প্যানগুলো এই ফাইলে Chrome trace-event ফরম্যাটে লিখুন (Perfetto এ খোলা যায়)")
+    parser.add_argument("--trace-sample", type=float, default=0.1,
+                        help="কত ভাগ ইমেজ ট্রেস হবে (0-1, ডিফল্ট 0.1)")
+    return parser
+
+def configure_from_args(args):
+    """--trace-file দেওয়া থাকলে ট্রেসিং চালু করুন"""
+    path = getattr(args, "trace_file", None)
+    if path:
+        return configure(path, getattr(args, "trace_sample", 0.1))
+    return None
@@ -4,11 +4,160 @@
 """
 
 import os
+import time
 import shutil
 import json
 import csv
+import hashlib
+import itertools
+import concurrent.futures
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Optional
+
+from metrics import CACHE_REQUESTS
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+
+# ক্যাশ ফাইল আউটপুট ট্রির বাইরে রাখা হয়
+CACHE_DIR = ".cache"
+
+HASH_CHUNK_SIZE = 1024 * 1024
+PREFIX_HASH_SIZE = 64 * 1024
+
+# এক্সপোর্ট - প্রতি রাইটে এত রো, বড় বাফার
+EXPORT_CHUNK_ROWS = 10000
+EXPORT_BUFFER_SIZE = 1024 * 1024
+
+class HashCache:
+    """(path, size, mtime) অনুযায়ী ফাইল হ্যাশ ক্যাশ"""
+    
+    def __init__(self, path: Optional[str] = os.path.join(CACHE_DIR, "file_hashes.json")):
+        self.path = path
+        self.entries = {}
+        self.dirty = False
+        
+        if path and os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f)
+            except (ValueError, OSError):
+                self.entries = {}
+    
+    def get(self, kind: str, filepath: str, size: int, mtime: int):
+        """ক্যাশড হ্যাশ পান, ফাইল বদলে গেলে None"""
+        entry = self.entries.get(f"{kind}:{filepath}")
+        if entry and entry[0] == size and entry[1] == mtime:
+            CACHE_REQUESTS.inc(cache="file_hash", result="hit")
+            return entry[2]
+        CACHE_REQUESTS.inc(cache="file_hash", result="miss")
+        return None
+    
+    def put(self, kind: str, filepath: str, size: int, mtime: int, file_hash: str):
+        """হ্যাশ ক্যাশে রাখুন"""
+        self.entries[f"{kind}:{filepath}"] = [size, mtime, file_hash]
+        self.dirty = True
+    
+    def prune(self, directory: str, existing):
+        """ডিরেক্টরির মুছে যাওয়া ফাইলের এন্ট্রি বাদ দিন"""
+        prefix = os.path.join(directory, "")
+        for key in list(self.entries):
+            filepath = key.split(":", 1)[1]
+            if filepath.startswith(prefix) and filepath not in existing:
+                del self.entries[key]
+                self.dirty = True
+    
+    def save(self):
+        """ক্যাশ ডিস্কে সেভ করুন"""
+        if not self.path or not self.dirty:
+            return
+        
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f)
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+class DirStatsCache:
+    """ডিরেক্টরি mtime অনুযায়ী প্রতি-ডিরেক্টরি সামারি ক্যাশ
+    
+    ফাইল যোগ/মুছলে বা রিনেম করলে ডিরেক্টরির mtime বদলায়, তাই শুধু সেই
+    ডিরেক্টরি আবার স্ক্যান হয়। কোনো ফাইলের কনটেন্ট জায়গায় বদলালে
+    mtime বদলায় না - জেনারেটেড ইমেজ একবারই লেখা হয় বলে এটা ঠিক আছে।
+    """
+    
+    def __init__(self, path: Optional[str] = os.path.join(CACHE_DIR, "dir_stats.json")):
+        self.path = path
+        self.entries = {}
+        self.dirty = False
+        
+        if path and os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f)
+            except (ValueError, OSError):
+                self.entries = {}
+    
+    def own_summary(self, directory: str):
+        """শুধু এই ডিরেক্টরির ফাইলগুলোর সামারি এবং সাব-ডিরেক্টরির নাম"""
+        try:
+            mtime = os.stat(directory).st_mtime_ns
+        except OSError:
+            # ডিরেক্টরি মুছে গেছে - পুরনো সামারি রাখবেন না
+            if self.entries.pop(directory, None) is not None:
+                self.dirty = True
+            return {'size': 0, 'files': 0, 'ext': {}}, []
+        
+        entry = self.entries.get(directory)
+        if entry and entry['mtime'] == mtime:
+            CACHE_REQUESTS.inc(cache="dir_stats", result="hit")
+            return entry['summary'], entry['subdirs']
+        CACHE_REQUESTS.inc(cache="dir_stats", result="miss")
+        
+        summary = {'size': 0, 'files': 0, 'ext': {}}
+        subdirs = []
+        try:
+            with os.scandir(directory) as entries:
+                for item in entries:
+                    if item.is_dir(follow_symlinks=False):
+                        subdirs.append(item.name)
+                    elif item.is_file():
+                        # DirEntry এর stat ক্যাশ হয়, আলাদা getsize লাগে না
+                        summary['size'] += item.stat().st_size
+                        summary['files'] += 1
+                        ext = os.path.splitext(item.name)[1].lower()
+                        summary['ext'][ext] = summary['ext'].get(ext, 0) + 1
+        except OSError as e:
+            print(f"Error scanning {directory}: {e}")
+            return summary, subdirs
+        
+        # থ্রেড থেকে dict assignment GIL এর অধীনে নিরাপদ
+        self.entries[directory] = {'mtime': mtime, 'summary': summary, 'subdirs': subdirs}
+        self.dirty = True
+        return summary, subdirs
+    
+    def prune(self):
+        """আর নেই এমন ডিরেক্টরির এন্ট্রি বাদ দিন (ক্লিনআপ/reshard এ মোছা দিন ও শার্ড)"""
+        missing = [directory for directory in list(self.entries) if not os.path.isdir(directory)]
+        for directory in missing:
+            self.entries.pop(directory, None)
+        if missing:
+            self.dirty = True
+        return len(missing)
+    
+    def save(self):
+        """ক্যাশ ডিস্কে সেভ করুন - মুছে যাওয়া ডিরেক্টরির এন্ট্রি বাদ দিয়ে"""
+        if not self.path or not self.dirty:
+            return
+        
+        # কোনো ডিরেক্টরি মুছলে তার প্যারেন্টের mtime বদলায়, তাই তখন dirty থাকে
+        self.prune()
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f)
+        os.replace(tmp_path, self.path)
+        self.dirty = False
 
 class FileManager:
     """ফাইল ম্যানেজার ক্লাস"""
@@ -27,55 +176,188 @@ class FileManager:
         return 0
     
     @staticmethod
-    def get_directory_size(directory: str):
+    def directory_summary(directory: str, max_workers=None, use_cache=True):
+        """রিকার্সিভ ডিরেক্টরি সামারি - মোট সাইজ, ফাইল সংখ্যা, এক্সটেনশন অনুযায়ী গণনা"""
+        cache = DirStatsCache() if use_cache else DirStatsCache(path=None)
+        
+        def summarize(path):
+            """একটি ডিরেক্টরি ও তার সাব-ডিরেক্টরির সামারি (সিরিয়াল)"""
+            own, subdirs = cache.own_summary(path)
+            total = {'size': own['size'], 'files': own['files'], 'ext': dict(own['ext'])}
+            for name in subdirs:
+                FileManager._merge_summary(total, summarize(os.path.join(path, name)))
+            return total
+        
+        own, subdirs = cache.own_summary(directory)
+        total = {'size': own['size'], 'files': own['files'], 'ext': dict(own['ext'])}
+        
+        # টপ-লেভেল সাব-ডিরেক্টরি (যেমন তারিখের ফোল্ডার) প্যারালালে
+        if subdirs:
+            paths = [os.path.join(directory, name) for name in subdirs]
+            with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+                for summary in executor.map(summarize, paths):
+                    FileManager._merge_summary(total, summary)
+        
+        cache.save()
+        return total
+    
+    @staticmethod
+    def _merge_summary(total: Dict, summary: Dict):
+        total['size'] += summary['size']
+        total['files'] += summary['files']
+        for ext, count in summary['ext'].items():
+            total['ext'][ext] = total['ext'].get(ext, 0) + count
+    
+    @staticmethod
+    def get_directory_size(directory: str, catalogue=None):
         """ডিরেক্টরি সাইজ পান"""
-        total_size = 0
-        for dirpath, dirnames, filenames in os.walk(directory):
-            for filename in filenames:
-                filepath = os.path.join(dirpath, filename)
-                total_size += os.path.getsize(filepath)
-        return total_size
+        if catalogue is not None and catalogue.covers(directory):
+            return catalogue.summary(directory=directory)['size']
+        if not os.path.isdir(directory):
+            return 0
+        return FileManager.directory_summary(directory)['size']
     
     @staticmethod
-    def count_files(directory: str, extensions=None):
+    def count_files(directory: str, extensions=None, catalogue=None):
         """ফাইল কাউন্ট করুন"""
         if extensions is None:
             extensions = ['.png', '.jpg', '.jpeg']
         
-        count = 0
-        for root, dirs, files in os.walk(directory):
-            for file in files:
-                if any(file.lower().endswith(ext) for ext in extensions):
-                    count += 1
-        return count
+        wanted = {(ext if ext.startswith('.') else '.' + ext).lower() for ext in extensions}
+        
+        if catalogue is not None and catalogue.covers(directory):
+            # ক্যাটালগে ফরম্যাট থাকে, এক্সটেনশন নয় (jpg/jpeg দুটোই jpeg)
+            formats = catalogue.summary(directory=directory)['formats']
+            wanted_formats = {'jpeg' if ext in ('.jpg', '.jpeg') else ext[1:] for ext in wanted}
+            return sum(formats.get(fmt, 0) for fmt in wanted_formats)
+        
+        if not os.path.isdir(directory):
+            return 0
+        
+        ext_counts = FileManager.directory_summary(directory)['ext']
+        return sum(ext_counts.get(ext, 0) for ext in wanted)
     
     @staticmethod
-    def organize_images_by_date(source_dir: str, target_dir: str = None):
-        """ইমেজ তারিখ অনুযায়ী অর্গানাইজ করুন"""
+    def plan_organize(source_dir: str, target_dir: str = None, layout=None):
+        """অর্গানাইজ প্ল্যান - টার্গেট ডিরেক্টরি অনুযায়ী (source, target, size) গ্রুপ"""
         if target_dir is None:
             target_dir = source_dir
         
-        for filename in os.listdir(source_dir):
-            if filename.lower().endswith(('.png', '.jpg', '.jpeg')):
-                filepath = os.path.join(source_dir, filename)
+        plan: Dict[str, List] = {}
+        with os.scandir(source_dir) as entries:
+            for entry in entries:
+                if not entry.is_file() or not entry.name.lower().endswith(IMAGE_EXTENSIONS):
+                    continue
                 
                 try:
-                    # Get creation date
-                    stat = os.stat(filepath)
-                    create_date = datetime.fromtimestamp(stat.st_ctime)
-                    date_str = create_date.strftime("%Y%m%d")
-                    
-                    # Create date directory
-                    date_dir = os.path.join(target_dir, date_str)
-                    os.makedirs(date_dir, exist_ok=True)
-                    
-                    # Move file
-                    shutil.move(filepath, os.path.join(date_dir, filename))
+                    # DirEntry এর stat ক্যাশ হয়
+                    stat = entry.stat()
+                except OSError as e:
+                    print(f"Error organizing {entry.name}: {e}")
+                    continue
+                
+                date_dir = os.path.join(target_dir, datetime.fromtimestamp(stat.st_ctime).strftime("%Y%m%d"))
+                if layout is not None:
+                    target_path = layout.shard_path(date_dir, entry.name,
+                                                    index=layout.index_from_name(entry.name))
+                else:
+                    target_path = os.path.join(date_dir, entry.name)
+                
+                plan.setdefault(os.path.dirname(target_path), []).append(
+                    (entry.path, target_path, stat.st_size)
+                )
+        
+        return plan
+    
+    @staticmethod
+    def organize_images_by_date(source_dir: str, target_dir: str = None, layout=None,
+                                dry_run=False, max_workers=4):
+        """ইমেজ তারিখ অনুযায়ী অর্গানাইজ করুন (layout দিলে শার্ড ফোল্ডারে)
+        
+        একই ডিভাইসে os.rename, অন্য ডিভাইসে কপি সীমিত থ্রেড পুলে হয়।
+        """
+        start = time.perf_counter()
+        plan = FileManager.plan_organize(source_dir, target_dir, layout)
+        total = sum(len(moves) for moves in plan.values())
+        
+        summary = {'planned': total, 'renamed': 0, 'copied': 0, 'failed': 0, 'bytes': 0,
+                   'directories': len(plan)}
+        
+        if dry_run:
+            for directory, moves in sorted(plan.items()):
+                for source, target, _ in moves:
+                    print(f"  {source} -> {target}")
+            print(f"Would move {total} files into {len(plan)} directories")
+            return summary
+        
+        def copy_move(move):
+            source, target, size = move
+            try:
+                shutil.move(source, target)
+                return size, None
+            except Exception as e:
+                return size, e
+        
+        done = 0
+        copies = []
+        for directory, moves in plan.items():
+            # প্রতিটি টার্গেট ডিরেক্টরি একবারই তৈরি ও stat হয়
+            try:
+                os.makedirs(directory, exist_ok=True)
+                target_device = os.stat(directory).st_dev
+            except OSError as e:
+                print(f"Error creating {directory}: {e}")
+                summary['failed'] += len(moves)
+                continue
+            
+            source_device = None
+            for move in moves:
+                source, target, size = move
+                if source_device is None:
+                    source_device = os.stat(os.path.dirname(source)).st_dev
+                
+                if source_device != target_device:
+                    copies.append(move)
+                    continue
+                
+                try:
+                    os.rename(source, target)
+                    summary['renamed'] += 1
+                    summary['bytes'] += size
+                except OSError as e:
+                    print(f"Error organizing {os.path.basename(source)}: {e}")
+                    summary['failed'] += 1
+                
+                done += 1
+                if done % 1000 == 0:
+                    print(f"  Organized {done}/{total} files")
+        
+        # ক্রস-ডিভাইস কপি - ডিস্ক ব্যান্ডউইথ ভাগ হয় বলে পুল ছোট রাখা হয়
+        if copies:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+                for (source, _, _), (size, error) in zip(copies, executor.map(copy_move, copies)):
+                    if error is None:
+                        summary['copied'] += 1
+                        summary['bytes'] += size
+                    else:
+                        print(f"Error organizing {os.path.basename(source)}: {error}")
+                        summary['failed'] += 1
                     
-                except Exception as e:
-                    print(f"Error organizing {filename}: {e}")
+                    done += 1
+                    if done % 1000 == 0:
+                        print(f"  Organized {done}/{total} files")
         
-        return True
+        elapsed = time.perf_counter() - start
+        summary['seconds'] = elapsed
+        
+        moved = summary['renamed'] + summary['copied']
+        rate = moved / elapsed if elapsed > 0 else 0
+        mb_rate = summary['bytes'] / (1024 * 1024) / elapsed if elapsed > 0 else 0
+        print(f"Organized {moved}/{total} files ({summary['renamed']} renamed, "
+              f"{summary['copied']} copied, {summary['failed']} failed) in {elapsed:.1f}s "
+              f"- {rate:.0f} files/s, {mb_rate:.1f} MB/s")
+        
+        return summary
     
     @staticmethod
     def save_json(data: Any, filepath: str, indent=2):
@@ -96,62 +378,319 @@ class FileManager:
         return {}
     
     @staticmethod
-    def save_csv(data: List[Dict], filepath: str):
-        """CSV সেভ করুন"""
-        if not data:
-            return
+    def save_csv(data: Iterable[Dict], filepath: str, fieldnames: Optional[List[str]] = None):
+        """CSV সেভ করুন - লিস্ট বা ইটারেটর, সব রো এর কলাম নেওয়া হয়"""
+        if FileManager.export_records(data, filepath, format='csv', fieldnames=fieldnames) == 0:
+            return None
+        return filepath
+    
+    @staticmethod
+    def union_fieldnames(records: Iterable[Dict]):
+        """সব রো এর কলাম, প্রথম দেখার ক্রমে"""
+        fieldnames = {}
+        for record in records:
+            for key in record:
+                if key not in fieldnames:
+                    fieldnames[key] = None
+        return list(fieldnames)
+    
+    @staticmethod
+    def export_records(records, filepath: str, format: Optional[str] = None,
+                       fieldnames: Optional[List[str]] = None, chunk_rows=EXPORT_CHUNK_ROWS):
+        """রেকর্ড স্ট্রিম করে CSV/JSONL/Parquet এ লিখুন - লেখা রো সংখ্যা রিটার্ন করে
         
-        FileManager.ensure_directory(os.path.dirname(filepath))
+        records লিস্ট, ইটারেটর বা নতুন ইটারেটর দেয় এমন ফাংশন হতে পারে। CSV ও
+        Parquet এ কলাম লাগে: fieldnames না দিলে লিস্ট/ফাংশন থেকে আগে একবার
+        শুধু কী পড়া হয়, আর এক-বারের ইটারেটর হলে রো গুলো পাশে একটি টেম্প
+        JSONL ফাইলে রেখে কলাম বের করা হয়।
+        """
+        if format is None:
+            format = os.path.splitext(filepath)[1].lower().lstrip('.')
+        if format not in ('csv', 'jsonl', 'parquet'):
+            raise ValueError(f"Unsupported export format: {format}")
         
-        # Get fieldnames from first item
-        fieldnames = list(data[0].keys())
+        FileManager.ensure_directory(os.path.dirname(filepath) or '.')
         
-        with open(filepath, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(data)
+        if format == 'jsonl':
+            rows = records() if callable(records) else records
+            return FileManager._write_jsonl(rows, filepath, chunk_rows)
         
-        return filepath
+        spool_path = None
+        try:
+            if fieldnames is not None:
+                rows = records() if callable(records) else records
+            elif callable(records):
+                fieldnames = FileManager.union_fieldnames(records())
+                rows = records()
+            elif isinstance(records, (list, tuple)):
+                fieldnames = FileManager.union_fieldnames(records)
+                rows = records
+            else:
+                spool_path = filepath + ".spool.jsonl"
+                fieldnames = FileManager.union_fieldnames(
+                    FileManager._spool(records, spool_path, chunk_rows)
+                )
+                rows = FileManager.iter_jsonl(spool_path)
+            
+            if format == 'csv':
+                return FileManager._write_csv(rows, filepath, fieldnames, chunk_rows)
+            return FileManager._write_parquet(rows, filepath, fieldnames, chunk_rows)
+        finally:
+            if spool_path and os.path.exists(spool_path):
+                os.remove(spool_path)
     
     @staticmethod
-    def find_duplicate_images(directory: str, method='hash'):
-        """ডুপ্লিকেট ইমেজ খুঁজুন"""
-        import hashlib
+    def iter_jsonl(filepath: str):
+        """JSONL ফাইল লাইন ধরে পড়ুন"""
+        with open(filepath, 'r', encoding='utf-8', buffering=EXPORT_BUFFER_SIZE) as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    
+    @staticmethod
+    def _chunks(rows, chunk_rows):
+        """রো গুলো chunk_rows আকারের লিস্টে"""
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= chunk_rows:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+    
+    @staticmethod
+    def _spool(records, spool_path, chunk_rows):
+        """এক-বারের ইটারেটর টেম্প JSONL এ লিখুন, লেখার সাথে সাথে রো গুলো ফেরত দিন (শুধু কী পড়ার জন্য)"""
+        with open(spool_path, 'w', encoding='utf-8', buffering=EXPORT_BUFFER_SIZE) as f:
+            for chunk in FileManager._chunks(records, chunk_rows):
+                f.write(''.join(json.dumps(row, ensure_ascii=False, default=str) + '\n' for row in chunk))
+                yield from chunk
+    
+    @staticmethod
+    def _write_jsonl(rows, filepath, chunk_rows):
+        count = 0
+        with open(filepath, 'w', encoding='utf-8', buffering=EXPORT_BUFFER_SIZE) as f:
+            for chunk in FileManager._chunks(rows, chunk_rows):
+                f.write(''.join(json.dumps(row, ensure_ascii=False, default=str) + '\n' for row in chunk))
+                count += len(chunk)
+        return count
+    
+    @staticmethod
+    def _csv_value(value):
+        # নেস্টেড ভ্যালু Python repr না হয়ে JSON হিসেবে যায়
+        if isinstance(value, (dict, list)):
+            return json.dumps(value, ensure_ascii=False)
+        return value
+    
+    @staticmethod
+    def _write_csv(rows, filepath, fieldnames, chunk_rows):
+        count = 0
+        chunks = FileManager._chunks(rows, chunk_rows)
+        first = next(chunks, None)
+        if first is None and not fieldnames:
+            return 0
+        
+        with open(filepath, 'w', newline='', encoding='utf-8', buffering=EXPORT_BUFFER_SIZE) as f:
+            writer = csv.writer(f)
+            writer.writerow(fieldnames)
+            for chunk in itertools.chain([first] if first else [], chunks):
+                writer.writerows(
+                    [FileManager._csv_value(row.get(name, '')) for name in fieldnames] for row in chunk
+                )
+                count += len(chunk)
+        return count
+    
+    @staticmethod
+    def _write_parquet(rows, filepath, fieldnames, chunk_rows):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ValueError("Parquet export needs pyarrow (pip install pyarrow)")
+        
+        count = 0
+        schema = None
+        writer = None
+        try:
+            for chunk in FileManager._chunks(rows, chunk_rows):
+                columns = {name: [row.get(name) for row in chunk] for name in fieldnames}
+                if schema is None:
+                    # প্রথম চাঙ্ক থেকে টাইপ, শুধু null কলাম string ধরা হয়
+                    inferred = pa.Table.from_pydict(columns).schema
+                    schema = pa.schema([
+                        pa.field(field.name, pa.string() if pa.types.is_null(field.type) else field.type)
+                        for field in inferred
+                    ])
+                    writer = pq.ParquetWriter(filepath, schema)
+                writer.write_table(pa.Table.from_pydict(columns, schema=schema))
+                count += len(chunk)
+        finally:
+            if writer is not None:
+                writer.close()
+        return count
+    
+    @staticmethod
+    def scan_files(directory: str, extensions=None):
+        """os.scandir দিয়ে ফাইল খুঁজুন - (path, size, mtime_ns) রিটার্ন করে"""
+        if extensions is None:
+            extensions = IMAGE_EXTENSIONS
+        extensions = tuple(ext.lower() for ext in extensions)
+        
+        results = []
+        stack = [directory]
+        while stack:
+            current = stack.pop()
+            try:
+                with os.scandir(current) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.is_file() and entry.name.lower().endswith(extensions):
+                            stat = entry.stat()
+                            results.append((entry.path, stat.st_size, stat.st_mtime_ns))
+            except OSError as e:
+                print(f"Error scanning {current}: {e}")
+        
+        return results
+    
+    @staticmethod
+    def hash_file(filepath: str, limit: Optional[int] = None):
+        """BLAKE2 হ্যাশ - limit দিলে শুধু প্রথম limit বাইট"""
+        hash_func = hashlib.blake2b(digest_size=20)
+        remaining = limit
+        
+        with open(filepath, 'rb') as f:
+            while remaining is None or remaining > 0:
+                size = HASH_CHUNK_SIZE if remaining is None else min(HASH_CHUNK_SIZE, remaining)
+                chunk = f.read(size)
+                if not chunk:
+                    break
+                hash_func.update(chunk)
+                if remaining is not None:
+                    remaining -= len(chunk)
+        
+        return hash_func.hexdigest()
+    
+    @staticmethod
+    def hash_pixels(filepath: str):
+        """ডিকোড করা পিক্সেলের হ্যাশ"""
         from PIL import Image
         
-        hashes = {}
-        duplicates = []
+        with Image.open(filepath) as img:
+            return hashlib.blake2b(img.tobytes(), digest_size=20).hexdigest()
+    
+    @staticmethod
+    def find_duplicate_images(directory: str, method='hash', max_workers=None, use_cache=True,
+                              catalogue=None):
+        """ডুপ্লিকেট ইমেজ খুঁজুন"""
+        if method == 'hash' and catalogue is not None and catalogue.covers(directory):
+            # জেনারেটর লেখার সময়ই পুরো ফাইলের হ্যাশ রেখেছে
+            return FileManager._duplicates_from_groups(catalogue.duplicate_groups(directory))
         
-        for root, dirs, files in os.walk(directory):
-            for filename in files:
-                if filename.lower().endswith(('.png', '.jpg', '.jpeg')):
-                    filepath = os.path.join(root, filename)
-                    
-                    try:
-                        if method == 'hash':
-                            # Calculate file hash
-                            with open(filepath, 'rb') as f:
-                                file_hash = hashlib.md5(f.read()).hexdigest()
-                        else:
-                            # Calculate image hash
-                            img = Image.open(filepath)
-                            img_hash = hashlib.md5(img.tobytes()).hexdigest()
-                            file_hash = img_hash
-                        
-                        if file_hash in hashes:
-                            duplicates.append({
-                                'original': hashes[file_hash],
-                                'duplicate': filepath,
-                                'hash': file_hash
-                            })
-                        else:
-                            hashes[file_hash] = filepath
-                    
-                    except Exception as e:
-                        print(f"Error processing {filename}: {e}")
+        files = FileManager.scan_files(directory)
+        cache = HashCache() if use_cache else HashCache(path=None)
+        
+        def hash_all(kind, entries, func):
+            """ক্যাশ মিস হওয়া ফাইলগুলো থ্রেড পুলে হ্যাশ করুন"""
+            hashes = {}
+            missing = []
+            for path, size, mtime in entries:
+                cached = cache.get(kind, path, size, mtime)
+                if cached is None:
+                    missing.append((path, size, mtime))
+                else:
+                    hashes[path] = cached
+            
+            def work(entry):
+                try:
+                    return entry, func(entry[0])
+                except Exception as e:
+                    print(f"Error processing {os.path.basename(entry[0])}: {e}")
+                    return entry, None
+            
+            with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+                for (path, size, mtime), file_hash in executor.map(work, missing):
+                    if file_hash is not None:
+                        hashes[path] = file_hash
+                        cache.put(kind, path, size, mtime, file_hash)
+            
+            return hashes
+        
+        if method == 'hash':
+            # ধাপ ১: একই সাইজের ফাইলগুলোই শুধু ডুপ্লিকেট হতে পারে
+            by_size = {}
+            for entry in files:
+                by_size.setdefault(entry[1], []).append(entry)
+            candidates = [e for group in by_size.values() if len(group) > 1 for e in group]
+            
+            # ধাপ ২: প্রথম 64 KB এর হ্যাশ
+            prefix_hashes = hash_all(
+                'prefix', candidates,
+                lambda path: FileManager.hash_file(path, limit=PREFIX_HASH_SIZE)
+            )
+            by_prefix = {}
+            for entry in candidates:
+                if entry[0] in prefix_hashes:
+                    by_prefix.setdefault((entry[1], prefix_hashes[entry[0]]), []).append(entry)
+            
+            # ধাপ ৩: যারা এখনও মিলে যায় তাদের সম্পূর্ণ হ্যাশ
+            groups = {}
+            full_candidates = []
+            for (size, prefix), group in by_prefix.items():
+                if len(group) < 2:
+                    continue
+                if size <= PREFIX_HASH_SIZE:
+                    # পুরো ফাইলই হ্যাশ হয়ে গেছে
+                    groups[prefix] = [entry[0] for entry in group]
+                else:
+                    full_candidates.extend(group)
+            
+            full_hashes = hash_all('full', full_candidates, FileManager.hash_file)
+            for path, file_hash in full_hashes.items():
+                groups.setdefault(file_hash, []).append(path)
+        else:
+            # Calculate image hash
+            pixel_hashes = hash_all('pixels', files, FileManager.hash_pixels)
+            groups = {}
+            for path, file_hash in pixel_hashes.items():
+                groups.setdefault(file_hash, []).append(path)
+        
+        cache.prune(directory, {entry[0] for entry in files})
+        cache.save()
+        
+        return FileManager._duplicates_from_groups(groups)
+    
+    @staticmethod
+    def _duplicates_from_groups(groups: Dict[str, List[str]]):
+        """{hash: [paths]} থেকে original/duplicate জোড়া"""
+        duplicates = []
+        for file_hash, paths in groups.items():
+            if len(paths) < 2:
+                continue
+            paths.sort()
+            for path in paths[1:]:
+                duplicates.append({
+                    'original': paths[0],
+                    'duplicate': path,
+                    'hash': file_hash
+                })
         
         return duplicates
     
+    @staticmethod
+    def find_similar(directory: str, max_distance=3, method='dhash', index_file=None, max_workers=None):
+        """প্রায়-একই ইমেজের ক্লাস্টার খুঁজুন (পারসেপচুয়াল হ্যাশ)"""
+        from similarity_index import SimilarityIndex
+        
+        if index_file is None:
+            index_file = os.path.join(CACHE_DIR, f"similarity_{method}.jsonl")
+        
+        index = SimilarityIndex(index_file, method=method)
+        index.update_directory(directory, max_workers=max_workers)
+        
+        return index.find_clusters(max_distance, prefix=os.path.join(directory, ""))
+    
     @staticmethod
     def create_readme(directory: str, content: Dict):
         """README ফাইল তৈরি করুন"""
@@ -0,0 +1,202 @@
+# mass_image_generator/vocabulary_store.py
+"""
+ভোকাবুলারি স্টোর - বড় এক্সটার্নাল ওয়ার্ড লিস্ট memory-mapped ইনডেক্স দিয়ে লোড করে
+
+ডিরেক্টরি লেআউট:
+    vocab/styles.txt            (সব ভাষার জন্য কমন)
+    vocab/en/subjects.txt       (ভাষা অনুযায়ী)
+    vocab/bn/adjectives.txt
+
+প্রতিটি .txt ফাইলের পাশে একটি .idx ফাইল থাকে যেখানে প্রতিটি টার্মের
+(start, end) বাইট অফসেট রাখা আছে। ফলে ১ কোটি টার্মের ফাইল খুলতেও প্রায়
+কোনো খরচ নেই এবং র‍্যান্ডম অ্যাক্সেস O(1)।
+"""
+
+import os
+import sys
+import mmap
+import struct
+from array import array
+from typing import Optional
+
+INDEX_MAGIC = b"MWLIDX01"
+INDEX_HEADER = struct.Struct("<8sQQ")  # magic, source size, term count
+INDEX_ENTRY = struct.Struct("<QQ")     # start, end
+
+def index_path_for(path: str):
+    """টেক্সট ফাইলের ইনডেক্স পাথ"""
+    return path + ".idx"
+
+def build_index(path: str):
+    """ওয়ার্ড লিস্টের অফসেট ইনডেক্স তৈরি করুন"""
+    size = os.path.getsize(path)
+    offsets = array('Q')
+    
+    if size > 0:
+        with open(path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                start = 0
+                while start < size:
+                    end = data.find(b"\n", start)
+                    if end == -1:
+                        end = size
+                    
+                    # ট্রেইলিং \r এবং ফাঁকা লাইন বাদ দিন
+                    term_end = end
+                    if term_end > start and data[term_end - 1:term_end] == b"\r":
+                        term_end -= 1
+                    if data[start:term_end].strip():
+                        offsets.append(start)
+                        offsets.append(term_end)
+                    
+                    start = end + 1
+    
+    if sys.byteorder != "little":
+        offsets.byteswap()
+    
+    index_file = index_path_for(path)
+    tmp_file = index_file + ".tmp"
+    with open(tmp_file, 'wb') as f:
+        f.write(INDEX_HEADER.pack(INDEX_MAGIC, size, len(offsets) // 2))
+        offsets.tofile(f)
+    os.replace(tmp_file, index_file)
+    
+    return len(offsets) // 2
+
+def index_is_fresh(path: str):
+    """ইনডেক্স আপ-টু-ডেট কি না চেক করুন"""
+    index_file = index_path_for(path)
+    if not os.path.exists(index_file):
+        return False
+    
+    if os.path.getmtime(index_file) < os.path.getmtime(path):
+        return False
+    
+    with open(index_file, 'rb') as f:
+        header = f.read(INDEX_HEADER.size)
+    if len(header) < INDEX_HEADER.size:
+        return False
+    
+    magic, source_size, _ = INDEX_HEADER.unpack(header)
+    return magic == INDEX_MAGIC and source_size == os.path.getsize(path)
+
+class MappedWordList:
+    """memory-mapped ওয়ার্ড লিস্ট - list এর মতো len() ও [i] সাপোর্ট করে"""
+    
+    def __init__(self, path: str, auto_index=True):
+        self.path = path
+        
+        if not index_is_fresh(path):
+            if not auto_index:
+                raise ValueError(f"Missing or stale index for {path}, run build-index")
+            build_index(path)
+        
+        self._text_file = open(path, 'rb')
+        self._index_file = open(index_path_for(path), 'rb')
+        
+        # খালি ফাইল mmap করা যায় না
+        text_size = os.fstat(self._text_file.fileno()).st_size
+        self._text = (mmap.mmap(self._text_file.fileno(), 0, access=mmap.ACCESS_READ)
+                      if text_size else b"")
+        self._index = mmap.mmap(self._index_file.fileno(), 0, access=mmap.ACCESS_READ)
+        
+        _, _, self._count = INDEX_HEADER.unpack_from(self._index, 0)
+    
+    def __len__(self):
+        return self._count
+    
+    def __getitem__(self, i):
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError("word list index out of range")
+        
+        start, end = INDEX_ENTRY.unpack_from(self._index, INDEX_HEADER.size + i * INDEX_ENTRY.size)
+        return self._text[start:end].decode('utf-8').strip()
+    
+    def __iter__(self):
+        for i in range(self._count):
+            yield self[i]
+    
+    def close(self):
+        """ফাইল বন্ধ করুন"""
+        if isinstance(self._text, mmap.mmap):
+            self._text.close()
+        self._index.close()
+        self._text_file.close()
+        self._index_file.close()
+
+class VocabularyStore:
+    """ভাষা ও ক্যাটাগরি অনুযায়ী এক্সটার্নাল ভোকাবুলারি"""
+    
+    def __init__(self, root_dir: str, auto_index=True):
+        self.root_dir = root_dir
+        self.auto_index = auto_index
+        self.lists = {}
+    
+    def file_for(self, vocabulary: str):
+        """ভোকাবুলারি নাম থেকে ফাইল পাথ বের করুন (যেমন subjects_bn -> bn/subjects.txt)"""
+        category, _, language = vocabulary.rpartition("_")
+        if category and len(language) == 2:
+            return os.path.join(self.root_dir, language, category + ".txt")
+        return os.path.join(self.root_dir, vocabulary + ".txt")
+    
+    def lookup(self, vocabulary: str) -> Optional[MappedWordList]:
+        """ভোকাবুলারি খুঁজুন, না থাকলে None"""
+        if vocabulary in self.lists:
+            return self.lists[vocabulary]
+        
+        path = self.file_for(vocabulary)
+        word_list = None
+        if os.path.exists(path):
+            word_list = MappedWordList(path, auto_index=self.auto_index)
+            if len(word_list) == 0:
+                word_list.close()
+                word_list = None
+        
+        self.lists[vocabulary] = word_list
+        return word_list
+    
+    def close(self):
+        """সব ফাইল বন্ধ করুন"""
+        for word_list in self.lists.values():
+            if word_list is not None:
+                word_list.close()
+        self.lists = {}
+
+def build_all_indexes(root_dir: str, force=False):
+    """ডিরেক্টরির সব ওয়ার্ড লিস্টের ইনডেক্স তৈরি করুন"""
+    built = 0
+    for dirpath, dirnames, filenames in os.walk(root_dir):
+        for filename in sorted(filenames):
+            if not filename.endswith(".txt"):
+                continue
+            
+            path = os.path.join(dirpath, filename)
+            if not force and index_is_fresh(path):
+                continue
+            
+            count = build_index(path)
+            built += 1
+            print(f"Indexed {count} terms: {path}")
+    
+    return built
+
+# কমান্ড লাইন ইন্টারফেস
+def main():
+    """মেইন ফাংশন"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Vocabulary index builder")
+    parser.add_argument("command", choices=["build-index"], help="Command to run")
+    parser.add_argument("directory", nargs="?", default="vocab", help="Vocabulary directory")
+    parser.add_argument("--force", "-f", action="store_true", help="Rebuild fresh indexes too")
+    
+    args = parser.parse_args()
+    
+    if args.command == "build-index":
+        built = build_all_indexes(args.directory, force=args.force)
+        print(f"Built {built} index file(s) in {args.directory}")
+
+if __name__ == "__main__":
+    main()